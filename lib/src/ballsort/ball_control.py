@@ -1,5 +1,5 @@
 from scenario import ScenarioProgress
-from state_update_model import StateModel, StatePosition
+from state_update_model import StateBall, StateModel, StatePosition
 
 
 class IllegalBallControlStateError(Exception):
@@ -43,3 +43,19 @@ class BallControl(object):
     def get_state(self) -> StateModel:
         """Returns the complete state of the board."""
         raise NotImplementedError
+
+    def get_column(self, x: int) -> list[StateBall]:
+        """Returns the balls in column x, ordered bottom to top."""
+        raise NotImplementedError
+
+    def get_top_ball(self, x: int) -> StateBall | None:
+        """Returns the topmost ball in column x, if any."""
+        raise NotImplementedError
+
+    def get_column_heights(self) -> list[int]:
+        """Returns the number of balls in each column."""
+        raise NotImplementedError
+
+    def find_balls(self, color: str) -> list[StateBall]:
+        """Returns the balls of the given color on the board, not held by a claw, ordered by x, then y."""
+        raise NotImplementedError
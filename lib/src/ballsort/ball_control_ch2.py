@@ -9,8 +9,8 @@ class BallControlCh2(BallControlSim, ScenarioControl):
 
     ch2_state_manager: Ch2StateManager
 
-    def __init__(self, update_reporter: UpdateReporter, delay_multiplier: float = 1.0):
-        super().__init__(update_reporter=update_reporter, delay_multiplier=delay_multiplier)
+    def __init__(self, update_reporter: UpdateReporter, delay_multiplier: float = 1.0, fast_forward: bool = False):
+        super().__init__(update_reporter=update_reporter, delay_multiplier=delay_multiplier, fast_forward=fast_forward)
         self.ch2_state_manager = Ch2StateManager()
 
     async def read_scales(self) -> int:
@@ -5,6 +5,6 @@ from update_reporter import UpdateReporter
 
 class BallControlCh4(BallControlSim, ScenarioControl):
 
-    def __init__(self, update_reporter: UpdateReporter, delay_multiplier: float = 1.0):
-        super().__init__(update_reporter=update_reporter, delay_multiplier=delay_multiplier)
+    def __init__(self, update_reporter: UpdateReporter, delay_multiplier: float = 1.0, fast_forward: bool = False):
+        super().__init__(update_reporter=update_reporter, delay_multiplier=delay_multiplier, fast_forward=fast_forward)
         self.state_manager = Ch4StateManager()
@@ -1,25 +1,76 @@
 import asyncio
-from dataclasses import replace
+from dataclasses import fields, replace
+from typing import Any, Callable, Coroutine
 
 from ball_control import BallControl
 from scenario import Scenario, ScenarioProgress
 from state_manager import StateManager
 from scenario_control import ScenarioControl
-from state_update_model import StateModel, StatePosition, StateUpdateModel, get_default_state
+from state_update_model import (
+    BallMove,
+    Claw,
+    ClawDelta,
+    StateBall,
+    StateDeltaModel,
+    StateDeltaUpdateModel,
+    StateModel,
+    StatePosition,
+    StateUpdateModel,
+    get_default_state,
+)
 from update_reporter import UpdateReporter
 
+HORIZONTAL_MOVE_DURATION = 1.0
+VERTICAL_MOVE_DURATION = 1.5
+CLAW_OPERATION_DURATION = 0.3
+
 class BallControlSim(BallControl, ScenarioControl):
 
     delay_mult: float
     update_reporter: UpdateReporter
     state_manager: StateManager
-    state: StateModel
+    _state: StateModel
+    _snapshot: StateModel | None # returned by get_state until the state changes
+    _snapshot_balls: dict[int, StateBall] # ball id -> latest snapshot of the ball
+    delta_updates: bool
+    keyframe_interval: int
+    fast_forward: bool
+    nof_commands: int # commands issued since the scenario was set
+    _seq: int
+    _sent_claws: list[dict[str, object]]
+    _pending_ball_moves: list[BallMove]
 
-    def __init__(self, update_reporter: UpdateReporter, delay_multiplier: float = 1.0):
+    def __init__(self, update_reporter: UpdateReporter, delay_multiplier: float = 1.0, delta_updates: bool = False, keyframe_interval: int = 100, fast_forward: bool = False):
+        """
+        delta_updates: report changes since the previous update instead of the full state.
+        keyframe_interval: with delta_updates, every keyframe_interval:th update reports the full state. At least 1.
+        fast_forward: headless mode. No updates are reported and no time passes.
+            Commands start when called and complete in virtual time when awaited.
+        """
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
         self.update_reporter = update_reporter
         self.state_manager = StateManager()
         self.delay_mult = delay_multiplier
+        self._snapshot_balls = {}
         self.state = get_default_state()
+        self.delta_updates = delta_updates
+        self.keyframe_interval = keyframe_interval
+        self.fast_forward = fast_forward
+        self.nof_commands = 0
+        self._seq = 0
+        self._sent_claws = []
+        self._pending_ball_moves = []
+
+    @property
+    def state(self) -> StateModel:
+        return self._state
+
+    @state.setter
+    def state(self, state: StateModel):
+        """Commands assign the state after changing it"""
+        self._state = state
+        self._snapshot = None
 
     async def __aenter__(self):
         pass
@@ -28,46 +79,138 @@ class BallControlSim(BallControl, ScenarioControl):
         await self.update_reporter.shutdown()
 
     async def __send_update(self, include_balls: bool = False, include_dimensions: bool = False):
+        if self.fast_forward:
+            return
+        self._seq += 1
+        if self.delta_updates:
+            keyframe_due = self._seq % self.keyframe_interval == 0 or len(self._sent_claws) != len(self.state.claws)
+            if include_balls or include_dimensions or keyframe_due:
+                include_balls = include_dimensions = True
+            else:
+                await self.__send_delta_update()
+                return
+
         state_to_send = self.state if include_balls else replace(self.state, balls = None)
         state_to_send = state_to_send if include_dimensions else replace(state_to_send, max_x = 0, max_y = 0)
 
         state_update: StateUpdateModel = StateUpdateModel(
                 userId="glen",
                 state=state_to_send,
-                delay_multiplier=self.delay_mult
+                delay_multiplier=self.delay_mult,
+                seq=self._seq
             )
 
+        if self.delta_updates:
+            self._sent_claws = [self.__get_claw_fields(claw) for claw in self.state.claws]
+            self._pending_ball_moves = []
         await self.update_reporter.send_update(state_update)
+
+    async def __send_delta_update(self):
+        claw_deltas: list[ClawDelta] = []
+        for claw_index, claw in enumerate(self.state.claws):
+            claw_fields = self.__get_claw_fields(claw)
+            sent_fields = self._sent_claws[claw_index]
+            changes = {name: value for name, value in claw_fields.items() if sent_fields[name] != value}
+            if changes:
+                claw_deltas.append(ClawDelta(index=claw_index, changes=changes))
+                self._sent_claws[claw_index] = claw_fields
+
+        delta_update = StateDeltaUpdateModel(
+            userId="glen",
+            seq=self._seq,
+            delta=StateDeltaModel(
+                claws=claw_deltas,
+                ball_moves=self._pending_ball_moves,
+                goal_accomplished=self.state.goal_accomplished,
+                elapsed=self.state.elapsed,
+            ),
+            delay_multiplier=self.delay_mult,
+        )
+        self._pending_ball_moves = []
+        await self.update_reporter.send_delta_update(delta_update)
+
+    @staticmethod
+    def __get_claw_fields(claw: Claw) -> dict[str, object]:
+        claw_fields = {field.name: getattr(claw, field.name) for field in fields(claw)}
+        claw_fields["ball"] = claw.ball.id if claw.ball else None
+        return claw_fields
    
     async def _delay(self, duration: float):
         end_time = self.state.elapsed + duration
-        await asyncio.sleep(duration * self.delay_mult)
+        if not self.fast_forward:
+            await asyncio.sleep(duration * self.delay_mult)
         if end_time > self.state.elapsed:
             self.state.elapsed = end_time
+            self._snapshot = None
 
-    async def _move_relative(self, x: int, y: int, delay: float = 1.0):
+    def _fast_forward(self, start: Callable[[], StateModel], end: Callable[[], StateModel], duration: float) -> Coroutine[Any, Any, None]:
+        """Starts a command immediately. Returns a coroutine that completes it in virtual time."""
+        end_time = self.state.elapsed + duration
+        try:
+            self.state = start()
+        except Exception as err:
+            self.state = end()
+            return self.__fail(err)
+        return self.__complete(end=end, end_time=end_time)
+
+    async def __complete(self, end: Callable[[], StateModel], end_time: float):
+        if end_time > self.state.elapsed:
+            self.state.elapsed = end_time
+        self.state = end()
+
+    async def __fail(self, err: Exception):
+        raise err
+
+    async def __noop(self):
+        pass
+
+    async def _move_relative(self, x: int, y: int, delay: float = HORIZONTAL_MOVE_DURATION):
         delayTask = asyncio.create_task(self._delay(delay))
         await self.__send_update()
         await delayTask
 
-    async def move_horizontally(self, distance: int, claw_index: int = 0):
+    def move_horizontally(self, distance: int, claw_index: int = 0) -> Coroutine[Any, Any, None]:
+        self.nof_commands += 1
+        if not self.fast_forward:
+            return self._move_horizontally(distance=distance, claw_index=claw_index)
+        if (0 == distance):
+            return self.__noop()
+        return self._fast_forward(
+            start=lambda: self.state_manager.move_horizontally_start(state=self.state, distance=distance, claw_index=claw_index),
+            end=lambda: self.state_manager.move_horizontally_end(state=self.state, claw_index=claw_index),
+            duration=HORIZONTAL_MOVE_DURATION,
+        )
+
+    async def _move_horizontally(self, distance: int, claw_index: int):
         if (0 == distance):
             return
         
         try:
             self.state = self.state_manager.move_horizontally_start(state=self.state, distance=distance, claw_index=claw_index)
-            await self._move_relative(x=distance, y=0, delay=1.0)            
+            await self._move_relative(x=distance, y=0, delay=HORIZONTAL_MOVE_DURATION)
         finally:
             self.state = self.state_manager.move_horizontally_end(state=self.state, claw_index=claw_index)
             await self.__send_update()
 
-    async def move_vertically(self, distance: int, claw_index: int = 0) -> None:
+    def move_vertically(self, distance: int, claw_index: int = 0) -> Coroutine[Any, Any, None]:
+        self.nof_commands += 1
+        if not self.fast_forward:
+            return self._move_vertically(distance=distance, claw_index=claw_index)
+        if (0 == distance):
+            return self.__noop()
+        return self._fast_forward(
+            start=lambda: self.state_manager.move_vertically_start(state=self.state, distance=distance, claw_index=claw_index),
+            end=lambda: self.state_manager.move_vertically_end(state=self.state, claw_index=claw_index),
+            duration=VERTICAL_MOVE_DURATION,
+        )
+
+    async def _move_vertically(self, distance: int, claw_index: int) -> None:
         if (0 == distance):
             return
         
         try:
             self.state = self.state_manager.move_vertically_start(state=self.state, distance=distance, claw_index=claw_index)
-            await self._move_relative(x=0, y=distance, delay=1.5)
+            await self._move_relative(x=0, y=distance, delay=VERTICAL_MOVE_DURATION)
         finally:
             self.state = self.state_manager.move_vertically_end(state=self.state, claw_index=claw_index)
             await self.__send_update()
@@ -75,11 +218,30 @@ class BallControlSim(BallControl, ScenarioControl):
     def get_position(self, claw_index: int = 0) -> StatePosition:
         return self.state.claws[claw_index].pos
 
-    async def open_claw(self, claw_index: int = 0):
+    def get_reachable_interval(self, claw_index: int = 0) -> tuple[int, int]:
+        """Columns the claw can move to now, given its bounds and the positions of its neighbors, inclusive"""
+        return self.state_manager.get_reachable_interval(self.state, claw_index=claw_index)
+
+    def open_claw(self, claw_index: int = 0) -> Coroutine[Any, Any, None]:
+        self.nof_commands += 1
+        if not self.fast_forward:
+            return self._open_claw(claw_index=claw_index)
+        dropping_ball = self.state.claws[claw_index].ball != None
+        return self._fast_forward(
+            start=lambda: self.state_manager.open_claw_start(state=self.state, claw_index=claw_index),
+            end=lambda: self.state_manager.open_claw_end(state=self.state, claw_index=claw_index, ball_dropped=dropping_ball)[0],
+            duration=CLAW_OPERATION_DURATION,
+        )
+
+    async def _open_claw(self, claw_index: int):
         dropping_ball = self.state.claws[claw_index].ball != None
         try:
-            delayTask = asyncio.create_task(self._delay(0.3))
+            delayTask = asyncio.create_task(self._delay(CLAW_OPERATION_DURATION))
             self.state = self.state_manager.open_claw_start(state=self.state, claw_index=claw_index)
+            if dropping_ball and self.delta_updates:
+                dropped_ball = self.state_manager.index.get_ball_at(self.state.claws[claw_index].pos)
+                if dropped_ball:
+                    self._pending_ball_moves.append(BallMove(id=dropped_ball.id, pos=dropped_ball.pos))
 
             await self.__send_update()
             await delayTask
@@ -88,10 +250,24 @@ class BallControlSim(BallControl, ScenarioControl):
             if dirty:
                 await self.__send_update(include_balls=True)
 
-    async def close_claw(self, claw_index: int = 0):
+    def close_claw(self, claw_index: int = 0) -> Coroutine[Any, Any, None]:
+        self.nof_commands += 1
+        if not self.fast_forward:
+            return self._close_claw(claw_index=claw_index)
+        return self._fast_forward(
+            start=lambda: self.state_manager.close_claw_start(state=self.state, claw_index=claw_index),
+            end=lambda: self.state_manager.close_claw_end(state=self.state, claw_index=claw_index),
+            duration=CLAW_OPERATION_DURATION,
+        )
+
+    async def _close_claw(self, claw_index: int):
         try:
-            delayTask = asyncio.create_task(self._delay(0.3))
+            delayTask = asyncio.create_task(self._delay(CLAW_OPERATION_DURATION))
+            held_ball = self.state.claws[claw_index].ball
             self.state = self.state_manager.close_claw_start(state=self.state, claw_index=claw_index)
+            grabbed_ball = self.state.claws[claw_index].ball
+            if self.delta_updates and grabbed_ball and grabbed_ball is not held_ball:
+                self._pending_ball_moves.append(BallMove(id=grabbed_ball.id, pos=None))
 
             await self.__send_update()
             await delayTask
@@ -99,18 +275,55 @@ class BallControlSim(BallControl, ScenarioControl):
             self.state = self.state_manager.close_claw_end(state=self.state, claw_index=claw_index)
 
     async def set_scenario(self, scenario: Scenario):
+        self._snapshot_balls = {}
         self.state = self.state_manager.set_scenario(state=self.state, scenario=scenario)
+        self.nof_commands = 0
         await self.__send_update(include_balls = True, include_dimensions = True)
 
     def get_progress(self) -> ScenarioProgress:
-        if not self.state_manager.scenario:
-            return ScenarioProgress(completed=0, total=0)
-        return self.state_manager.scenario.get_progress(self.state)
+        return self.state_manager.get_progress(self.state)
 
     def is_in_goal_state(self) -> bool:
-        if not self.state_manager.scenario:
-            return False
-        return self.state_manager.scenario.is_in_goal_state(self.state)
+        return self.state_manager.is_in_goal_state(self.state)
     
     def get_state(self) -> StateModel:
-        return replace(self.state, balls=[replace(ball, value=ball.value if ball.value_visible else None) for ball in self.state.balls])
\ No newline at end of file
+        """
+        Returns a read only snapshot of the state, with hidden values removed.
+        The same snapshot is returned until the state changes. Balls that did not change are shared with the previous snapshot.
+        """
+        if self._snapshot is None:
+            state = self.state
+            self._snapshot = replace(
+                state,
+                balls=[self.__get_ball_snapshot(ball) for ball in state.balls],
+                claws=[replace(claw, ball=self.__get_ball_snapshot(claw.ball) if claw.ball else None) for claw in state.claws],
+            )
+        return self._snapshot
+
+    def get_column(self, x: int) -> list[StateBall]:
+        """Balls are snapshots, like those of get_state. Hidden values are removed."""
+        return [self.__get_ball_snapshot(ball) for ball in self.state_manager.get_index(self.state).get_column(x)]
+
+    def get_top_ball(self, x: int) -> StateBall | None:
+        ball = self.state_manager.get_index(self.state).get_top_ball(x)
+        return self.__get_ball_snapshot(ball) if ball else None
+
+    def get_column_heights(self) -> list[int]:
+        return self.state_manager.get_index(self.state).get_column_heights(self.state.max_x)
+
+    def find_balls(self, color: str) -> list[StateBall]:
+        return [self.__get_ball_snapshot(ball) for ball in self.state_manager.get_index(self.state).find_balls(color)]
+
+    def __get_ball_snapshot(self, ball: StateBall) -> StateBall:
+        value = ball.value if ball.value_visible else None
+        snapshot = self._snapshot_balls.get(ball.id)
+        if (
+            snapshot is None
+            or snapshot.pos is not ball.pos
+            or snapshot.value != value
+            or snapshot.value_visible != ball.value_visible
+            or snapshot.color != ball.color
+            or snapshot.label != ball.label
+        ):
+            snapshot = self._snapshot_balls[ball.id] = replace(ball, value=value)
+        return snapshot
\ No newline at end of file
@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import contextlib
+import csv
+import importlib
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Awaitable, Callable
+
+from ball_control_sim import BallControlSim
+from scenario import Scenario
+from update_reporter import UpdateReporter
+from virtual_clock import run_virtual
+
+
+@dataclass
+class BatchJob:
+    """A solution to run against a scenario. solution must be picklable, i.e. defined at module level."""
+
+    solution: Callable[[BallControlSim], Awaitable[Any]]
+    scenario_class: type[Scenario]
+    seed: int | None = None
+    control_class: type[BallControlSim] = BallControlSim
+
+
+@dataclass
+class BatchResult:
+    solution: str
+    scenario: str
+    seed: int | None
+    goal_accomplished: bool
+    elapsed: float  # virtual seconds
+    nof_commands: int
+    nof_ball_moves: int
+    error: str | None
+    wall_time: float  # seconds
+
+
+def run_job(job: BatchJob, fast_forward: bool = False) -> BatchResult:
+    """
+    Runs a single job in this process.
+    By default the simulator runs on a virtual clock, reporting exact timing.
+    fast_forward is faster but only approximates the timing of interleaved multi-claw solutions.
+    """
+    error: str | None = None
+    bc: BallControlSim | None = None
+    s = time.perf_counter()
+
+    async def run():
+        nonlocal bc
+        bc = job.control_class(update_reporter=UpdateReporter(), delay_multiplier=0.0 if fast_forward else 1.0, fast_forward=fast_forward)
+        scenario = job.scenario_class() if job.seed is None else job.scenario_class(seed=job.seed)
+        await bc.set_scenario(scenario)
+        await job.solution(bc)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            if fast_forward:
+                asyncio.run(run())
+            else:
+                run_virtual(run())
+        except Exception as err:
+            error = f"{type(err).__name__}: {err}"
+
+    return BatchResult(
+        solution=f"{job.solution.__module__}.{job.solution.__qualname__}",
+        scenario=job.scenario_class.__name__,
+        seed=job.seed,
+        goal_accomplished=bc.state.goal_accomplished if bc else False,
+        elapsed=bc.state.elapsed if bc else 0.0,
+        nof_commands=bc.nof_commands if bc else 0,
+        nof_ball_moves=bc.state_manager.nof_ball_moves if bc else 0,
+        error=error,
+        wall_time=time.perf_counter() - s,
+    )
+
+
+def _run_jobs(jobs: list[BatchJob], fast_forward: bool) -> list[BatchResult]:
+    return [run_job(job, fast_forward=fast_forward) for job in jobs]
+
+
+def run_batch(jobs: list[BatchJob], max_workers: int | None = None, fast_forward: bool = False) -> list[BatchResult]:
+    """Runs jobs across a pool of worker processes. Results are returned in job order."""
+    nof_workers = max_workers or os.cpu_count() or 1
+    if nof_workers == 1 or len(jobs) <= 1:
+        return _run_jobs(jobs, fast_forward=fast_forward)
+
+    # a few chunks per worker amortizes inter-process overhead and still balances load
+    nof_chunks = min(len(jobs), nof_workers * 4)
+    chunks = [jobs[i::nof_chunks] for i in range(nof_chunks)]
+    results: list[BatchResult | None] = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=nof_workers) as executor:
+        for chunk_index, chunk_results in enumerate(executor.map(_run_jobs, chunks, [fast_forward] * nof_chunks)):
+            results[chunk_index::nof_chunks] = chunk_results
+    return [result for result in results if result is not None]
+
+
+def format_results(results: list[BatchResult]) -> str:
+    """Formats results as a fixed width table"""
+    names = [field.name for field in fields(BatchResult)]
+    rows = [names] + [
+        [f"{value:0.3f}" if isinstance(value, float) else str(value) for value in asdict(result).values()]
+        for result in results
+    ]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(names))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+
+def _import_object(spec: str) -> Any:
+    module_name, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), name)
+
+
+def _import_scenario_class(spec: str) -> type[Scenario]:
+    """Accepts module:Class or a challenge name like ch7"""
+    if ":" in spec:
+        return _import_object(spec)
+    return _import_object(f"{spec.lower()}_scenario:{spec.capitalize()}Scenario")
+
+
+def _parse_seeds(spec: str) -> list[int | None]:
+    if not spec:
+        return [None]
+    seeds: list[int | None] = []
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        seeds += range(int(first), int(last) + 1) if last else [int(first)]
+    return seeds
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run ballsort solutions against scenarios across a process pool.")
+    parser.add_argument("--solution", action="append", required=True, help="async solution function taking a BallControlSim, as module:function")
+    parser.add_argument("--scenario", action="append", required=True, help="scenario as module:Class or challenge name, e.g. ch7")
+    parser.add_argument("--seeds", default="", help="seeds, e.g. 0-99 or 1,5,7. Default: no seed")
+    parser.add_argument("--control", default="", help="simulator class as module:Class. Default: BallControlSim")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes. Default: number of cores")
+    parser.add_argument("--fast-forward", action="store_true", help="use the headless fast forward simulator instead of a virtual clock")
+    parser.add_argument("--csv", default="", help="also write results to this CSV file")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    control_class = _import_object(args.control) if args.control else BallControlSim
+    jobs = [
+        BatchJob(solution=_import_object(solution), scenario_class=_import_scenario_class(scenario), seed=seed, control_class=control_class)
+        for solution in args.solution
+        for scenario in args.scenario
+        for seed in _parse_seeds(args.seeds)
+    ]
+
+    s = time.perf_counter()
+    results = run_batch(jobs, max_workers=args.workers, fast_forward=args.fast_forward)
+    elapsed = time.perf_counter() - s
+
+    print(format_results(results))
+    nof_accomplished = len([result for result in results if result.goal_accomplished])
+    print(f"\n{nof_accomplished}/{len(results)} goals accomplished. {len(results)} jobs executed in {elapsed:0.2f} seconds.")
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=[field.name for field in fields(BatchResult)])
+            writer.writeheader()
+            writer.writerows(asdict(result) for result in results)
+
+    return 0 if nof_accomplished == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
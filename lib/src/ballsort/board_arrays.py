@@ -0,0 +1,150 @@
+from dataclasses import dataclass
+from typing import Any
+
+from goal_tracker import SortedColumnTargets
+from scenario import ScenarioProgress
+from state_update_model import StateBall, StateModel
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency: pip install ballsort[numpy]
+    np = None
+
+NUMPY_MIN_BALLS = 500  # below this the interpreted checks are faster
+IN_CLAW = -1  # x of a ball held by a claw
+
+
+def is_numpy_available() -> bool:
+    return np is not None
+
+
+@dataclass
+class BoardArrays:
+    """
+    NumPy view of the balls on a board. Row i describes the ball with id i + 1.
+    Building the view is linear in interpreted code. Keep it up to date with move_ball to get vectorized checks in return.
+    """
+
+    max_y: int
+    x: Any  # np.ndarray, IN_CLAW for balls held by a claw
+    y: Any
+    values: Any  # ball value, 0 if None
+    visible: Any  # value_visible
+    color_ids: Any
+    colors: dict[str, int]  # color -> color id
+
+    @classmethod
+    def from_state(cls, state: StateModel) -> "BoardArrays":
+        """Requires the ball ids to be 1..number of balls, as allocated by the StateManager. Raises ValueError otherwise."""
+        if np is None:
+            raise ImportError("BoardArrays requires numpy")
+        held_balls = [claw.ball for claw in state.claws if claw.ball is not None]
+        nof_balls = len(state.balls) + len(held_balls)
+        if sorted(ball.id for ball in state.balls + held_balls) != list(range(1, nof_balls + 1)):
+            raise ValueError("BoardArrays requires the ball ids to be 1..number of balls")
+        colors: dict[str, int] = {}
+        arrays = cls(
+            max_y=state.max_y,
+            x=np.full(nof_balls, IN_CLAW, dtype=np.int32),
+            y=np.zeros(nof_balls, dtype=np.int32),
+            values=np.zeros(nof_balls, dtype=np.int64),
+            visible=np.zeros(nof_balls, dtype=bool),
+            color_ids=np.zeros(nof_balls, dtype=np.int32),
+            colors=colors,
+        )
+        for ball in state.balls + held_balls:
+            row = ball.id - 1
+            arrays.values[row] = 0 if ball.value is None else ball.value
+            arrays.visible[row] = ball.value_visible
+            arrays.color_ids[row] = colors.setdefault(ball.color, len(colors))
+        for ball in state.balls:
+            arrays.move_ball(ball)
+        return arrays
+
+    def move_ball(self, ball: StateBall):
+        """Call after a ball has been dropped"""
+        self.x[ball.id - 1] = ball.pos.x
+        self.y[ball.id - 1] = ball.pos.y
+
+    def remove_ball(self, ball: StateBall):
+        """Call after a ball has been grabbed"""
+        self.x[ball.id - 1] = IN_CLAW
+
+    def update_visibility(self, balls: list[StateBall]):
+        """Call after values have been revealed"""
+        for ball in balls:
+            self.visible[ball.id - 1] = ball.value_visible
+
+    def __get_column(self, x: int, color: str | None, per_ball: Any) -> Any:
+        mask = self.x == x
+        if color is not None:
+            mask &= self.color_ids == self.colors.get(color, -1)
+        # y is unique within a column. Scattering by y orders the column without sorting.
+        occupied = np.zeros(self.max_y + 1, dtype=bool)
+        column = np.zeros(self.max_y + 1, dtype=per_ball.dtype)
+        occupied[self.y[mask]] = True
+        column[self.y[mask]] = per_ball[mask]
+        return column[occupied]
+
+    def get_column_values(self, x: int, color: str | None = None) -> Any:
+        """Values of the balls in column x, optionally of one color only, top to bottom"""
+        return self.__get_column(x=x, color=color, per_ball=self.values)
+
+    def are_columns_sorted(self, targets: SortedColumnTargets) -> bool:
+        for x, (count, color) in targets.items():
+            values = self.get_column_values(x=x, color=color)
+            if len(values) != count or not np.all(np.diff(values) >= 0):
+                return False
+        return True
+
+    def get_nof_sorted_from_bottom(self, x: int, color: str | None = None) -> int:
+        """Balls with visible values resting on a sorted stack. A hidden value ends the stack."""
+        values = self.get_column_values(x=x, color=color)
+        visible = self.__get_column(x=x, color=color, per_ball=self.visible)
+        # ball i rests on a sorted stack if it and every ball below it are visible and in order
+        ok = np.append(np.diff(values) >= 0, True) & visible
+        if np.all(ok):
+            return len(values)
+        return len(values) - 1 - int(np.flatnonzero(~ok)[-1])
+
+    def get_sorted_columns_progress(self, targets: SortedColumnTargets) -> ScenarioProgress:
+        return ScenarioProgress(
+            completed=sum(self.get_nof_sorted_from_bottom(x=x, color=color) for x, (_, color) in targets.items()),
+            total=sum(count for count, _ in targets.values()),
+        )
+
+
+def _get_column(state: StateModel, x: int, color: str | None) -> list[StateBall]:
+    column: list[StateBall] = [ball for ball in state.balls if ball.pos.x == x and (color is None or ball.color == color)]
+    return sorted(column, key=lambda ball: ball.pos.y)
+
+
+def _get_column_values(state: StateModel, x: int, color: str | None) -> list[int]:
+    return [0 if ball.value is None else ball.value for ball in _get_column(state=state, x=x, color=color)]
+
+
+def are_columns_sorted(state: StateModel, targets: SortedColumnTargets) -> bool:
+    """Returns true if each target column holds the expected number of balls, sorted by value. Lowest value on top."""
+    for x, (count, color) in targets.items():
+        actual_values = _get_column_values(state=state, x=x, color=color)
+        if len(actual_values) != count or actual_values != sorted(actual_values):
+            return False
+    return True
+
+
+def get_sorted_columns_progress(state: StateModel, targets: SortedColumnTargets) -> ScenarioProgress:
+    """
+    Counts the balls in target columns resting on a sorted stack, out of all balls expected in target columns.
+    Only visible values count. A ball with a hidden value ends the stack, so progress reveals nothing about hidden values.
+    """
+    completed = 0
+    for x, (_, color) in targets.items():
+        column = _get_column(state=state, x=x, color=color)
+        nof_sorted = len(column)
+        for i in range(len(column) - 1, -1, -1):
+            below = column[i + 1] if i + 1 < len(column) else None
+            if not column[i].value_visible or (below is not None and (column[i].value or 0) > (below.value or 0)):
+                nof_sorted = len(column) - 1 - i
+                break
+        completed += nof_sorted
+    return ScenarioProgress(completed=completed, total=sum(count for count, _ in targets.values()))
@@ -0,0 +1,94 @@
+from dataclasses import dataclass, field
+from state_update_model import StateBall, StateModel, StatePosition
+
+
+@dataclass
+class BoardIndex:
+    """Per-column index of the balls on the board. Answers position and top of column queries in constant time, and finds balls by color."""
+
+    max_y: int = 0
+    balls: list[StateBall] | None = field(default=None, repr=False, compare=False)  # the indexed list
+    list_indexes: dict[int, int] = field(default_factory=dict, repr=False)  # id() of the ball -> index in balls
+    columns: dict[int, list[StateBall]] = field(default_factory=dict)  # x -> balls ordered bottom to top
+    positions: dict[tuple[int, int], StateBall] = field(default_factory=dict)  # (x, y) -> ball
+    colors: dict[str, dict[int, StateBall]] = field(default_factory=dict)  # color -> id() of the ball -> ball. Colors never change.
+
+    @classmethod
+    def from_state(cls, state: StateModel) -> "BoardIndex":
+        index = cls()
+        index.rebuild(state)
+        return index
+
+    def rebuild(self, state: StateModel):
+        """Discards the current content and indexes all balls on the board."""
+        self.max_y = state.max_y
+        self.balls = state.balls
+        self.list_indexes = {id(ball): i for i, ball in enumerate(state.balls)}
+        self.columns = {}
+        self.positions = {}
+        self.colors = {}
+        for ball in sorted(state.balls, key=lambda ball: ball.pos.y, reverse=True):
+            self.__add(ball)
+
+    def is_current(self, state: StateModel) -> bool:
+        """Returns false if the state's ball list has been replaced, or balls added or removed other than through the index, since the index was built."""
+        return self.balls is state.balls and len(state.balls) == len(self.list_indexes) and self.max_y == state.max_y
+
+    def __add(self, ball: StateBall):
+        """Indexes a ball. Balls are expected to be added on top of their column."""
+        self.columns.setdefault(ball.pos.x, []).append(ball)
+        self.positions[(ball.pos.x, ball.pos.y)] = ball
+        self.colors.setdefault(ball.color, {})[id(ball)] = ball
+
+    def __remove(self, ball: StateBall):
+        """Removes a ball from the index. Balls are expected to be removed from the top of their column."""
+        column = self.columns[ball.pos.x]
+        if column[-1] is ball:
+            column.pop()
+        else:
+            column.remove(ball)
+        del self.positions[(ball.pos.x, ball.pos.y)]
+        del self.colors[ball.color][id(ball)]
+
+    def append_ball(self, ball: StateBall):
+        """Appends a ball to the indexed list, and indexes it."""
+        assert self.balls is not None
+        self.list_indexes[id(ball)] = len(self.balls)
+        self.balls.append(ball)
+        self.__add(ball)
+
+    def pop_ball(self, ball: StateBall):
+        """Removes a ball from the indexed list, and from the index. Constant time: the last ball in the list takes its place."""
+        assert self.balls is not None
+        list_index = self.list_indexes.pop(id(ball))
+        last_ball = self.balls.pop()
+        if last_ball is not ball:
+            self.balls[list_index] = last_ball
+            self.list_indexes[id(last_ball)] = list_index
+        self.__remove(ball)
+
+    def get_ball_at(self, pos: StatePosition) -> StateBall | None:
+        return self.positions.get((pos.x, pos.y))
+
+    def get_column(self, x: int) -> list[StateBall]:
+        """Returns the balls in column x ordered bottom to top."""
+        return self.columns.get(x, [])
+
+    def get_top_ball(self, x: int) -> StateBall | None:
+        column = self.columns.get(x)
+        return column[-1] if column else None
+
+    def find_balls(self, color: str) -> list[StateBall]:
+        """Returns the balls of the given color, ordered by x, then y."""
+        return sorted(self.colors.get(color, {}).values(), key=lambda ball: (ball.pos.x, ball.pos.y))
+
+    def get_column_heights(self, max_x: int) -> list[int]:
+        """Returns the number of balls in each column from 0 to max_x."""
+        return [len(self.columns.get(x, ())) for x in range(max_x + 1)]
+
+    def get_top_occupied_y(self, x: int) -> int:
+        top_ball = self.get_top_ball(x)
+        return top_ball.pos.y if top_ball else self.max_y + 1
+
+    def get_top_vacant_y(self, x: int) -> int:
+        return self.get_top_occupied_y(x) - 1
@@ -1,7 +1,10 @@
 from dataclasses import dataclass, replace
 import random
 from reveal_action import RevealAction
-from scenario import Scenario
+from goal_tracker import GoalTracker, SortedColumnTargets, SortedColumnsGoalTracker
+from scenario import Scenario, ScenarioProgress
+from board_arrays import are_columns_sorted, get_sorted_columns_progress
+from state_utils import get_nof_balls
 from state_update_model import (
     Highlight,
     StateBall,
@@ -36,21 +39,25 @@ class Ch10Scenario(Scenario):
 
         return replace(get_default_state(), balls = balls, max_x=self.max_x, max_y=self.max_y, highlights=highlights)
 
+    def get_sorted_column_targets(self, state: StateModel) -> SortedColumnTargets:
+        """Override"""
+        return {0: (get_nof_balls(state), None)}
+
+    def get_goal_tracker(self, state: StateModel) -> GoalTracker | None:
+        """Override"""
+        return SortedColumnsGoalTracker(state=state, targets=self.get_sorted_column_targets(state))
+
+    def get_progress(self, state: StateModel) -> ScenarioProgress:
+        """Override"""
+        return get_sorted_columns_progress(state=state, targets=self.get_sorted_column_targets(state))
+
     def is_in_goal_state(self, state: StateModel) -> bool:
 
         # No ball in claw
         if state.claws[0].ball:
             return False
-        
-        column0: list[StateBall] = [ball for ball in state.balls if ball.pos.x == 0]
-
-        if len(column0) != len(state.balls):
-            return False
-        
-        actual_values = [0 if ball.value is None else ball.value for ball in sorted(state.balls, key=lambda ball: ball.pos.y)]
-        expected_values = sorted(actual_values)
 
-        return expected_values == actual_values
+        return are_columns_sorted(state=state, targets=self.get_sorted_column_targets(state))
     
     def on_ball_dropped(self, state: StateModel, ball: StateBall) -> tuple[StateModel, bool]:
         """Override"""
@@ -1,7 +1,10 @@
 from dataclasses import dataclass, replace
 import random
 from reveal_action import RevealAction
-from scenario import Scenario
+from goal_tracker import GoalTracker, SortedColumnTargets, SortedColumnsGoalTracker
+from scenario import Scenario, ScenarioProgress
+from board_arrays import are_columns_sorted, get_sorted_columns_progress
+from state_utils import get_nof_balls
 from state_update_model import (
     Highlight,
     StateBall,
@@ -82,32 +85,28 @@ Claw 0 can operate in columns 0-{self.max_x//2}. Claw 1 can operate in columns {
             claws=[claw0, claw1]
         )
 
-    def _is_column_in_goal_state(self, state: StateModel, x: int, color: str) -> bool:
-        column: list[StateBall] = [
-            ball for ball in state.balls if ball.pos.x == x and ball.color == color
-        ]
-
-        if len(column) != len(state.balls) // 2:
-            return False
+    def get_sorted_column_targets(self, state: StateModel) -> SortedColumnTargets:
+        """Override"""
+        nof_balls_per_column = get_nof_balls(state) // 2
+        return {
+            0: (nof_balls_per_column, self.left_color),
+            self.max_x: (nof_balls_per_column, self.right_color),
+        }
 
-        actual_values = [
-            0 if ball.value is None else ball.value
-            for ball in sorted(column, key=lambda ball: ball.pos.y)
-        ]
-        expected_values = sorted(actual_values)
+    def get_goal_tracker(self, state: StateModel) -> GoalTracker | None:
+        """Override"""
+        return SortedColumnsGoalTracker(state=state, targets=self.get_sorted_column_targets(state))
 
-        return expected_values == actual_values
+    def get_progress(self, state: StateModel) -> ScenarioProgress:
+        """Override"""
+        return get_sorted_columns_progress(state=state, targets=self.get_sorted_column_targets(state))
 
     def is_in_goal_state(self, state: StateModel) -> bool:
         # No ball in claw
         if state.claws[0].ball:
             return False
 
-        return self._is_column_in_goal_state(
-            state=state, x=0, color=self.left_color
-        ) and self._is_column_in_goal_state(
-            state=state, x=self.max_x, color=self.right_color
-        )
+        return are_columns_sorted(state=state, targets=self.get_sorted_column_targets(state))
 
     def on_ball_dropped(
         self, state: StateModel, ball: StateBall
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, replace
 import random
 from ball_control import IllegalBallControlStateError
+from goal_tracker import GoalTracker, SingleColorColumnsGoalTracker
 from scenario import Scenario
 from state_update_model import (
     StateBall,
@@ -72,6 +73,10 @@ class Ch13Scenario(Scenario):
             get_default_state(), balls=balls, max_x=self.max_x, max_y=self.max_y
         )
 
+    def get_goal_tracker(self, state: StateModel) -> GoalTracker | None:
+        """Override"""
+        return SingleColorColumnsGoalTracker(state=state)
+
     def is_in_goal_state(self, state: StateModel) -> bool:
         # No ball in claw
         if state.claws[0].ball:
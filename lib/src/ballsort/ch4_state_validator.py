@@ -1,10 +1,12 @@
 from dataclasses import dataclass
 from ball_control import IllegalBallControlStateError
+from board_index import BoardIndex
 from state_utils import (
-    is_ball_in_claw,
+    get_ball_at,
 )
 from state_update_model import (
     StateModel,
+    StatePosition,
 )
 from state_validator import StateValidator
 
@@ -13,8 +15,8 @@ from state_validator import StateValidator
 class Ch4StateValidator(StateValidator):
     """Validates operations"""
 
-    def open_claw(self, state: StateModel, claw_index: int):
-        super().open_claw(state=state, claw_index=claw_index)
+    def open_claw(self, state: StateModel, claw_index: int, index: BoardIndex | None = None):
+        super().open_claw(state=state, claw_index=claw_index, index=index)
 
         ball_in_claw = state.claws[claw_index].ball
         if not ball_in_claw:
@@ -23,14 +25,8 @@ class Ch4StateValidator(StateValidator):
         if state.claws[claw_index].pos.y == state.max_y:
             return
 
-        ball_below = next(
-            (
-                ball
-                for ball in state.balls
-                if ball.pos.x == state.claws[claw_index].pos.x and ball.pos.y == state.claws[claw_index].pos.y + 1
-            ),
-            None,
-        )
+        claw_pos = state.claws[claw_index].pos
+        ball_below = get_ball_at(state=state, pos=StatePosition(x=claw_pos.x, y=claw_pos.y + 1), index=index)
         if not ball_below:
             return
 
@@ -1,6 +1,9 @@
 from dataclasses import dataclass, replace
 import random
-from scenario import Scenario
+from goal_tracker import GoalTracker, SortedColumnTargets, SortedColumnsGoalTracker
+from scenario import Scenario, ScenarioProgress
+from board_arrays import are_columns_sorted, get_sorted_columns_progress
+from state_utils import get_nof_balls
 from state_update_model import (
     Highlight,
     StateBall,
@@ -52,6 +55,19 @@ class Ch8Scenario(Scenario):
             highlights=highlights,
         )
 
+    def get_sorted_column_targets(self, state: StateModel) -> SortedColumnTargets:
+        """Override"""
+        nof_balls_per_column = get_nof_balls(state) // 2
+        return {0: (nof_balls_per_column, None), state.max_x: (nof_balls_per_column, None)}
+
+    def get_goal_tracker(self, state: StateModel) -> GoalTracker | None:
+        """Override"""
+        return SortedColumnsGoalTracker(state=state, targets=self.get_sorted_column_targets(state))
+
+    def get_progress(self, state: StateModel) -> ScenarioProgress:
+        """Override"""
+        return get_sorted_columns_progress(state=state, targets=self.get_sorted_column_targets(state))
+
     def is_in_goal_state(self, state: StateModel) -> bool:
         # No ball in either claw
         if state.claws[0].ball:
@@ -60,23 +76,4 @@ class Ch8Scenario(Scenario):
         if state.claws[1].ball:
             return False
 
-        column0: list[StateBall] = [ball for ball in state.balls if ball.pos.x == 0]
-        column6: list[StateBall] = [ball for ball in state.balls if ball.pos.x == 6]
-
-        if len(column0) != len(state.balls) / 2:
-            return False
-        
-        if len(column6) != len(state.balls) / 2:
-            return False
-        
-        actual_col0_values = [0 if ball.value is None else ball.value for ball in sorted(column0, key=lambda ball: ball.pos.y)]
-        expected_col0_values = sorted(actual_col0_values)
-        if actual_col0_values != expected_col0_values:
-            return False
-        
-        actual_col6_values = [0 if ball.value is None else ball.value for ball in sorted(column6, key=lambda ball: ball.pos.y)]
-        expected_col6_values = sorted(actual_col6_values)
-        if actual_col6_values != expected_col6_values:
-            return False
-
-        return True
+        return are_columns_sorted(state=state, targets=self.get_sorted_column_targets(state))
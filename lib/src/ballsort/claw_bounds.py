@@ -0,0 +1,44 @@
+from dataclasses import dataclass, field
+from state_update_model import MIN_X, Claw, StateModel
+
+
+@dataclass
+class ClawBounds:
+    """
+    Columns each claw may operate in, computed once per scenario.
+    Claws never pass each other, so the claw list stays ordered by x and collision limits are the neighbors' positions.
+    """
+
+    max_x: int = 0
+    claws: list[Claw] | None = field(default=None, repr=False, compare=False)  # the indexed list
+    min_xs: list[int] = field(default_factory=list)  # per claw
+    max_xs: list[int] = field(default_factory=list)  # per claw
+
+    @classmethod
+    def from_state(cls, state: StateModel) -> "ClawBounds":
+        bounds = cls()
+        bounds.rebuild(state)
+        return bounds
+
+    def rebuild(self, state: StateModel):
+        self.max_x = state.max_x
+        self.claws = state.claws
+        self.min_xs = [max(MIN_X, claw.min_x) for claw in state.claws]
+        self.max_xs = [min(state.max_x, claw.max_x) for claw in state.claws]
+
+    def is_current(self, state: StateModel) -> bool:
+        """Returns false if the state's claw list has been replaced since the bounds were computed."""
+        return self.claws is state.claws and self.max_x == state.max_x
+
+    def get_bounds(self, claw_index: int) -> tuple[int, int]:
+        """Columns the claw may ever operate in, inclusive"""
+        return self.min_xs[claw_index], self.max_xs[claw_index]
+
+    def get_reachable_interval(self, state: StateModel, claw_index: int) -> tuple[int, int]:
+        """Columns the claw can move to now, without colliding with its neighbors, inclusive"""
+        lo, hi = self.min_xs[claw_index], self.max_xs[claw_index]
+        if claw_index > 0:
+            lo = max(lo, state.claws[claw_index - 1].pos.x + 1)
+        if claw_index + 1 < len(state.claws):
+            hi = min(hi, state.claws[claw_index + 1].pos.x - 1)
+        return lo, hi
@@ -0,0 +1,137 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any
+
+from ball_control import BallControl
+from state_update_model import StatePosition
+
+_AXIS_COMMANDS = ("move_horizontally", "move_vertically")
+
+
+def _retrieve_exception(future: asyncio.Future):
+    """Keeps asyncio from logging the exception as never retrieved"""
+    if not future.cancelled():
+        future.exception()
+
+
+@dataclass
+class _QueuedCommand:
+    name: str  # BallControl method
+    args: tuple
+    future: asyncio.Future
+    task: asyncio.Task | None = field(default=None, repr=False)
+
+
+class ClawCommandQueue:
+    """
+    Commands for one claw, started in the order they were enqueued, as early as possible.
+    A move starts once earlier moves along the same axis, and earlier claw operations, have completed.
+    Moves along different axes therefore overlap, like in test_utils.go_to_pos.
+    Opening or closing the claw starts once all earlier commands have completed, so balls are grabbed and dropped where the claw stops.
+    Commands are validated by the BallControl when they start. If one fails, the commands after it, and any enqueued later, fail with the same error.
+    """
+
+    bc: BallControl
+    claw_index: int
+    _queue: list[_QueuedCommand]  # enqueued and running commands, in order
+    _error: BaseException | None
+
+    def __init__(self, bc: BallControl, claw_index: int = 0):
+        self.bc = bc
+        self.claw_index = claw_index
+        self._queue = []
+        self._error = None
+
+    def move_horizontally(self, distance: int) -> asyncio.Future:
+        return self.__enqueue("move_horizontally", (distance,))
+
+    def move_vertically(self, distance: int) -> asyncio.Future:
+        return self.__enqueue("move_vertically", (distance,))
+
+    def open_claw(self) -> asyncio.Future:
+        return self.__enqueue("open_claw", ())
+
+    def close_claw(self) -> asyncio.Future:
+        return self.__enqueue("close_claw", ())
+
+    def go_to(self, src: StatePosition, dest: StatePosition) -> asyncio.Future:
+        """Enqueues the moves from src, where the claw will be when earlier commands have completed, to dest"""
+        futures = [self.move_horizontally(dest.x - src.x), self.move_vertically(dest.y - src.y)]
+        return asyncio.gather(*futures)
+
+    def move_ball(self, src: StatePosition, dest: StatePosition, pos: StatePosition | None = None) -> asyncio.Future:
+        """
+        Enqueues moving a ball from src to dest.
+        pos: where the claw will be when earlier commands have completed. Default: the current position.
+        Returns the future of the drop. It fails if any of the commands fails.
+        """
+        start = pos if pos is not None else self.bc.get_position(claw_index=self.claw_index)
+        futures = [
+            self.move_horizontally(src.x - start.x),
+            self.move_vertically(src.y - start.y),
+            self.close_claw(),
+            self.move_horizontally(dest.x - src.x),
+            self.move_vertically(dest.y - src.y),
+        ]
+        for future in futures:
+            # the error is raised by the drop, and by join
+            future.add_done_callback(_retrieve_exception)
+        return self.open_claw()
+
+    async def join(self):
+        """Waits until all enqueued commands have completed. Raises the first error, also if it occurred before join was called."""
+        await asyncio.gather(*[command.future for command in self._queue], return_exceptions=True)
+        if self._error is not None:
+            raise self._error
+
+    def get_nof_pending(self) -> int:
+        """Commands enqueued or running"""
+        return len(self._queue)
+
+    def __enqueue(self, name: str, args: tuple) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        command = _QueuedCommand(name=name, args=args, future=future)
+        if self._error is not None:
+            future.set_exception(self._error)
+            return future
+        self._queue.append(command)
+        self.__dispatch()
+        return future
+
+    @staticmethod
+    def __conflicts(earlier: str, later: str) -> bool:
+        if earlier in _AXIS_COMMANDS and later in _AXIS_COMMANDS:
+            return earlier == later
+        return True
+
+    def __dispatch(self):
+        """Starts the commands not waiting for an earlier command"""
+        for i, command in enumerate(self._queue):
+            if command.task is not None:
+                continue
+            if any(self.__conflicts(earlier.name, command.name) for earlier in self._queue[:i]):
+                continue
+            # calling the method starts the command on a fast forward simulator
+            coroutine: Any = getattr(self.bc, command.name)(*command.args, claw_index=self.claw_index)
+            command.task = asyncio.ensure_future(coroutine)
+            command.task.add_done_callback(lambda task, command=command: self.__on_done(command, task))
+
+    def __on_done(self, command: _QueuedCommand, task: asyncio.Task):
+        self._queue.remove(command)
+        if task.cancelled():
+            command.future.cancel()
+        elif task.exception() is not None:
+            self.__fail(command, task.exception())
+            return
+        else:
+            command.future.set_result(None)
+        self.__dispatch()
+
+    def __fail(self, command: _QueuedCommand, error: BaseException):
+        if self._error is None:
+            self._error = error
+        command.future.set_exception(error)
+        for pending in self._queue:
+            if pending.task is None:
+                pending.future.set_exception(error)
+        self._queue = [pending for pending in self._queue if pending.task is not None]
@@ -0,0 +1,103 @@
+import asyncio
+from dataclasses import dataclass, field
+
+from ball_control import BallControl
+from ball_control_sim import CLAW_OPERATION_DURATION, HORIZONTAL_MOVE_DURATION, VERTICAL_MOVE_DURATION
+from state_update_model import StateModel, StatePosition
+
+ColumnMove = tuple[int, int]  # (source column, destination column)
+
+
+@dataclass
+class ClawCommand:
+    name: str  # BallControl method: move_horizontally, move_vertically, open_claw or close_claw
+    distance: int = 0  # moves only
+
+    def get_duration(self) -> float:
+        if self.name == "move_horizontally":
+            return HORIZONTAL_MOVE_DURATION
+        if self.name == "move_vertically":
+            return VERTICAL_MOVE_DURATION
+        return CLAW_OPERATION_DURATION
+
+
+@dataclass
+class PlanStep:
+    """Commands started together. The next step starts when all of them have completed."""
+
+    commands: list[ClawCommand] = field(default_factory=list)
+
+    def get_duration(self) -> float:
+        return max((command.get_duration() for command in self.commands), default=0.0)
+
+
+@dataclass
+class ClawPlan:
+    claw_index: int
+    steps: list[PlanStep] = field(default_factory=list)
+
+    def get_duration(self) -> float:
+        """Virtual time the plan takes to execute"""
+        return sum(step.get_duration() for step in self.steps)
+
+    def get_nof_commands(self) -> int:
+        return sum(len(step.commands) for step in self.steps)
+
+
+def _get_travel(src: StatePosition, dest: StatePosition) -> list[ClawCommand]:
+    """Horizontal and vertical moves, concurrent. A move takes the same time regardless of distance."""
+    travel: list[ClawCommand] = []
+    if dest.x != src.x:
+        travel.append(ClawCommand(name="move_horizontally", distance=dest.x - src.x))
+    if dest.y != src.y:
+        travel.append(ClawCommand(name="move_vertically", distance=dest.y - src.y))
+    return travel
+
+
+def plan_column_moves(state: StateModel, moves: list[ColumnMove], claw_index: int = 0) -> ClawPlan:
+    """
+    Plans moving the top ball of one column to the top of another, for each move in order, with an empty claw.
+    A ball is grabbed when closing starts, so the claw starts travelling to the destination together with closing.
+    A drop is checked by the scenario when opening completes, at the claw position, so the claw stays until then.
+    Travel along the two axes overlaps. A move takes two travels and one claw operation instead of two travels and two claw operations.
+    """
+    heights = [0] * (state.max_x + 1)
+    for ball in state.balls:
+        heights[ball.pos.x] += 1
+
+    plan = ClawPlan(claw_index=claw_index)
+    pos = state.claws[claw_index].pos
+    step = PlanStep()
+    for src_x, dest_x in moves:
+        src = StatePosition(x=src_x, y=state.max_y + 1 - heights[src_x])
+        step.commands += _get_travel(pos, src)
+        if step.commands:
+            plan.steps.append(step)
+        heights[src_x] -= 1
+
+        dest = StatePosition(x=dest_x, y=state.max_y - heights[dest_x])
+        step = PlanStep(commands=[ClawCommand(name="close_claw")] + _get_travel(src, dest))
+        plan.steps.append(step)
+        heights[dest_x] += 1
+
+        plan.steps.append(PlanStep(commands=[ClawCommand(name="open_claw")]))
+        pos = dest
+        step = PlanStep()
+    return plan
+
+
+def _start(bc: BallControl, command: ClawCommand, claw_index: int):
+    if command.name in ("move_horizontally", "move_vertically"):
+        return getattr(bc, command.name)(command.distance, claw_index=claw_index)
+    return getattr(bc, command.name)(claw_index=claw_index)
+
+
+async def execute_plan(bc: BallControl, plan: ClawPlan):
+    for step in plan.steps:
+        # closing is listed first, so it starts while the claw is still
+        await asyncio.gather(*[_start(bc, command, plan.claw_index) for command in step.commands])
+
+
+async def execute_column_moves(bc: BallControl, moves: list[ColumnMove], claw_index: int = 0):
+    """Plans and executes moves from the current state"""
+    await execute_plan(bc=bc, plan=plan_column_moves(state=bc.get_state(), moves=moves, claw_index=claw_index))
@@ -0,0 +1,221 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Coroutine
+
+from ball_control import BallControl
+from ball_control_sim import CLAW_OPERATION_DURATION, HORIZONTAL_MOVE_DURATION, VERTICAL_MOVE_DURATION
+from claw_bounds import ClawBounds
+from claw_planner import ColumnMove, execute_plan, plan_column_moves
+
+
+@dataclass
+class ScheduledMove:
+    """A column move assigned to a claw"""
+
+    seq: int  # position in the serial order of all scheduled moves
+    claw_index: int
+    src_x: int
+    dest_x: int
+    prerequisites: list[int] = field(default_factory=list)  # seq of earlier moves using the same columns
+    estimated_end: float = 0.0  # virtual time, ignoring waits for other claws to get out of the way
+
+
+def _get_estimated_duration(start: tuple[int, int], src: tuple[int, int], dest: tuple[int, int]) -> float:
+    """Virtual time to move a ball from src to dest, starting at start, as planned by plan_column_moves"""
+
+    def get_travel(a: tuple[int, int], b: tuple[int, int]) -> float:
+        return max(HORIZONTAL_MOVE_DURATION if a[0] != b[0] else 0.0, VERTICAL_MOVE_DURATION if a[1] != b[1] else 0.0)
+
+    return get_travel(start, src) + get_travel(src, dest) + CLAW_OPERATION_DURATION
+
+
+class MultiClawScheduler:
+    """
+    Runs column moves concurrently on several claws.
+    Moves are given in a serial order that solves the challenge. Each is assigned to a claw that can reach both its columns,
+    or split into hand-offs through columns reachable by two neighboring claws.
+    A move waits for earlier moves using the same columns. Otherwise moves run as soon as their claw is free.
+    Before travelling, a claw reserves the columns between its position, the source and the destination.
+    Idle claws in the way are pushed aside. A claw waits while a busy claw is in the way.
+    Claws wait for each other, so a fast forward simulator runs them one after the other. Use run_virtual to simulate the concurrency.
+    """
+
+    bc: BallControl
+    _reserved: list[tuple[int, int] | None]  # per claw, columns reserved by a claw that is busy
+    _requests: dict[int, tuple[int, int, int]]  # claw index -> seq, reserved columns requested
+    _condition: asyncio.Condition
+    _done: dict[int, asyncio.Event]
+    _bounds: ClawBounds
+
+    def __init__(self, bc: BallControl):
+        self.bc = bc
+
+    def schedule(self, moves: list[ColumnMove]) -> list[ScheduledMove]:
+        """Assigns moves to claws. Greedy: the claw finishing earliest, by estimated virtual time, gets the move."""
+        state = self.bc.get_state()
+        claws = state.claws
+        bounds = ClawBounds.from_state(state)
+        reaches = [bounds.get_bounds(claw_index) for claw_index in range(len(claws))]
+        heights = [0] * (state.max_x + 1)
+        for ball in state.balls:
+            heights[ball.pos.x] += 1
+        claw_positions = [(claw.pos.x, claw.pos.y) for claw in claws]
+        claw_free_at = [0.0] * len(claws)
+        column_last_seq: dict[int, int] = {}
+        scheduled: list[ScheduledMove] = []
+
+        def get_hops(src_x: int, dest_x: int) -> list[tuple[int, int, list[int]]]:
+            """(src_x, dest_x, candidate claws) for each hop"""
+            candidates = [i for i, (lo, hi) in enumerate(reaches) if lo <= src_x <= hi and lo <= dest_x <= hi]
+            if candidates:
+                return [(src_x, dest_x, candidates)]
+            first = next((i for i, (lo, hi) in enumerate(reaches) if lo <= src_x <= hi), None)
+            last = next((i for i, (lo, hi) in enumerate(reaches) if lo <= dest_x <= hi), None)
+            if first is None or last is None:
+                raise ValueError(f"No claw reaches column {src_x if first is None else dest_x}")
+            step = 1 if last > first else -1
+            hops: list[tuple[int, int, list[int]]] = []
+            x = src_x
+            for claw_index in range(first, last, step):
+                next_index = claw_index + step
+                shared = [
+                    column
+                    for column in range(max(reaches[claw_index][0], reaches[next_index][0]), min(reaches[claw_index][1], reaches[next_index][1]) + 1)
+                    if column not in (x, dest_x) and heights[column] <= state.max_y
+                ]
+                if not shared:
+                    raise ValueError(f"No column to hand over balls from claw {claw_index} to claw {next_index}")
+                # the emptiest shared column, nearest to the source on ties
+                handoff_x = min(shared, key=lambda column: (heights[column], abs(column - x)))
+                hops.append((x, handoff_x, [claw_index]))
+                x = handoff_x
+            hops.append((x, dest_x, [last]))
+            return hops
+
+        for src_x, dest_x in moves:
+            for hop_src_x, hop_dest_x, candidates in get_hops(src_x, dest_x):
+                prerequisites = sorted({column_last_seq[x] for x in (hop_src_x, hop_dest_x) if x in column_last_seq})
+                ready_at = max((scheduled[seq].estimated_end for seq in prerequisites), default=0.0)
+                src = (hop_src_x, state.max_y + 1 - heights[hop_src_x])
+                dest = (hop_dest_x, state.max_y - heights[hop_dest_x])
+
+                def get_pushes(claw_index: int) -> list[tuple[int, int]]:
+                    """Other claws in the way, and where they are pushed to"""
+                    x = claw_positions[claw_index][0]
+                    pushes: list[tuple[int, int]] = []
+                    for step, limit in [(1, max(x, hop_src_x, hop_dest_x)), (-1, min(x, hop_src_x, hop_dest_x))]:
+                        other_index = claw_index + step
+                        while 0 <= other_index < len(claws) and (claw_positions[other_index][0] - limit) * step <= 0:
+                            limit += step
+                            pushes.append((other_index, limit))
+                            other_index += step
+                    return pushes
+
+                def get_end(claw_index: int) -> float:
+                    start = max([ready_at, claw_free_at[claw_index]] + [claw_free_at[other_index] for other_index, _ in get_pushes(claw_index)])
+                    return start + _get_estimated_duration(claw_positions[claw_index], src, dest)
+
+                claw_index = min(candidates, key=lambda i: (get_end(i), i))
+                move = ScheduledMove(seq=len(scheduled), claw_index=claw_index, src_x=hop_src_x, dest_x=hop_dest_x, prerequisites=prerequisites, estimated_end=get_end(claw_index))
+                scheduled.append(move)
+                for other_index, x in get_pushes(claw_index):
+                    claw_positions[other_index] = (x, claw_positions[other_index][1])
+                claw_free_at[claw_index] = move.estimated_end
+                claw_positions[claw_index] = dest
+                column_last_seq[hop_src_x] = column_last_seq[hop_dest_x] = move.seq
+                heights[hop_src_x] -= 1
+                heights[hop_dest_x] += 1
+        return scheduled
+
+    async def run(self, moves: list[ColumnMove]) -> list[ScheduledMove]:
+        """Schedules and executes moves. Returns the schedule."""
+        scheduled = self.schedule(moves)
+        await self.execute(scheduled)
+        return scheduled
+
+    async def execute(self, scheduled: list[ScheduledMove]):
+        state = self.bc.get_state()
+        nof_claws = len(state.claws)
+        self._bounds = ClawBounds.from_state(state)
+        self._reserved = [None] * nof_claws
+        self._requests = {}
+        self._condition = asyncio.Condition()
+        self._done = {move.seq: asyncio.Event() for move in scheduled}
+        await asyncio.gather(*[self.__run_claw(claw_index, [move for move in scheduled if move.claw_index == claw_index]) for claw_index in range(nof_claws)])
+
+    async def __run_claw(self, claw_index: int, moves: list[ScheduledMove]):
+        for move in moves:
+            for seq in move.prerequisites:
+                await self._done[seq].wait()
+
+            async with self._condition:
+                reserved: list[int] = []
+                pushes: list[tuple[int, int]] = []
+
+                def try_reserve() -> bool:
+                    # idle claws may be pushed while waiting
+                    x = self.bc.get_position(claw_index=claw_index).x
+                    lo, hi = min(x, move.src_x, move.dest_x), max(x, move.src_x, move.dest_x)
+                    self._requests[claw_index] = (move.seq, lo, hi)
+                    result = self.__get_pushes(claw_index, move.seq, lo, hi)
+                    if result is None:
+                        return False
+                    reserved[:] = [lo, hi]
+                    pushes[:] = result
+                    return True
+
+                await self._condition.wait_for(try_reserve)
+                del self._requests[claw_index]
+                self._reserved[claw_index] = (reserved[0], reserved[1])
+                for pushed_index, pushed_x in pushes:
+                    self._reserved[pushed_index] = (pushed_x, pushed_x)
+
+            # pushed claws start moving first, so they are out of the way when this claw starts
+            plan = plan_column_moves(state=self.bc.get_state(), moves=[(move.src_x, move.dest_x)], claw_index=claw_index)
+            push_commands = [
+                self.bc.move_horizontally(pushed_x - self.bc.get_position(claw_index=pushed_index).x, claw_index=pushed_index) for pushed_index, pushed_x in pushes
+            ]
+            await asyncio.gather(*[self.__push(pushed_index, command) for (pushed_index, _), command in zip(pushes, push_commands)], execute_plan(bc=self.bc, plan=plan))
+
+            async with self._condition:
+                self._reserved[claw_index] = None
+                self._condition.notify_all()
+            self._done[move.seq].set()
+
+    async def __push(self, claw_index: int, command: Coroutine[Any, Any, None]):
+        await command
+        async with self._condition:
+            self._reserved[claw_index] = None
+            self._condition.notify_all()
+
+    def __get_pushes(self, claw_index: int, seq: int, lo: int, hi: int) -> list[tuple[int, int]] | None:
+        """
+        Idle claws to push aside, and where to, for claw_index to have columns lo to hi to itself.
+        None if a busy claw is in the way, or an earlier move waits for some of the columns.
+        """
+        if self._reserved[claw_index] is not None:
+            return None  # still being pushed
+        for other_seq, other_lo, other_hi in self._requests.values():
+            if other_seq < seq and other_lo <= hi and lo <= other_hi:
+                return None
+
+        pushes: list[tuple[int, int]] = []
+        nof_claws = len(self._reserved)
+        for step, limit in [(1, hi), (-1, lo)]:
+            other_index = claw_index + step
+            while 0 <= other_index < nof_claws:
+                reserved = self._reserved[other_index]
+                if reserved is not None:
+                    if (step == 1 and reserved[0] <= limit) or (step == -1 and reserved[1] >= limit):
+                        return None
+                    break
+                x = self.bc.get_position(claw_index=other_index).x
+                if (step == 1 and x > limit) or (step == -1 and x < limit):
+                    break
+                limit += step
+                min_x, max_x = self._bounds.get_bounds(other_index)
+                if not min_x <= limit <= max_x:
+                    return None
+                pushes.append((other_index, limit))
+                other_index += step
+        return pushes
@@ -0,0 +1,139 @@
+import asyncio
+from dataclasses import replace
+
+from state_update_model import BallMove, ClawDelta, MultiBoardUpdateModel, StateDeltaUpdateModel, StateUpdateModel
+from update_reporter import UpdateReporter
+
+
+def merge_updates(earlier: StateUpdateModel, later: StateUpdateModel) -> StateUpdateModel:
+    """The later update, with the balls and dimensions of the earlier one if it lacks them"""
+    state = later.state
+    if state.balls is None and earlier.state.balls is not None:
+        state = replace(state, balls=earlier.state.balls)
+    if state.max_x == 0 and earlier.state.max_x != 0:
+        state = replace(state, max_x=earlier.state.max_x, max_y=earlier.state.max_y)
+    return later if state is later.state else replace(later, state=state)
+
+
+def merge_delta_updates(earlier: StateDeltaUpdateModel, later: StateDeltaUpdateModel) -> StateDeltaUpdateModel:
+    """One delta with the changes of both"""
+    claw_changes: dict[int, dict[str, object]] = {}
+    for claw_delta in earlier.delta.claws + later.delta.claws:
+        claw_changes.setdefault(claw_delta.index, {}).update(claw_delta.changes)
+    ball_moves: dict[int, BallMove] = {}
+    for ball_move in earlier.delta.ball_moves + later.delta.ball_moves:
+        ball_moves.pop(ball_move.id, None)
+        ball_moves[ball_move.id] = ball_move
+    delta = replace(
+        later.delta,
+        claws=[ClawDelta(index=index, changes=changes) for index, changes in sorted(claw_changes.items())],
+        ball_moves=list(ball_moves.values()),
+    )
+    return replace(later, delta=delta)
+
+
+class CoalescingUpdateReporter(UpdateReporter):
+    """
+    Reports at most one update per frame to the wrapped reporter.
+    The first update after a quiet frame is reported at once. Updates arriving within the frame are combined and reported when it ends:
+    the latest full update, keeping balls and dimensions reported earlier in the frame, followed by the deltas since it, merged into one.
+    An update changing goal_accomplished is reported at once, so no transition is lost.
+    Errors raised by the wrapped reporter at the end of a frame are raised again by the next send, flush or shutdown.
+    """
+
+    update_reporter: UpdateReporter
+    frame_interval: float  # seconds, event loop time
+    nof_received: int
+    nof_reported: int
+    _pending_update: StateUpdateModel | None
+    _pending_delta: StateDeltaUpdateModel | None
+    _goal_accomplished: bool  # as last reported
+    _frame_start: float | None
+    _error: Exception | None
+    _flush_task: asyncio.Task | None
+
+    def __init__(self, update_reporter: UpdateReporter, frame_interval: float = 1 / 60):
+        self.update_reporter = update_reporter
+        self.frame_interval = frame_interval
+        self.nof_received = 0
+        self.nof_reported = 0
+        self._pending_update = None
+        self._pending_delta = None
+        self._goal_accomplished = False
+        self._frame_start = None
+        self._error = None
+        self._flush_task = None
+
+    async def send_update(self, stateUpdate: StateUpdateModel):
+        self.__raise_error()
+        self.nof_received += 1
+        pending = self._pending_update
+        if stateUpdate.state.balls is not None:
+            self._pending_delta = None  # superseded
+        elif self._pending_delta is not None:
+            # the delta must be reported before a full update without balls
+            await self.flush()
+            pending = None
+        if pending is not None:
+            stateUpdate = merge_updates(pending, stateUpdate)
+        self._pending_update = stateUpdate
+        await self.__report_or_wait(goal_accomplished=stateUpdate.state.goal_accomplished)
+
+    async def send_delta_update(self, deltaUpdate: StateDeltaUpdateModel):
+        self.__raise_error()
+        self.nof_received += 1
+        if self._pending_delta is not None:
+            deltaUpdate = merge_delta_updates(self._pending_delta, deltaUpdate)
+        self._pending_delta = deltaUpdate
+        await self.__report_or_wait(goal_accomplished=deltaUpdate.delta.goal_accomplished)
+
+    async def send_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel):
+        await self.flush()
+        self.nof_received += 1
+        self.nof_reported += 1
+        await self.update_reporter.send_multi_board_update(multiBoardUpdate)
+
+    async def __report_or_wait(self, goal_accomplished: bool):
+        now = asyncio.get_running_loop().time()
+        if goal_accomplished != self._goal_accomplished or self._frame_start is None or now - self._frame_start >= self.frame_interval:
+            await self.flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self.__flush_at_frame_end(self._frame_start + self.frame_interval - now))
+
+    async def __flush_at_frame_end(self, delay: float):
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as error:
+            if self._error is None:
+                self._error = error
+
+    def __raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    async def flush(self):
+        """Reports pending updates now"""
+        self.__raise_error()
+        if self._flush_task is not None and self._flush_task is not asyncio.current_task():
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._frame_start = asyncio.get_running_loop().time()
+        update, self._pending_update = self._pending_update, None
+        delta, self._pending_delta = self._pending_delta, None
+        if update is not None:
+            self._goal_accomplished = update.state.goal_accomplished
+            self.nof_reported += 1
+            await self.update_reporter.send_update(update)
+        if delta is not None:
+            self._goal_accomplished = delta.delta.goal_accomplished
+            self.nof_reported += 1
+            await self.update_reporter.send_delta_update(delta)
+
+    async def shutdown(self):
+        try:
+            await self.flush()
+        finally:
+            await self.update_reporter.shutdown()
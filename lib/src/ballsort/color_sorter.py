@@ -0,0 +1,546 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import math
+import multiprocessing
+import os
+import random
+import time
+from typing import Any, Callable
+
+Move = tuple[int, int]  # (source column, destination column)
+
+
+class SearchBudgetExceededError(Exception):
+    """Raised when a search expands more nodes than its budget allows"""
+    pass
+
+
+class _SearchCancelledError(Exception):
+    """A subtree search is no longer needed"""
+    pass
+
+
+@dataclass
+class SearchStats:
+    nodes_expanded: int = 0
+    iterations: int = 0  # deepening iterations
+    elapsed: float = 0.0  # seconds
+    cache_probes: int = 0
+    cache_hits: int = 0  # positions pruned, reached by no more moves before in the same iteration
+
+    def get_nodes_per_second(self) -> float:
+        return self.nodes_expanded / self.elapsed if self.elapsed > 0 else 0.0
+
+    def get_cache_hit_rate(self) -> float:
+        return self.cache_hits / self.cache_probes if self.cache_probes > 0 else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.nodes_expanded} nodes expanded in {self.iterations} iterations, {self.elapsed:0.3f} s, {self.get_nodes_per_second():0.0f} nodes/s, "
+            f"cache hits: {self.cache_hits} ({self.get_cache_hit_rate():0.1%})"
+        )
+
+
+NO_MOVE = -1
+_EMPTY = -1
+_HASH_MASK = (1 << 64) - 1
+
+
+class TranspositionTable:
+    """
+    Fixed size table of searched positions, indexed by the low bits of the position hash.
+    Each entry holds the fewest moves the position was reached by, the search bound it was reached in and the best move found from it.
+    When two positions compete for an entry the one closer to the root, with the larger subtree, is kept.
+    """
+
+    size: int
+    keys: array  # position hash
+    depths: array  # moves from the root
+    bounds: array  # search bound. _EMPTY for unused entries
+    best_moves: array  # src_x * nof_columns + dest_x, or NO_MOVE
+    probes: int
+    hits: int  # probes finding the position
+    stores: int
+    replacements: int  # stores evicting another position
+    rejections: int  # stores discarded in favor of a position closer to the root
+
+    def __init__(self, size_log2: int = 18):
+        self.size = 1 << size_log2
+        self.keys = array("Q", [0]) * self.size
+        self.depths = array("h", [0]) * self.size
+        self.bounds = array("h", [_EMPTY]) * self.size
+        self.best_moves = array("h", [NO_MOVE]) * self.size
+        self.clear()
+
+    def clear(self):
+        self.bounds[:] = array("h", [_EMPTY]) * self.size
+        self.probes = self.hits = self.stores = self.replacements = self.rejections = 0
+
+    def probe(self, key: int) -> int:
+        """Returns the entry index of the position, or -1"""
+        self.probes += 1
+        index = key & (self.size - 1)
+        if self.bounds[index] != _EMPTY and self.keys[index] == key:
+            self.hits += 1
+            return index
+        return -1
+
+    def store(self, key: int, depth: int, bound: int, best_move: int):
+        index = key & (self.size - 1)
+        if self.bounds[index] != _EMPTY and self.keys[index] != key:
+            if self.bounds[index] == bound and self.depths[index] < depth:
+                self.rejections += 1
+                return
+            self.replacements += 1
+        self.stores += 1
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.bounds[index] = bound
+        self.best_moves[index] = best_move
+
+    def get_hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes > 0 else 0.0
+
+    def get_nof_used(self) -> int:
+        return self.size - self.bounds.count(_EMPTY)
+
+
+class _SearchBoard:
+    """
+    Board state for the search. Moves are made and unmade in place.
+    The Zobrist hash, the heuristic and the columns to move to are updated incrementally,
+    so a move costs the same regardless of the number of columns.
+    Columns are interchangeable. The hash is a sum of column content keys, so positions that only differ
+    by the order of their columns hash the same, as if the columns were sorted.
+    """
+
+    columns: list[list[int]]  # colors, bottom to top
+    codes: list[int]  # column content as a number, one digit per ball
+    runs: list[int]  # length of the single color run at the bottom of each column
+    hash: int
+    h: int  # heuristic, see ColorSorter.get_heuristic
+    empty_columns: set[int]
+    columns_by_top_color: dict[int, set[int]]
+    _base: int
+    _column_keys: dict[int, int]  # Zobrist keys: column code -> key
+    _seed: int
+    _run_counts: dict[int, list[int]]  # color -> number of bottom runs of each length
+    _run_sums: dict[int, int]  # color -> total length of bottom runs
+
+    def __init__(self, columns: list[list[int]], nof_colors: int, nof_rows: int, rng: random.Random):
+        self.columns = [list(column) for column in columns]
+        self._base = nof_colors + 1
+        self._seed = rng.getrandbits(64)
+        self._column_keys = {}
+        self._run_counts = {color: [0] * (nof_rows + 1) for color in range(nof_colors)}
+        self._run_sums = {color: 0 for color in range(nof_colors)}
+        self.codes = [0] * len(columns)
+        self.runs = [0] * len(columns)
+        self.empty_columns = set()
+        self.columns_by_top_color = {color: set() for color in range(nof_colors)}
+        self.hash = 0
+        self.h = 0
+        for x, column in enumerate(self.columns):
+            for color in column:
+                self.codes[x] = self.codes[x] * self._base + color + 1
+            self.runs[x] = ColorSorter.get_bottom_run(column)
+            self.hash = (self.hash + self._get_column_key(x)) & _HASH_MASK
+            self._add_column(x)
+
+    def _get_new_key(self, code: int) -> int:
+        """Pseudo random key of column content, independent of the order columns are first seen in (splitmix64)"""
+        z = (self._seed + code * 0x9E3779B97F4A7C15) & _HASH_MASK
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _HASH_MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _HASH_MASK
+        return z ^ (z >> 31)
+
+    def _get_column_key(self, x: int) -> int:
+        keys = self._column_keys
+        key = keys.get(self.codes[x])
+        if key is None:
+            key = keys[self.codes[x]] = self._get_new_key(self.codes[x])
+        return key
+
+    def _get_color_excess(self, color: int) -> int:
+        """Total length of the color's bottom runs, except the largest"""
+        run_counts = self._run_counts[color]
+        for run in range(len(run_counts) - 1, 0, -1):
+            if run_counts[run]:
+                return self._run_sums[color] - run
+        return 0
+
+    def _change_run(self, color: int, old_run: int, new_run: int):
+        """The single color run at the bottom of a column changed length. 0: no run, the column is empty."""
+        self.h -= self._get_color_excess(color)
+        run_counts = self._run_counts[color]
+        run_counts[old_run] -= 1
+        run_counts[new_run] += 1
+        self._run_sums[color] += new_run - old_run
+        self.h += self._get_color_excess(color)
+
+    def _add_column(self, x: int):
+        column = self.columns[x]
+        if not column:
+            self.empty_columns.add(x)
+            return
+        self.columns_by_top_color[column[-1]].add(x)
+        self.h += len(column) - self.runs[x]
+        self._change_run(column[0], 0, self.runs[x])
+
+    def _push(self, x: int, color: int):
+        column = self.columns[x]
+        keys = self._column_keys
+        board_hash = self.hash - keys[self.codes[x]]
+
+        if not column:
+            self.empty_columns.discard(x)
+            self.runs[x] = 1
+            self._change_run(color, 0, 1)
+        else:
+            self.columns_by_top_color[column[-1]].discard(x)
+            if self.runs[x] == len(column) and column[0] == color:
+                self.runs[x] += 1
+                self._change_run(color, self.runs[x] - 1, self.runs[x])
+            else:
+                self.h += 1
+        column.append(color)
+        self.columns_by_top_color[color].add(x)
+
+        code = self.codes[x] = self.codes[x] * self._base + color + 1
+        key = keys.get(code)
+        if key is None:
+            key = keys[code] = self._get_new_key(code)
+        self.hash = (board_hash + key) & _HASH_MASK
+
+    def _pop(self, x: int) -> int:
+        column = self.columns[x]
+        keys = self._column_keys
+        board_hash = self.hash - keys[self.codes[x]]
+
+        color = column.pop()
+        self.columns_by_top_color[color].discard(x)
+        if self.runs[x] == len(column) + 1:
+            self.runs[x] -= 1
+            self._change_run(color, self.runs[x] + 1, self.runs[x])
+        else:
+            self.h -= 1
+        if column:
+            self.columns_by_top_color[column[-1]].add(x)
+        else:
+            self.empty_columns.add(x)
+
+        code = self.codes[x] = self.codes[x] // self._base
+        key = keys.get(code)
+        if key is None:
+            key = keys[code] = self._get_new_key(code)
+        self.hash = (board_hash + key) & _HASH_MASK
+        return color
+
+    def move(self, src_x: int, dest_x: int):
+        self._push(dest_x, self._pop(src_x))
+
+
+@dataclass
+class ColorSorter:
+    """
+    Finds a shortest sequence of moves to solve the color sorting challenge.
+    Iterative deepening A* (IDA*) on an explicit stack, so memory and stack depth stay proportional to the solution length.
+    """
+
+    max_x: int
+    max_y: int
+    nof_empty_columns: int = 2  # overridable
+    node_budget: int | None = None  # max nodes expanded per search. None: unlimited
+    zobrist_seed: int = 0
+    transposition_table_size_log2: int = 18
+    nof_rows: int = 0  # overwritten in __post_init__
+    nof_columns: int = 0  # overwritten in __post_init__
+    nof_colors: int = 0  # overwritten in __post_init__
+    empty_color: int = 0  # overwritten in __post_init__
+    stats: SearchStats = field(default_factory=SearchStats)
+    result_cache: TranspositionTable = field(init=False)
+    _is_cancelled: Callable[[], bool] | None = field(default=None, init=False, repr=False)  # polled during subtree searches
+
+    def __post_init__(self):
+        self.nof_rows = self.max_y + 1
+        self.nof_columns = self.max_x + 1
+        self.nof_colors = self.nof_columns - self.nof_empty_columns
+        self.empty_color = self.nof_colors
+        self.result_cache = TranspositionTable(size_log2=self.transposition_table_size_log2)
+
+    def get_ball_index(self, x: int, y: int) -> int:
+        return x * self.nof_rows + y
+
+    def __get_columns(self, balls: list[int]) -> list[list[int]]:
+        """Columns of colors, bottom to top"""
+        columns: list[list[int]] = []
+        for x in range(self.nof_columns):
+            column = [balls[self.get_ball_index(x=x, y=y)] for y in range(self.max_y, -1, -1)]
+            columns.append([color for color in column if color != self.empty_color])
+        return columns
+
+    @staticmethod
+    def get_bottom_run(column: list[int]) -> int:
+        """Number of balls at the bottom of the column with the same color as the bottom ball"""
+        run = 0
+        for color in column:
+            if color != column[0]:
+                break
+            run += 1
+        return run
+
+    @staticmethod
+    def get_heuristic(columns: list[list[int]]) -> int:
+        """
+        Lower bound of the number of moves left. Admissible, each ball counted needs to move at least once:
+        Every ball above the single color run at the bottom of its column.
+        For colors with runs at the bottom of several columns, all runs but the largest.
+        """
+        h = 0
+        largest_runs: dict[int, int] = {}
+        for column in columns:
+            if not column:
+                continue
+            run = ColorSorter.get_bottom_run(column)
+            h += len(column) - run
+            largest_run = largest_runs.get(column[0], 0)
+            h += min(run, largest_run)
+            largest_runs[column[0]] = max(run, largest_run)
+        return h
+
+    def __get_moves(self, board: _SearchBoard, previous_move: Move | None, best_move: int) -> list[Move]:
+        """
+        Legal, potentially useful moves. Moves considered most promising last.
+        Columns with the same content are interchangeable, only one move of each kind is returned.
+        """
+        moves: list[Move] = []
+        promising_moves: list[Move] = []
+        empty_x = min(board.empty_columns) if board.empty_columns else None
+        src_codes: set[int] = set()
+        for src_x, src_column in enumerate(board.columns):
+            if not src_column:
+                continue
+            if previous_move is not None and src_x == previous_move[1]:
+                continue  # moving the same ball again. Could have been one move.
+            if board.codes[src_x] in src_codes:
+                continue
+            src_codes.add(board.codes[src_x])
+            if empty_x is not None and board.runs[src_x] != len(src_column):
+                # moving a ball from a single color column to an empty column is useless
+                moves.append((src_x, empty_x))
+            dest_codes: set[int] = set()
+            for dest_x in board.columns_by_top_color[src_column[-1]]:
+                if dest_x != src_x and len(board.columns[dest_x]) < self.nof_rows and board.codes[dest_x] not in dest_codes:
+                    dest_codes.add(board.codes[dest_x])
+                    promising_moves.append((src_x, dest_x))
+        moves += promising_moves
+        if best_move != NO_MOVE:
+            # best move of a previous iteration first
+            move = divmod(best_move, self.nof_columns)
+            if move in moves:
+                moves.remove(move)
+                moves.append(move)
+        return moves
+
+    def __search(self, board: _SearchBoard, bound: int, depth: int = 0, previous_move: Move | None = None) -> tuple[list[Move] | None, float]:
+        """
+        One depth-first iteration pruning positions whose estimated total exceeds bound.
+        depth, previous_move: moves made to reach board and the last of them, when searching a subtree.
+        Returns a solution from board, if found, and the lowest estimated total that exceeded bound.
+        """
+        table = self.result_cache
+        path: list[Move] = []
+        entry = table.probe(board.hash)
+        table.store(board.hash, depth=depth, bound=bound, best_move=NO_MOVE)
+        # frames: moves left to try, lowest estimated total exceeding bound below this position, the move leading to it
+        stack: list[list] = [[self.__get_moves(board, previous_move=previous_move, best_move=table.best_moves[entry] if entry >= 0 else NO_MOVE), math.inf, NO_MOVE]]
+        while True:
+            frame = stack[-1]
+            moves = frame[0]
+            if not moves:
+                table.store(board.hash, depth=depth + len(path), bound=bound, best_move=frame[2])
+                stack.pop()
+                if not path:
+                    return None, frame[1]
+                src_x, dest_x = path.pop()
+                board.move(dest_x, src_x)
+                parent = stack[-1]
+                if frame[1] < parent[1]:
+                    parent[1] = frame[1]
+                    parent[2] = src_x * self.nof_columns + dest_x
+                continue
+
+            src_x, dest_x = moves.pop()
+            board.move(src_x, dest_x)
+            self.stats.nodes_expanded += 1
+            if self.node_budget is not None and self.stats.nodes_expanded > self.node_budget:
+                raise SearchBudgetExceededError(f"Node budget exceeded: {self.node_budget}")
+            if self._is_cancelled is not None and not self.stats.nodes_expanded & 1023 and self._is_cancelled():
+                raise _SearchCancelledError()
+
+            g = depth + len(path) + 1
+            if g + board.h > bound:
+                if g + board.h < frame[1]:
+                    frame[1] = g + board.h
+                    frame[2] = src_x * self.nof_columns + dest_x
+                board.move(dest_x, src_x)
+                continue
+
+            if board.h == 0:
+                return path + [(src_x, dest_x)], math.inf
+
+            self.stats.cache_probes += 1
+            entry = table.probe(board.hash)
+            if entry >= 0 and table.bounds[entry] == bound and table.depths[entry] <= g:
+                # reached by no more moves before, including on the current path
+                self.stats.cache_hits += 1
+                board.move(dest_x, src_x)
+                continue
+
+            best_move = table.best_moves[entry] if entry >= 0 else NO_MOVE
+            table.store(board.hash, depth=g, bound=bound, best_move=best_move)
+            path.append((src_x, dest_x))
+            stack.append([self.__get_moves(board, previous_move=(src_x, dest_x), best_move=best_move), math.inf, NO_MOVE])
+
+    def find_winning_sequence(self, balls: list[int]) -> list[Move]:
+        """
+        balls: color of each position, empty_color for vacant positions. See get_ball_index.
+        Returns the moves, each from the top of one column to the top of another, in order.
+        """
+        self.stats = SearchStats()
+        self.result_cache.clear()
+        s = time.perf_counter()
+        try:
+            board = _SearchBoard(columns=self.__get_columns(balls), nof_colors=self.nof_colors, nof_rows=self.nof_rows, rng=random.Random(self.zobrist_seed))
+            bound: float = board.h
+            while True:
+                if bound == 0:
+                    return []
+                self.stats.iterations += 1
+                moves, bound = self.__search(board=board, bound=int(bound))
+                if moves is not None:
+                    return moves
+                if bound == math.inf:
+                    raise ValueError("Unwinnable starting position")
+        finally:
+            self.stats.elapsed = time.perf_counter() - s
+
+    def __get_frontier(self, board: _SearchBoard, min_size: int) -> tuple[list[list[Move]], list[Move] | None]:
+        """
+        Move sequences to the distinct positions a number of moves away from board, the fewest moves giving at least min_size positions.
+        Returns the sequences, in search order, or a solution if one is that close.
+        """
+        paths: list[list[Move]] = [[]]
+        seen = {board.hash}
+        while len(paths) < min_size:
+            next_paths: list[list[Move]] = []
+            for path in paths:
+                for src_x, dest_x in path:
+                    board.move(src_x, dest_x)
+                for move in reversed(self.__get_moves(board, previous_move=path[-1] if path else None, best_move=NO_MOVE)):
+                    board.move(*move)
+                    self.stats.nodes_expanded += 1
+                    if board.h == 0:
+                        return [], path + [move]
+                    if board.hash not in seen:
+                        seen.add(board.hash)
+                        next_paths.append(path + [move])
+                    board.move(move[1], move[0])
+                for src_x, dest_x in reversed(path):
+                    board.move(dest_x, src_x)
+            if not next_paths:
+                break
+            paths = next_paths
+        return paths, None
+
+    def _search_subtree(self, columns: list[list[int]], depth: int, previous_move: Move | None, bound: int) -> tuple[list[Move] | None, float]:
+        """One iteration from a frontier position. The transposition table starts empty, so the result does not depend on earlier tasks."""
+        self.result_cache.clear()
+        board = _SearchBoard(columns=columns, nof_colors=self.nof_colors, nof_rows=self.nof_rows, rng=random.Random(self.zobrist_seed))
+        return self.__search(board=board, bound=bound, depth=depth, previous_move=previous_move)
+
+    def find_winning_sequence_parallel(self, balls: list[int], max_workers: int | None = None) -> list[Move]:
+        """
+        find_winning_sequence, splitting each deepening iteration across worker processes.
+        The positions a few moves from the start are searched in parallel with the same bound.
+        Once a position is solved, positions later in search order are abandoned, and the solution from the first solved position wins.
+        The result does not depend on scheduling: a given position, zobrist_seed and max_workers always give the same moves.
+        node_budget limits the nodes expanded by each worker per iteration.
+        """
+        nof_workers = max_workers or os.cpu_count() or 1
+        self.stats = SearchStats()
+        s = time.perf_counter()
+        try:
+            board = _SearchBoard(columns=self.__get_columns(balls), nof_colors=self.nof_colors, nof_rows=self.nof_rows, rng=random.Random(self.zobrist_seed))
+            if board.h == 0:
+                return []
+            # a few positions per worker balances load
+            paths, moves = self.__get_frontier(board, min_size=nof_workers * 4)
+            if moves is not None:
+                return moves
+            depth = len(paths[0]) if paths else 0
+            estimates = []
+            tasks = []
+            for path in paths:
+                for src_x, dest_x in path:
+                    board.move(src_x, dest_x)
+                estimates.append(depth + board.h)
+                tasks.append(([list(column) for column in board.columns], path[-1] if path else None))
+                for src_x, dest_x in reversed(path):
+                    board.move(dest_x, src_x)
+
+            solved_index: Any = multiprocessing.Value("i", len(tasks))
+            params = (self.max_x, self.max_y, self.nof_empty_columns, self.node_budget, self.zobrist_seed, self.transposition_table_size_log2)
+            with ProcessPoolExecutor(max_workers=nof_workers, initializer=_init_worker, initargs=(params, solved_index)) as executor:
+                bound: float = min(estimates, default=math.inf)
+                while bound != math.inf:
+                    self.stats.iterations += 1
+                    solved_index.value = len(tasks)
+                    indexes = [i for i, estimate in enumerate(estimates) if estimate <= bound]
+                    futures = [executor.submit(_search_subtree_task, i, tasks[i][0], depth, tasks[i][1], int(bound)) for i in indexes]
+                    next_bound = min((estimate for estimate in estimates if estimate > bound), default=math.inf)
+                    solutions: dict[int, list[Move]] = {}
+                    for i, future in zip(indexes, futures):
+                        moves, task_bound, stats = future.result()
+                        self.stats.nodes_expanded += stats.nodes_expanded
+                        self.stats.cache_probes += stats.cache_probes
+                        self.stats.cache_hits += stats.cache_hits
+                        if moves is not None:
+                            solutions[i] = paths[i] + moves
+                        next_bound = min(next_bound, task_bound)
+                    if solutions:
+                        return solutions[min(solutions)]
+                    bound = next_bound
+            raise ValueError("Unwinnable starting position")
+        finally:
+            self.stats.elapsed = time.perf_counter() - s
+
+
+_worker_sorter: ColorSorter | None = None
+_worker_solved_index: Any = None
+
+
+def _init_worker(params: tuple, solved_index: Any):
+    global _worker_sorter, _worker_solved_index
+    max_x, max_y, nof_empty_columns, node_budget, zobrist_seed, transposition_table_size_log2 = params
+    _worker_sorter = ColorSorter(
+        max_x=max_x, max_y=max_y, nof_empty_columns=nof_empty_columns, node_budget=node_budget, zobrist_seed=zobrist_seed, transposition_table_size_log2=transposition_table_size_log2
+    )
+    _worker_solved_index = solved_index
+
+
+def _search_subtree_task(index: int, columns: list[list[int]], depth: int, previous_move: Move | None, bound: int) -> tuple[list[Move] | None, float, SearchStats]:
+    """Runs in a worker process. Gives up once an earlier frontier position is solved."""
+    assert _worker_sorter is not None
+    sorter = _worker_sorter
+    sorter.stats = SearchStats()
+    sorter._is_cancelled = lambda: _worker_solved_index.value < index
+    try:
+        moves, next_bound = sorter._search_subtree(columns=columns, depth=depth, previous_move=previous_move, bound=bound)
+    except _SearchCancelledError:
+        return None, math.inf, sorter.stats
+    if moves is not None:
+        with _worker_solved_index.get_lock():
+            _worker_solved_index.value = min(_worker_solved_index.value, index)
+    return moves, next_bound, sorter.stats
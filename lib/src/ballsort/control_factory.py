@@ -7,6 +7,7 @@ from ball_control_sim import BallControlSim
 #from ably_rest_update_reporter import AblyRestUpdateReporter
 from postmessage_update_reporter import PostMessageUpdateReporter
 #from dummy_ur import DummyUpdateReporter
+from update_reporter import UpdateReporter
 
 def get_control_sim(delay_multiplier: float = 1.0) -> BallControlSim:
     #reporter = V1UpdateReporter()
@@ -27,3 +28,13 @@ def get_ch4_control_sim(delay_multiplier: float = 1.0) -> BallControlCh4:
 
 def get_ch5_control_sim(delay_multiplier: float = 1.0) -> BallControlCh4:
     return get_ch4_control_sim(delay_multiplier=delay_multiplier)
+
+def get_headless_control_sim() -> BallControlSim:
+    """Returns a fast forward simulator that reports no updates. For batch evaluation of solutions."""
+    return BallControlSim(update_reporter=UpdateReporter(), delay_multiplier=0.0, fast_forward=True)
+
+def get_headless_ch2_control_sim() -> ball_control_ch2.BallControlCh2:
+    return ball_control_ch2.BallControlCh2(update_reporter=UpdateReporter(), delay_multiplier=0.0, fast_forward=True)
+
+def get_headless_ch4_control_sim() -> BallControlCh4:
+    return BallControlCh4(update_reporter=UpdateReporter(), delay_multiplier=0.0, fast_forward=True)
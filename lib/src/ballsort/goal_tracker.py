@@ -0,0 +1,133 @@
+from state_update_model import StateBall, StateModel
+
+SortedColumnTargets = dict[int, tuple[int, str | None]]  # x -> (expected number of balls, color)
+
+
+class GoalTracker(object):
+    """Interface for incremental goal state evaluation.
+    Receives every ball removed from or added to the top of a column and answers goal state queries in constant time."""
+
+    def on_ball_removed(self, ball: StateBall, x: int):
+        """A ball was removed from the top of column x"""
+        pass
+
+    def on_ball_added(self, ball: StateBall, x: int):
+        """A ball was added on top of column x"""
+        pass
+
+    def is_in_goal_state(self, state: StateModel) -> bool:
+        """Returns true only if state fulfills the goal state criteria."""
+        raise NotImplementedError
+
+    def _add_initial_balls(self, state: StateModel):
+        for ball in sorted(state.balls, key=lambda ball: ball.pos.y, reverse=True):
+            self.on_ball_added(ball=ball, x=ball.pos.x)
+
+
+def _no_ball_in_claws(state: StateModel) -> bool:
+    return all(claw.ball is None for claw in state.claws)
+
+
+def _get_value(ball: StateBall) -> int:
+    return 0 if ball.value is None else ball.value
+
+
+class SortedColumnsGoalTracker(GoalTracker):
+    """Goal: each target column holds a given number of balls, optionally of a single color, sorted by value. Lowest value on top."""
+
+    targets: SortedColumnTargets
+    columns: dict[int, list[StateBall]]  # target columns only, bottom to top
+    nof_matching: dict[int, int]  # balls of the target color in each target column
+    nof_unsorted: dict[int, int]  # number of balls placed on a lower value ball in each target column
+    nof_unsatisfied: int
+
+    def __init__(self, state: StateModel, targets: SortedColumnTargets):
+        self.targets = targets
+        self.columns = {x: [] for x in targets}
+        self.nof_matching = {x: 0 for x in targets}
+        self.nof_unsorted = {x: 0 for x in targets}
+        self.nof_unsatisfied = len([count for count, _ in targets.values() if count != 0])
+        self._add_initial_balls(state)
+
+    def _is_column_satisfied(self, x: int) -> bool:
+        expected_count, _ = self.targets[x]
+        return (
+            self.nof_matching[x] == expected_count
+            and len(self.columns[x]) == expected_count
+            and self.nof_unsorted[x] == 0
+        )
+
+    def _update_column(self, ball: StateBall, x: int, added: bool):
+        column = self.columns.get(x)
+        if column is None:
+            return
+
+        was_satisfied = self._is_column_satisfied(x)
+        sign = 1 if added else -1
+        if not added:
+            column.pop()
+        if column and _get_value(ball) > _get_value(column[-1]):
+            self.nof_unsorted[x] += sign
+        _, color = self.targets[x]
+        if color is None or ball.color == color:
+            self.nof_matching[x] += sign
+        if added:
+            column.append(ball)
+
+        is_satisfied = self._is_column_satisfied(x)
+        if was_satisfied != is_satisfied:
+            self.nof_unsatisfied += -1 if is_satisfied else 1
+
+    def on_ball_removed(self, ball: StateBall, x: int):
+        self._update_column(ball=ball, x=x, added=False)
+
+    def on_ball_added(self, ball: StateBall, x: int):
+        self._update_column(ball=ball, x=x, added=True)
+
+    def is_in_goal_state(self, state: StateModel) -> bool:
+        return self.nof_unsatisfied == 0 and _no_ball_in_claws(state)
+
+
+class SingleColorColumnsGoalTracker(GoalTracker):
+    """Goal: every column is either empty or completely filled with balls of a single color."""
+
+    column_height: int
+    columns: dict[int, list[StateBall]]  # bottom to top
+    nof_mixed: dict[int, int]  # number of balls placed on a ball of different color in each column
+    nof_unsatisfied: int
+
+    def __init__(self, state: StateModel):
+        self.column_height = state.max_y + 1
+        self.columns = {x: [] for x in range(state.max_x + 1)}
+        self.nof_mixed = {x: 0 for x in self.columns}
+        self.nof_unsatisfied = 0
+        self._add_initial_balls(state)
+
+    def _is_column_satisfied(self, x: int) -> bool:
+        column = self.columns[x]
+        return len(column) == 0 or (len(column) == self.column_height and self.nof_mixed[x] == 0)
+
+    def _update_column(self, ball: StateBall, x: int, added: bool):
+        column = self.columns.setdefault(x, [])
+        self.nof_mixed.setdefault(x, 0)
+
+        was_satisfied = self._is_column_satisfied(x)
+        if not added:
+            column.pop()
+        if column and ball.color != column[-1].color:
+            self.nof_mixed[x] += 1 if added else -1
+        if added:
+            column.append(ball)
+
+        is_satisfied = self._is_column_satisfied(x)
+        if was_satisfied != is_satisfied:
+            self.nof_unsatisfied += -1 if is_satisfied else 1
+
+    def on_ball_removed(self, ball: StateBall, x: int):
+        self._update_column(ball=ball, x=x, added=False)
+
+    def on_ball_added(self, ball: StateBall, x: int):
+        self._update_column(ball=ball, x=x, added=True)
+
+    def is_in_goal_state(self, state: StateModel) -> bool:
+        return self.nof_unsatisfied == 0 and _no_ball_in_claws(state)
@@ -0,0 +1,202 @@
+import asyncio
+from dataclasses import replace
+from typing import Any, Awaitable, Callable
+
+from ball_control_sim import BallControlSim
+from coalescing_update_reporter import merge_updates
+from goal_tracker import GoalTracker, SortedColumnTargets
+from scenario import Scenario, ScenarioProgress
+from state_update_model import (
+    BoardUpdateModel,
+    MultiBoardUpdateModel,
+    StateBall,
+    StateDeltaUpdateModel,
+    StateModel,
+    StateUpdateModel,
+)
+from state_utils import snapshot_state
+from update_reporter import UpdateReporter
+
+
+class BatchedUpdateReporter(UpdateReporter):
+    """
+    Collects updates from many boards and reports them together once per tick.
+    Only the latest update of each board is kept, so pending updates never outnumber the boards.
+    Adding an update keeps a snapshot of it, as the board goes on changing its state during the tick.
+    Boards must send full updates. Errors raised by the wrapped reporter at the end of a tick are raised again by the next add, flush or shutdown.
+    """
+
+    update_reporter: UpdateReporter
+    tick_interval: float
+    tick: int
+    _pending: dict[int, StateUpdateModel]
+    _error: Exception | None
+    _flush_task: asyncio.Task | None
+
+    def __init__(self, update_reporter: UpdateReporter, tick_interval: float = 0.1):
+        self.update_reporter = update_reporter
+        self.tick_interval = tick_interval
+        self.tick = 0
+        self._pending = {}
+        self._error = None
+        self._flush_task = None
+
+    def get_board_reporter(self, board: int) -> UpdateReporter:
+        return _BoardUpdateReporter(batch=self, board=board)
+
+    def add(self, board: int, stateUpdate: StateUpdateModel):
+        self.__raise_error()
+        stateUpdate = replace(stateUpdate, state=snapshot_state(stateUpdate.state))
+        pending = self._pending.get(board)
+        if pending is not None:
+            # keep balls and dimensions reported earlier in this tick
+            stateUpdate = merge_updates(pending, stateUpdate)
+        self._pending[board] = stateUpdate
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self.__flush_after_tick())
+
+    async def __flush_after_tick(self):
+        await asyncio.sleep(self.tick_interval)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as error:
+            if self._error is None:
+                self._error = error
+
+    def __raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    async def flush(self):
+        """Reports all pending updates"""
+        self.__raise_error()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self.tick += 1
+        await self.update_reporter.send_multi_board_update(
+            MultiBoardUpdateModel(tick=self.tick, updates=[BoardUpdateModel(board=board, update=update) for board, update in sorted(pending.items())])
+        )
+
+    async def shutdown(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        try:
+            await self.flush()
+        finally:
+            await self.update_reporter.shutdown()
+
+
+class _BoardUpdateReporter(UpdateReporter):
+    """Forwards the updates of one board to a BatchedUpdateReporter"""
+
+    __slots__ = ("batch", "board")
+
+    def __init__(self, batch: BatchedUpdateReporter, board: int):
+        self.batch = batch
+        self.board = board
+
+    async def send_update(self, stateUpdate: StateUpdateModel):
+        self.batch.add(board=self.board, stateUpdate=stateUpdate)
+
+    async def send_delta_update(self, deltaUpdate: StateDeltaUpdateModel):
+        raise ValueError("Boards of a BatchedUpdateReporter must send full updates. Create them with delta_updates=False.")
+
+
+def _copy_ball(ball: StateBall) -> StateBall:
+    return replace(ball, pos=replace(ball.pos))
+
+
+def _copy_state(state: StateModel) -> StateModel:
+    return replace(
+        state,
+        balls=[_copy_ball(ball) for ball in state.balls],
+        claws=[replace(claw, pos=replace(claw.pos), ball=_copy_ball(claw.ball) if claw.ball else None) for claw in state.claws],
+        spotlight=replace(state.spotlight, pos=replace(state.spotlight.pos)) if state.spotlight else None,
+        highlights=[replace(highlight) for highlight in state.highlights] if state.highlights is not None else None,
+    )
+
+
+class ScenarioTemplate(Scenario):
+    """
+    Shares one scenario between many boards.
+    The initial state is generated once. Each board gets a copy.
+    """
+
+    scenario: Scenario
+    _initial_state: StateModel | None
+
+    def __init__(self, scenario: Scenario):
+        super().__init__(seed=scenario._seed)
+        self.scenario = scenario
+        self._initial_state = None
+
+    def get_initial_state(self) -> StateModel:
+        if self._initial_state is None:
+            self._initial_state = self.scenario.get_initial_state()
+        return _copy_state(self._initial_state)
+
+    def get_progress(self, state: StateModel) -> ScenarioProgress:
+        return self.scenario.get_progress(state)
+
+    def is_in_goal_state(self, state: StateModel) -> bool:
+        return self.scenario.is_in_goal_state(state)
+
+    def get_goal_tracker(self, state: StateModel) -> GoalTracker | None:
+        return self.scenario.get_goal_tracker(state)
+
+    def get_sorted_column_targets(self, state: StateModel) -> SortedColumnTargets | None:
+        return self.scenario.get_sorted_column_targets(state)
+
+    def get_goal_state_description(self) -> str:
+        return self.scenario.get_goal_state_description()
+
+    def on_ball_dropped(self, state: StateModel, ball: StateBall) -> tuple[StateModel, bool]:
+        return self.scenario.on_ball_dropped(state, ball)
+
+
+class MultiBoardSim:
+    """
+    Hosts many independent boards in one event loop.
+    Each board is a BallControlSim. All boards report through a single BatchedUpdateReporter.
+    """
+
+    boards: list[BallControlSim]
+    update_reporter: BatchedUpdateReporter
+
+    def __init__(self, update_reporter: UpdateReporter, nof_boards: int, delay_multiplier: float = 1.0, tick_interval: float = 0.1, control_class: type[BallControlSim] = BallControlSim):
+        self.update_reporter = BatchedUpdateReporter(update_reporter=update_reporter, tick_interval=tick_interval)
+        self.boards = [control_class(update_reporter=self.update_reporter.get_board_reporter(board), delay_multiplier=delay_multiplier) for board in range(nof_boards)]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.update_reporter.shutdown()
+
+    def __len__(self) -> int:
+        return len(self.boards)
+
+    def get_board(self, board: int) -> BallControlSim:
+        return self.boards[board]
+
+    def _get_boards(self, boards: list[int] | None) -> list[BallControlSim]:
+        return self.boards if boards is None else [self.boards[board] for board in boards]
+
+    async def set_scenario(self, scenario: Scenario, boards: list[int] | None = None):
+        """Sets the same scenario on the given boards, default all"""
+        template = ScenarioTemplate(scenario)
+        for board in self._get_boards(boards):
+            await board.set_scenario(template)
+
+    async def run(self, solution: Callable[[BallControlSim], Awaitable[Any]], boards: list[int] | None = None) -> list[BaseException | None]:
+        """Runs solution concurrently on the given boards, default all. Returns the exception raised on each board, if any."""
+        results = await asyncio.gather(*[solution(board) for board in self._get_boards(boards)], return_exceptions=True)
+        return [result if isinstance(result, BaseException) else None for result in results]
+
+    def get_nof_goals_accomplished(self) -> int:
+        return len([board for board in self.boards if board.state.goal_accomplished])
@@ -1,8 +1,7 @@
 import asyncio
-import json
-from dataclasses import asdict
 from update_reporter import UpdateReporter
-from state_update_model import StateUpdateModel
+from update_serializer import JsonSerializer, UpdateSerializer
+from state_update_model import MultiBoardUpdateModel, StateDeltaUpdateModel, StateUpdateModel
 from IPython.display import display,Javascript
 
 
@@ -11,10 +10,25 @@ class PostMessageUpdateReporter(UpdateReporter):
     """UpdateReporter using window.postMessage to push updates"""
 
     client_lock = asyncio.Lock()
+    serializer: UpdateSerializer
+
+    def __init__(self, serializer: UpdateSerializer | None = None):
+        """serializer: must produce JSON text. Default: JsonSerializer."""
+        self.serializer = serializer if serializer is not None else JsonSerializer()
 
     async def send_update(self, stateUpdate: StateUpdateModel):
+        await self._post_message(self.serializer.serialize_update(stateUpdate))
+
+    async def send_delta_update(self, deltaUpdate: StateDeltaUpdateModel):
+        await self._post_message(self.serializer.serialize_delta_update(deltaUpdate))
+
+    async def send_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel):
+        await self._post_message(self.serializer.serialize_multi_board_update(multiBoardUpdate))
+
+    async def _post_message(self, stringified_obj: str | bytes):
+        if not isinstance(stringified_obj, str):
+            raise TypeError(f"{type(self.serializer).__name__} does not produce text. postMessage needs a JSON serializer.")
         async with self.client_lock:
-            stringified_obj = json.dumps(asdict(stateUpdate))
             display_obj = Javascript(f"""
                 var existingWin = window.bswin;
                 existingWin && existingWin.postMessage('{stringified_obj}', "*");    
@@ -0,0 +1,153 @@
+import asyncio
+from collections import deque
+from dataclasses import replace
+
+from coalescing_update_reporter import merge_delta_updates, merge_updates
+from state_update_model import BoardUpdateModel, MultiBoardUpdateModel, StateDeltaUpdateModel, StateUpdateModel
+from state_utils import snapshot_state
+from update_reporter import UpdateReporter
+
+# what send_update does when the queue is full
+BLOCK = "block"  # waits for room
+DROP_OLDEST = "drop_oldest"  # discards the oldest queued update
+COALESCE = "coalesce"  # merges the update into the newest queued one if possible, otherwise waits for room
+POLICIES = (BLOCK, DROP_OLDEST, COALESCE)
+
+Update = StateUpdateModel | StateDeltaUpdateModel | MultiBoardUpdateModel
+
+
+def _snapshot(update: Update) -> Update:
+    if isinstance(update, StateUpdateModel):
+        return replace(update, state=snapshot_state(update.state))
+    if isinstance(update, MultiBoardUpdateModel):
+        return replace(update, updates=[BoardUpdateModel(board=board_update.board, update=_snapshot(board_update.update)) for board_update in update.updates])  # type: ignore[arg-type]
+    return update  # deltas are created per update
+
+
+class QueuedUpdateReporter(UpdateReporter):
+    """
+    Reports updates from a background task, so commands do not wait for a slow reporter.
+    Sending an update enqueues a snapshot of it. When max_size updates are queued, policy decides what happens:
+    BLOCK waits for room, DROP_OLDEST discards the oldest update, COALESCE merges the update into the newest queued update.
+    With delta updates, dropping a delta leaves clients out of date until the next keyframe.
+    Errors raised by the wrapped reporter are raised again by flush and shutdown.
+    """
+
+    update_reporter: UpdateReporter
+    max_size: int
+    policy: str
+    nof_received: int
+    nof_reported: int  # delivered by the wrapped reporter
+    nof_failed: int  # the wrapped reporter raised
+    nof_dropped: int
+    nof_coalesced: int
+    _queue: deque[Update]
+    _condition: asyncio.Condition
+    _reporting: bool
+    _error: Exception | None
+    _task: asyncio.Task | None
+
+    def __init__(self, update_reporter: UpdateReporter, max_size: int = 64, policy: str = BLOCK):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy}. Expected one of {', '.join(POLICIES)}.")
+        if max_size < 1:
+            raise ValueError("max_size must be positive")
+        self.update_reporter = update_reporter
+        self.max_size = max_size
+        self.policy = policy
+        self.nof_received = 0
+        self.nof_reported = 0
+        self.nof_failed = 0
+        self.nof_dropped = 0
+        self.nof_coalesced = 0
+        self._queue = deque()
+        self._condition = asyncio.Condition()
+        self._reporting = False
+        self._error = None
+        self._task = None
+
+    async def send_update(self, stateUpdate: StateUpdateModel):
+        await self.__enqueue(_snapshot(stateUpdate))
+
+    async def send_delta_update(self, deltaUpdate: StateDeltaUpdateModel):
+        await self.__enqueue(deltaUpdate)
+
+    async def send_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel):
+        await self.__enqueue(_snapshot(multiBoardUpdate))
+
+    def get_nof_queued(self) -> int:
+        return len(self._queue)
+
+    async def __enqueue(self, update: Update):
+        self.nof_received += 1
+        if self._task is None:
+            self._task = asyncio.create_task(self.__report_queued())
+        async with self._condition:
+            if len(self._queue) >= self.max_size:
+                if self.policy == DROP_OLDEST:
+                    self._queue.popleft()
+                    self.nof_dropped += 1
+                elif self.policy == COALESCE and self.__coalesce(update):
+                    self.nof_coalesced += 1
+                    return
+                else:
+                    await self._condition.wait_for(lambda: len(self._queue) < self.max_size)
+            self._queue.append(update)
+            self._condition.notify_all()
+
+    def __coalesce(self, update: Update) -> bool:
+        """Merges the update into the newest queued update. Returns false if they can not be merged."""
+        newest = self._queue[-1]
+        if isinstance(newest, StateUpdateModel) and isinstance(update, StateUpdateModel):
+            self._queue[-1] = merge_updates(newest, update)
+        elif isinstance(newest, StateDeltaUpdateModel) and isinstance(update, StateDeltaUpdateModel):
+            self._queue[-1] = merge_delta_updates(newest, update)
+        elif isinstance(newest, StateDeltaUpdateModel) and isinstance(update, StateUpdateModel) and update.state.balls is not None and update.state.max_x != 0:
+            self._queue[-1] = update  # a keyframe supersedes the delta
+        else:
+            return False
+        return True
+
+    async def __report_queued(self):
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: len(self._queue) > 0)
+                update = self._queue.popleft()
+                self._reporting = True
+                self._condition.notify_all()
+            reported = False
+            try:
+                if isinstance(update, StateUpdateModel):
+                    await self.update_reporter.send_update(update)
+                elif isinstance(update, StateDeltaUpdateModel):
+                    await self.update_reporter.send_delta_update(update)
+                else:
+                    await self.update_reporter.send_multi_board_update(update)
+                reported = True
+            except Exception as error:
+                if self._error is None:
+                    self._error = error
+            async with self._condition:
+                if reported:
+                    self.nof_reported += 1
+                else:
+                    self.nof_failed += 1
+                self._reporting = False
+                self._condition.notify_all()
+
+    async def flush(self):
+        """Waits until all queued updates have been reported"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._queue and not self._reporting)
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    async def shutdown(self):
+        try:
+            await self.flush()
+        finally:
+            if self._task is not None:
+                self._task.cancel()
+                self._task = None
+            await self.update_reporter.shutdown()
@@ -0,0 +1,220 @@
+import bisect
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterator
+
+from state_update_model import MultiBoardUpdateModel, StateDeltaUpdateModel, StateUpdateModel
+from update_reporter import UpdateReporter
+from update_serializer import BinarySerializer
+
+_LOG_HEADER = b"BSLOG\x01"  # magic, format version
+_RECORD = struct.Struct("<II")  # payload length, seq. Followed by a BinarySerializer message.
+_INDEX_ENTRY = struct.Struct("<QIQ")  # record number, seq, offset of the record in the log
+
+
+def get_index_path(path: str) -> str:
+    return path + ".idx"
+
+
+class RecordingUpdateReporter(UpdateReporter):
+    """
+    Appends updates to a log file, for replay with ReplayReader.
+    Each record is the length and seq of a BinarySerializer message, followed by the message. Multi board updates are recorded with their tick as seq.
+    Every index_interval:th record is also listed in a sparse index file next to the log.
+    Writes are buffered. Call flush, or shutdown, to make the records readable.
+    Appending to an existing log continues it. Seqs must not decrease, for ReplayReader to find them,
+    so record each simulator, whose seqs start over at 1, to a log of its own. Appending a lower seq raises ValueError.
+    """
+
+    path: str
+    index_interval: int
+    nof_records: int  # in the log, including those recorded earlier
+    last_seq: int  # of the last record, 0 if there is none
+    _serializer: BinarySerializer
+    _log: BinaryIO
+    _index: BinaryIO
+    _offset: int  # of the next record
+
+    def __init__(self, path: str, index_interval: int = 256, buffer_size: int = 1 << 16):
+        self.path = path
+        self.index_interval = index_interval
+        self._serializer = BinarySerializer()
+        self.nof_records = 0
+        self.last_seq = 0
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size >= len(_LOG_HEADER):
+            # raises ValueError if the file is not a log
+            with ReplayReader(path, index_interval=index_interval) as reader:
+                self.nof_records = len(reader)
+                self.last_seq = reader.last_seq
+                end_offset = reader.end_offset
+                index_entries = [_INDEX_ENTRY.pack(*entry) for entry in reader.get_index_entries()]
+            # drop a partially written last record, and index entries of records that were never written
+            os.truncate(path, end_offset)
+            with open(get_index_path(path), "wb") as index_file:
+                index_file.write(b"".join(index_entries))
+        elif size > 0:
+            # the header was not written completely
+            os.truncate(path, 0)
+        self._log = open(path, "ab", buffering=buffer_size)
+        self._offset = self._log.tell()
+        if self._offset == 0:
+            self._log.write(_LOG_HEADER)
+            self._offset = len(_LOG_HEADER)
+        # an index left from an earlier log lists records that are not in this one
+        self._index = open(get_index_path(path), "ab" if self.nof_records else "wb", buffering=buffer_size)
+
+    async def send_update(self, stateUpdate: StateUpdateModel):
+        self.__append(stateUpdate.seq, self._serializer.serialize_update(stateUpdate))
+
+    async def send_delta_update(self, deltaUpdate: StateDeltaUpdateModel):
+        self.__append(deltaUpdate.seq, self._serializer.serialize_delta_update(deltaUpdate))
+
+    async def send_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel):
+        self.__append(multiBoardUpdate.tick, self._serializer.serialize_multi_board_update(multiBoardUpdate))
+
+    def __append(self, seq: int, message: bytes):
+        if seq < self.last_seq:
+            raise ValueError(f"seq {seq} is lower than the last recorded seq {self.last_seq}. Record each simulator to a log of its own.")
+        self.last_seq = seq
+        if self.nof_records % self.index_interval == 0:
+            self._index.write(_INDEX_ENTRY.pack(self.nof_records, seq, self._offset))
+        self._log.write(_RECORD.pack(len(message), seq))
+        self._log.write(message)
+        self._offset += _RECORD.size + len(message)
+        self.nof_records += 1
+
+    def flush(self):
+        """Writes buffered records to the file"""
+        self._log.flush()
+        self._index.flush()
+
+    async def shutdown(self):
+        if not self._log.closed:
+            self.flush()
+            self._log.close()
+            self._index.close()
+
+
+class ReplayReader:
+    """
+    Reads a log written by RecordingUpdateReporter without loading it.
+    The log is memory mapped, and records are parsed when read. Finding a seq bisects the sparse index, then steps over at most index_interval records.
+    A missing or outdated index file is completed by scanning the records after its last entry. A partially written last record is ignored, as are records appended after the reader was opened.
+    """
+
+    path: str
+    end_offset: int  # after the last complete record
+    last_seq: int  # of the last complete record, 0 if there is none
+    _file: BinaryIO
+    _map: mmap.mmap
+    _serializer: BinarySerializer
+    _index_numbers: list[int]  # record numbers
+    _index_seqs: list[int]
+    _index_offsets: list[int]
+    _nof_records: int
+
+    def __init__(self, path: str, index_interval: int = 256):
+        self.path = path
+        self._serializer = BinarySerializer()
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(_LOG_HEADER)] != _LOG_HEADER:
+            self.close()
+            raise ValueError(f"{path} is not an update log")
+        self.__load_index(index_interval)
+
+    def __enter__(self) -> "ReplayReader":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        if not self._map.closed:
+            self._map.close()
+            self._file.close()
+
+    def __len__(self) -> int:
+        """Number of records"""
+        return self._nof_records
+
+    def __load_index(self, index_interval: int):
+        self._index_numbers = []
+        self._index_seqs = []
+        self._index_offsets = []
+        record_number = 0
+        offset = len(_LOG_HEADER)
+        index_path = get_index_path(self.path)
+        if os.path.exists(index_path):
+            with open(index_path, "rb") as index_file:
+                entries = index_file.read()
+            for number, seq, entry_offset in _INDEX_ENTRY.iter_unpack(entries[: len(entries) - len(entries) % _INDEX_ENTRY.size]):
+                if entry_offset + _RECORD.size > len(self._map) or entry_offset + _RECORD.size + _RECORD.unpack_from(self._map, entry_offset)[0] > len(self._map):
+                    break  # the record was not written completely
+                if _RECORD.unpack_from(self._map, entry_offset)[1] != seq:
+                    break  # the index belongs to another log
+                self._index_numbers.append(number)
+                self._index_seqs.append(seq)
+                self._index_offsets.append(entry_offset)
+                record_number, offset = number, entry_offset
+
+        # records after the last index entry
+        size = len(self._map)
+        self.last_seq = 0
+        while offset + _RECORD.size <= size:
+            length, seq = _RECORD.unpack_from(self._map, offset)
+            if offset + _RECORD.size + length > size:
+                break
+            self.last_seq = seq
+            if record_number % index_interval == 0 and (not self._index_offsets or self._index_offsets[-1] < offset):
+                self._index_numbers.append(record_number)
+                self._index_seqs.append(seq)
+                self._index_offsets.append(offset)
+            offset += _RECORD.size + length
+            record_number += 1
+        self._nof_records = record_number
+        self.end_offset = offset
+
+    def get_index_entries(self) -> list[tuple[int, int, int]]:
+        """Record number, seq and offset of the indexed records, including those indexed while scanning the log"""
+        return list(zip(self._index_numbers, self._index_seqs, self._index_offsets))
+
+    def seek(self, seq: int) -> int:
+        """Offset of the first record with at least the given seq. end_offset if there is none."""
+        i = bisect.bisect_right(self._index_seqs, seq) - 1
+        # an earlier entry may have the same seq
+        while i > 0 and self._index_seqs[i] == seq:
+            i -= 1
+        offset = self._index_offsets[i] if i >= 0 else len(_LOG_HEADER)
+        while offset < self.end_offset:
+            length, record_seq = _RECORD.unpack_from(self._map, offset)
+            if record_seq >= seq:
+                return offset
+            offset += _RECORD.size + length
+        return offset
+
+    def read(self, offset: int) -> tuple[int, StateUpdateModel | StateDeltaUpdateModel | MultiBoardUpdateModel, int]:
+        """The seq and update of the record at offset, and the offset of the next record"""
+        length, seq = _RECORD.unpack_from(self._map, offset)
+        update = self._serializer.deserialize(self._map, offset + _RECORD.size)
+        return seq, update, offset + _RECORD.size + length
+
+    def get_update(self, seq: int) -> StateUpdateModel | StateDeltaUpdateModel | MultiBoardUpdateModel:
+        """The first update with the given seq. Raises KeyError if there is none."""
+        offset = self.seek(seq)
+        if offset < self.end_offset:
+            record_seq, update, _ = self.read(offset)
+            if record_seq == seq:
+                return update
+        raise KeyError(seq)
+
+    def iter_updates(self, start_seq: int = 0, end_seq: int | None = None) -> Iterator[StateUpdateModel | StateDeltaUpdateModel | MultiBoardUpdateModel]:
+        """Updates from start_seq up to, not including, end_seq"""
+        offset = self.seek(start_seq)
+        while offset < self.end_offset:
+            seq, update, offset = self.read(offset)
+            if end_seq is not None and seq >= end_seq:
+                return
+            yield update
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, replace
+from dataclasses import dataclass
 from state_update_model import StateBall, StateModel, StatePosition
 
 @dataclass
@@ -18,4 +18,4 @@ class RevealAction:
         if state.balls[ball_index].label == "?":
             state.balls[ball_index].label = f"{state.balls[ball_index].value}"
 
-        return replace(state, balls=state.balls), True
+        return state, True
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from goal_tracker import GoalTracker, SortedColumnTargets
 from state_update_model import StateBall, StateModel
 
 @dataclass
@@ -27,6 +28,14 @@ class Scenario(object):
         """Returns true only if state fulfills the goal state criteria."""
         raise NotImplementedError
 
+    def get_goal_tracker(self, state: StateModel) -> GoalTracker | None:
+        """Overridable. Returns an incremental goal state evaluator initialized with state, or None to evaluate the full state after every move."""
+        return None
+
+    def get_sorted_column_targets(self, state: StateModel) -> SortedColumnTargets | None:
+        """Overridable. Returns the target columns if the goal is to sort balls by value in them. Enables vectorized goal checks on large boards."""
+        return None
+
     def get_goal_state_description(self) -> str:
         """Returns a natural language specification of goal state."""
         raise NotImplementedError
@@ -1,6 +1,11 @@
-from dataclasses import dataclass, replace
-from scenario import Scenario
-from state_utils import get_ball_at_current_pos
+from dataclasses import dataclass
+import itertools
+from board_arrays import NUMPY_MIN_BALLS, BoardArrays, is_numpy_available
+from board_index import BoardIndex
+from claw_bounds import ClawBounds
+from goal_tracker import GoalTracker
+from scenario import Scenario, ScenarioProgress
+from state_utils import get_ball_at_current_pos, get_nof_balls
 from state_validator import StateValidator
 from state_update_model import (
     StateModel,
@@ -14,36 +19,102 @@ class StateManager:
 
     validator: StateValidator
     scenario: Scenario | None
+    index: BoardIndex
+    claw_bounds: ClawBounds
+    goal_tracker: GoalTracker | None
+    arrays: BoardArrays | None # maintained for large boards with sorted column goals, if numpy is installed
+    nof_ball_moves: int # balls dropped since the scenario was set
+    _ball_ids: itertools.count
 
     def __init__(self, scenario : Scenario | None = None):
         self.validator = StateValidator()
         self.scenario = scenario
+        self.index = BoardIndex()
+        self.claw_bounds = ClawBounds()
+        self.goal_tracker = None
+        self.arrays = None
+        self.nof_ball_moves = 0
+        self._ball_ids = itertools.count(1)
+
+    def allocate_ball_id(self) -> int:
+        """
+        Returns an id not used by any other ball on this board. Ids start at 1 for each scenario.
+        Not thread safe. A board is used from one event loop.
+        A ball created outside set_scenario keeps the default id 0, which it shares with every other such ball.
+        Ball snapshots and BoardArrays are keyed by id, so such balls must not be put on a board.
+        """
+        return next(self._ball_ids)
+
+    def _get_index(self, state: StateModel) -> BoardIndex:
+        if not self.index.is_current(state):
+            self.index.rebuild(state)
+        return self.index
+
+    def get_index(self, state: StateModel) -> BoardIndex:
+        """Index of the balls on the board, for read only queries"""
+        return self._get_index(state)
+
+    def _get_claw_bounds(self, state: StateModel) -> ClawBounds:
+        if not self.claw_bounds.is_current(state):
+            self.claw_bounds.rebuild(state)
+        return self.claw_bounds
+
+    def get_reachable_interval(self, state: StateModel, claw_index: int) -> tuple[int, int]:
+        """Columns the claw can move to now, inclusive"""
+        return self._get_claw_bounds(state).get_reachable_interval(state, claw_index=claw_index)
 
     def _check_goal_state(self, state: StateModel) -> StateModel:
         if self.scenario is None:
             return state
-        goal_accomplished = self.scenario.is_in_goal_state(state)
+        if self.goal_tracker is not None:
+            goal_accomplished = self.goal_tracker.is_in_goal_state(state)
+        else:
+            goal_accomplished = self.scenario.is_in_goal_state(state)
         if (goal_accomplished and not state.goal_accomplished):
             print("Goal accomplished! 😁")
         state.goal_accomplished = goal_accomplished
         return state
 
+    def is_in_goal_state(self, state: StateModel) -> bool:
+        if self.scenario is None:
+            return False
+        targets = self.scenario.get_sorted_column_targets(state) if self.arrays is not None else None
+        if self.arrays is not None and targets is not None:
+            return self.arrays.are_columns_sorted(targets)
+        return self.scenario.is_in_goal_state(state)
+
+    def get_progress(self, state: StateModel) -> ScenarioProgress:
+        if self.scenario is None:
+            return ScenarioProgress(completed=0, total=0)
+        targets = self.scenario.get_sorted_column_targets(state) if self.arrays is not None else None
+        if self.arrays is not None and targets is not None:
+            return self.arrays.get_sorted_columns_progress(targets)
+        return self.scenario.get_progress(state)
+
     def set_scenario(self, state: StateModel, scenario: Scenario) -> StateModel:
         self.scenario = scenario
         state = scenario.get_initial_state()
+        self._ball_ids = itertools.count(1)
+        for ball in state.balls + [claw.ball for claw in state.claws if claw.ball]:
+            ball.id = self.allocate_ball_id()
+        self.index.rebuild(state)
+        self.claw_bounds.rebuild(state)
+        self.goal_tracker = scenario.get_goal_tracker(state)
+        use_arrays = is_numpy_available() and get_nof_balls(state) >= NUMPY_MIN_BALLS and scenario.get_sorted_column_targets(state) is not None
+        self.arrays = BoardArrays.from_state(state) if use_arrays else None
+        self.nof_ball_moves = 0
         print(f"Goal:\n{scenario.get_goal_state_description()}")
         return state
 
     def _move_relative(self, state: StateModel, x: int, y: int, claw_index: int) -> StateModel:
         newX = state.claws[claw_index].pos.x + x
         newY = state.claws[claw_index].pos.y + y
-        newClawState = replace(state.claws[claw_index], pos=StatePosition(x = newX, y = newY))
-        state.claws[claw_index] = newClawState
+        state.claws[claw_index].pos = StatePosition(x = newX, y = newY)
         #print(f"new position: {newX}, {newY}")
         return state
 
     def move_horizontally_start(self, state: StateModel, distance: int, claw_index: int) -> StateModel:
-        self.validator.move_horizontally(state=state, distance=distance, claw_index=claw_index)
+        self.validator.move_horizontally(state=state, distance=distance, claw_index=claw_index, bounds=self._get_claw_bounds(state))
         state.claws[claw_index].moving_horizontally = True
         return self._move_relative(state=state,x=distance, y=0, claw_index=claw_index)
     
@@ -61,7 +132,8 @@ class StateManager:
         return state
 
     def open_claw_start(self, state: StateModel, claw_index: int) -> StateModel:
-        self.validator.open_claw(state, claw_index=claw_index)
+        index = self._get_index(state)
+        self.validator.open_claw(state, claw_index=claw_index, index=index)
         state.claws[claw_index].operating_claw = True
         state.claws[claw_index].open = True
         #print(f"opening claw")
@@ -71,34 +143,51 @@ class StateManager:
             return state
         
         print(f"{claw_index} dropping {ball_in_claw} at {state.claws[claw_index].pos}")
-        newBall = replace(ball_in_claw, pos = state.claws[claw_index].pos)
+        ball_in_claw.pos = state.claws[claw_index].pos
         state.claws[claw_index].ball = None
-        state.balls.append(newBall)
+        index.append_ball(ball_in_claw)
+        if self.arrays is not None:
+            self.arrays.move_ball(ball_in_claw)
+        self.nof_ball_moves += 1
+        if self.goal_tracker is not None:
+            self.goal_tracker.on_ball_added(ball=ball_in_claw, x=ball_in_claw.pos.x)
         return self._check_goal_state(state)
 
     def close_claw_start(self, state: StateModel, claw_index: int) -> StateModel:
-        self.validator.close_claw(state, claw_index=claw_index)
+        index = self._get_index(state)
+        self.validator.close_claw(state, claw_index=claw_index, index=index)
         state.claws[claw_index].operating_claw = True
         state.claws[claw_index].open = False
         #print(f"closing claw")
-        ball_to_grab = get_ball_at_current_pos(state, claw_index=claw_index)
+        ball_to_grab = get_ball_at_current_pos(state, claw_index=claw_index, index=index)
         if not ball_to_grab:
             return state
         print(f"{claw_index} grabbing {ball_to_grab} at {state.claws[claw_index].pos}")
         state.claws[claw_index].ball = ball_to_grab
         #remove ball from list
-        state.balls = [ball for ball in state.balls if ball.pos != ball_to_grab.pos]
+        index.pop_ball(ball_to_grab)
+        if self.arrays is not None:
+            self.arrays.remove_ball(ball_to_grab)
+        if self.goal_tracker is not None:
+            self.goal_tracker.on_ball_removed(ball=ball_to_grab, x=ball_to_grab.pos.x)
         return self._check_goal_state(state)
 
     def open_claw_end(self, state: StateModel, claw_index: int, ball_dropped: bool) -> tuple[StateModel, bool]:
         newState = state
         newState.claws[claw_index].operating_claw = False
 
-        dropped_ball = next((ball for ball in state.balls if ball.pos == state.claws[claw_index].pos), None)
-        if not ball_dropped or not dropped_ball or not self.scenario:
+        if not ball_dropped or not self.scenario:
+            return newState, False
+
+        dropped_ball = get_ball_at_current_pos(state, claw_index=claw_index, index=self._get_index(state))
+        if not dropped_ball:
             return newState, False
         
-        return self.scenario.on_ball_dropped(state, dropped_ball)
+        state, changed = self.scenario.on_ball_dropped(state, dropped_ball)
+        if changed and self.arrays is not None:
+            # the scenario may have revealed values
+            self.arrays.update_visibility(state.balls + [claw.ball for claw in state.claws if claw.ball])
+        return state, changed
 
     def close_claw_end(self, state: StateModel, claw_index: int) -> StateModel:
         state.claws[claw_index].operating_claw = False
@@ -1,11 +1,11 @@
 from dataclasses import dataclass
-from typing import ClassVar
 
 MIN_X = 0
 MIN_Y = 0
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class StatePosition:
+    """Immutable, so balls and claws can share positions safely"""
     x: int
     y: int
 
@@ -13,24 +13,14 @@ class StatePosition:
         return f"x={self.x} y={self.y}"
 
 
-@dataclass
+@dataclass(slots=True)
 class StateBall:
-    __id_cnt: ClassVar[int] = 0
     pos: StatePosition
     color: str
     value: int | None = None
     label: str = ""    
     value_visible: bool = True
-    id: str = "" # always overwritten in __post_init__
-
-    @classmethod
-    def __create_unique_id(cls) -> str:
-        cls.__id_cnt = cls.__id_cnt + 1
-        return f"{cls.__id_cnt}"
-
-    def __post_init__(self):
-        if self.id == "":
-            self.id = self.__create_unique_id()
+    id: int = 0 # unique per board. Assigned by the StateManager when the scenario is set.
 
     def __str__(self) -> str:
         return f"{self.color} {self.label}"
@@ -75,6 +65,54 @@ class StateUpdateModel:
     userId: str
     state: StateModel
     delay_multiplier: float
+    seq: int = 0
+
+@dataclass
+class ClawDelta:
+    index: int
+    changes: dict[str, object] # changed Claw fields. A ball held by the claw is represented by its id.
+
+@dataclass
+class BallMove:
+    id: int
+    pos: StatePosition | None # None while the ball is held by a claw
+
+@dataclass
+class StateDeltaModel:
+    claws: list[ClawDelta]
+    ball_moves: list[BallMove]
+    goal_accomplished: bool
+    elapsed: float
+
+@dataclass
+class StateDeltaUpdateModel:
+    """Changes since the update with sequence number seq - 1"""
+    userId: str
+    seq: int
+    delta: StateDeltaModel
+    delay_multiplier: float
+
+@dataclass
+class BoardUpdateModel:
+    board: int
+    update: StateUpdateModel
+
+@dataclass
+class MultiBoardUpdateModel:
+    """Updates of all boards that changed during one tick. At most one update per board."""
+    tick: int
+    updates: list[BoardUpdateModel]
+
+
+def serializable_dict_factory(items: list[tuple[str, object]]) -> dict[str, object]:
+    """dict_factory for dataclasses.asdict. Formats ball ids as strings, as expected by clients."""
+    obj = dict(items)
+    if isinstance(obj.get("id"), int):
+        obj["id"] = str(obj["id"])
+    changes = obj.get("changes")
+    if isinstance(changes, dict) and isinstance(changes.get("ball"), int):
+        changes["ball"] = str(changes["ball"])
+    return obj
 
 
 def get_default_state() -> StateModel:
@@ -1,3 +1,6 @@
+from dataclasses import replace
+
+from board_index import BoardIndex
 from state_update_model import (
     StateBall,
     StateModel,
@@ -5,23 +8,34 @@ from state_update_model import (
 )
 
 
+def get_nof_balls(state: StateModel) -> int:
+    """Balls on the board and in claws"""
+    return len(state.balls) + len([claw for claw in state.claws if claw.ball is not None])
+
+
 def is_ball_in_claw(state: StateModel, claw_index: int) -> bool:
     return state.claws[claw_index].ball is not None
 
 
-def is_ball_at_current_pos(state: StateModel, claw_index: int) -> bool:
+def is_ball_at_current_pos(state: StateModel, claw_index: int, index: BoardIndex | None = None) -> bool:
+    if index is not None:
+        return index.get_ball_at(state.claws[claw_index].pos) is not None
     return any(ball.pos == state.claws[claw_index].pos for ball in state.balls)
-    
-def get_ball_at(state: StateModel, pos: StatePosition) -> StateBall | None:
+
+def get_ball_at(state: StateModel, pos: StatePosition, index: BoardIndex | None = None) -> StateBall | None:
+    if index is not None:
+        return index.get_ball_at(pos)
     return next(
         (ball for ball in state.balls if pos == ball.pos),
         None,
     )
 
-def get_ball_at_current_pos(state: StateModel, claw_index: int) -> StateBall | None:
-    return get_ball_at(state=state, pos=state.claws[claw_index].pos)
+def get_ball_at_current_pos(state: StateModel, claw_index: int, index: BoardIndex | None = None) -> StateBall | None:
+    return get_ball_at(state=state, pos=state.claws[claw_index].pos, index=index)
 
-def get_top_occupied_index(state: StateModel, claw_index: int) -> int:
+def get_top_occupied_index(state: StateModel, claw_index: int, index: BoardIndex | None = None) -> int:
+    if index is not None:
+        return index.get_top_occupied_y(state.claws[claw_index].pos.x)
     y_indexes_in_current_column = [
         ball.pos.y for ball in state.balls if ball.pos.x == state.claws[claw_index].pos.x
     ]
@@ -31,5 +45,16 @@ def get_top_occupied_index(state: StateModel, claw_index: int) -> int:
     return top_occupied_y_index
 
 
-def get_top_vacant_index(state: StateModel, claw_index: int) -> int:
-    return get_top_occupied_index(state, claw_index=claw_index) - 1
+def get_top_vacant_index(state: StateModel, claw_index: int, index: BoardIndex | None = None) -> int:
+    return get_top_occupied_index(state, claw_index=claw_index, index=index) - 1
+
+
+def snapshot_state(state: StateModel) -> StateModel:
+    """Copies what the simulator mutates in place. Positions are immutable and shared."""
+    return replace(
+        state,
+        balls=[replace(ball) for ball in state.balls] if state.balls is not None else None,  # type: ignore[arg-type]
+        claws=[replace(claw, ball=replace(claw.ball) if claw.ball else None) for claw in state.claws],
+        spotlight=replace(state.spotlight) if state.spotlight else None,
+        highlights=[replace(highlight) for highlight in state.highlights] if state.highlights is not None else None,
+    )
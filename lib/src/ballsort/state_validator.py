@@ -1,5 +1,7 @@
 from dataclasses import dataclass
 from ball_control import IllegalBallControlStateError
+from board_index import BoardIndex
+from claw_bounds import ClawBounds
 from state_utils import (
     get_top_occupied_index,
     get_top_vacant_index,
@@ -36,7 +38,7 @@ class StateValidator:
             if x <= compare_x:
                 raise IllegalBallControlStateError(f"horizontal position of claw {claw_index} ({x}) must be > horizontal position of claw {compare_index} ({compare_x})")
 
-    def move_horizontally(self, state: StateModel, distance: int, claw_index: int):
+    def move_horizontally(self, state: StateModel, distance: int, claw_index: int, bounds: ClawBounds | None = None):
         self._check_claw_index(state=state, claw_index=claw_index)
         
         claw = state.claws[claw_index]
@@ -45,8 +47,11 @@ class StateValidator:
             raise IllegalBallControlStateError("Already moving horizontally")
         
         newX = claw.pos.x + distance
-        min_x = max(MIN_X, claw.min_x)
-        max_x = min(state.max_x, claw.max_x)
+        if bounds is not None:
+            min_x, max_x = bounds.get_bounds(claw_index)
+        else:
+            min_x = max(MIN_X, claw.min_x)
+            max_x = min(state.max_x, claw.max_x)
         if newX < min_x or newX > max_x:
             raise IllegalBallControlStateError(f"X coordinate out of bounds x={newX} minX={min_x} maxX={max_x}")
         self._check_claw_collision(state=state, claw_index=claw_index, x=newX)
@@ -68,7 +73,7 @@ class StateValidator:
         if (state.claws[claw_index].moving_horizontally or state.claws[claw_index].moving_vertically):
             raise IllegalBallControlStateError("Marble dropped while claw is in motion")
 
-    def open_claw(self, state: StateModel, claw_index: int):
+    def open_claw(self, state: StateModel, claw_index: int, index: BoardIndex | None = None):
         self._check_claw_index(state=state, claw_index=claw_index)
 
         if not is_ball_in_claw(state, claw_index=claw_index):
@@ -76,20 +81,22 @@ class StateValidator:
         
         self._check_claw_for_ongoing_operations(state=state, claw_index=claw_index)
 
-        if state.claws[claw_index].pos.y != get_top_vacant_index(state, claw_index=claw_index):
+        top_vacant_y = get_top_vacant_index(state, claw_index=claw_index, index=index)
+        if state.claws[claw_index].pos.y != top_vacant_y:
             raise IllegalBallControlStateError(
-                f"Illegal drop location. Must be topmost vacant position ({get_top_vacant_index(state, claw_index=claw_index)}). Y={state.claws[claw_index].pos.y}."
+                f"Illegal drop location. Must be topmost vacant position ({top_vacant_y}). Y={state.claws[claw_index].pos.y}."
             )
 
-    def close_claw(self, state: StateModel, claw_index: int):
+    def close_claw(self, state: StateModel, claw_index: int, index: BoardIndex | None = None):
         self._check_claw_index(state=state, claw_index=claw_index)
 
-        if not is_ball_at_current_pos(state, claw_index=claw_index):
+        if not is_ball_at_current_pos(state, claw_index=claw_index, index=index):
             return
         
         self._check_claw_for_ongoing_operations(state=state, claw_index=claw_index)
 
-        if state.claws[claw_index].pos.y != get_top_occupied_index(state, claw_index=claw_index):
+        top_occupied_y = get_top_occupied_index(state, claw_index=claw_index, index=index)
+        if state.claws[claw_index].pos.y != top_occupied_y:
             raise IllegalBallControlStateError(
-                f"Illegal grab. Must be topmost marble position ({get_top_occupied_index(state, claw_index=claw_index)}). Y={state.claws[claw_index].pos.y}."
+                f"Illegal grab. Must be topmost marble position ({top_occupied_y}). Y={state.claws[claw_index].pos.y}."
             )
@@ -1,4 +1,4 @@
-from state_update_model import StateUpdateModel
+from state_update_model import MultiBoardUpdateModel, StateDeltaUpdateModel, StateUpdateModel
 
 class UpdateReporter(object):
     """Interface for reporting state"""
@@ -7,6 +7,14 @@ class UpdateReporter(object):
         """Report state update"""
         pass
 
+    async def send_delta_update(self, deltaUpdate: StateDeltaUpdateModel):
+        """Report changes since the previous update"""
+        pass
+
+    async def send_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel):
+        """Report updates of several boards at once"""
+        pass
+
     async def shutdown(self):
         """Any cleanup to do before the object is disposed"""
         pass
\ No newline at end of file
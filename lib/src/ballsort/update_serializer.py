@@ -0,0 +1,432 @@
+import json
+import mmap
+import struct
+from dataclasses import asdict
+from json.encoder import encode_basestring_ascii  # type: ignore[attr-defined]
+
+from state_update_model import (
+    BallMove,
+    BoardUpdateModel,
+    Claw,
+    ClawDelta,
+    Highlight,
+    MultiBoardUpdateModel,
+    Spotlight,
+    StateBall,
+    StateDeltaModel,
+    StateDeltaUpdateModel,
+    StateModel,
+    StatePosition,
+    StateUpdateModel,
+    serializable_dict_factory,
+)
+
+
+class UpdateSerializer(object):
+    """Interface for serializing the updates reported by an UpdateReporter"""
+
+    def serialize_update(self, stateUpdate: StateUpdateModel) -> str | bytes:
+        raise NotImplementedError
+
+    def serialize_delta_update(self, deltaUpdate: StateDeltaUpdateModel) -> str | bytes:
+        raise NotImplementedError
+
+    def serialize_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel) -> str | bytes:
+        raise NotImplementedError
+
+
+class AsdictJsonSerializer(UpdateSerializer):
+    """JSON via dataclasses.asdict. Copies every nested dataclass into a dict before encoding."""
+
+    def serialize_update(self, stateUpdate: StateUpdateModel) -> str:
+        return json.dumps(asdict(stateUpdate, dict_factory=serializable_dict_factory))
+
+    def serialize_delta_update(self, deltaUpdate: StateDeltaUpdateModel) -> str:
+        return json.dumps(asdict(deltaUpdate, dict_factory=serializable_dict_factory))
+
+    def serialize_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel) -> str:
+        return json.dumps(asdict(multiBoardUpdate, dict_factory=serializable_dict_factory))
+
+
+def _encode_bool(value: bool) -> str:
+    return "true" if value else "false"
+
+
+def _encode_position(pos: StatePosition | None) -> str:
+    return "null" if pos is None else f'{{"x": {pos.x!r}, "y": {pos.y!r}}}'
+
+
+def _encode_value(value: object) -> str:
+    """Scalars and positions, as in ClawDelta.changes"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return _encode_bool(value)
+    if isinstance(value, (int, float)):
+        return json.dumps(value)
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if isinstance(value, StatePosition):
+        return _encode_position(value)
+    raise TypeError(f"Can not serialize {type(value).__name__}")
+
+
+class JsonSerializer(UpdateSerializer):
+    """
+    The same JSON as AsdictJsonSerializer, written directly from the dataclasses.
+    Strings repeated across balls, like colors, are escaped once per update.
+    """
+
+    def serialize_update(self, stateUpdate: StateUpdateModel) -> str:
+        parts: list[str] = []
+        self.__add_update(parts, stateUpdate)
+        return "".join(parts)
+
+    def serialize_delta_update(self, deltaUpdate: StateDeltaUpdateModel) -> str:
+        delta = deltaUpdate.delta
+        claws = ", ".join(self.__encode_claw_delta(claw_delta) for claw_delta in delta.claws)
+        ball_moves = ", ".join(f'{{"id": "{ball_move.id}", "pos": {_encode_position(ball_move.pos)}}}' for ball_move in delta.ball_moves)
+        return (
+            f'{{"userId": {encode_basestring_ascii(deltaUpdate.userId)}, "seq": {deltaUpdate.seq!r}, '
+            f'"delta": {{"claws": [{claws}], "ball_moves": [{ball_moves}], '
+            f'"goal_accomplished": {_encode_bool(delta.goal_accomplished)}, "elapsed": {_encode_value(delta.elapsed)}}}, '
+            f'"delay_multiplier": {_encode_value(deltaUpdate.delay_multiplier)}}}'
+        )
+
+    def serialize_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel) -> str:
+        parts: list[str] = [f'{{"tick": {multiBoardUpdate.tick!r}, "updates": [']
+        for i, board_update in enumerate(multiBoardUpdate.updates):
+            parts.append(f'{", " if i else ""}{{"board": {board_update.board!r}, "update": ')
+            self.__add_update(parts, board_update.update)
+            parts.append("}")
+        parts.append("]}")
+        return "".join(parts)
+
+    def __add_update(self, parts: list[str], stateUpdate: StateUpdateModel):
+        state = stateUpdate.state
+        strings: dict[str, str] = {}
+        parts.append(f'{{"userId": {encode_basestring_ascii(stateUpdate.userId)}, "state": {{"max_x": {state.max_x!r}, "max_y": {state.max_y!r}, "balls": ')
+        if state.balls is None:
+            parts.append("null")
+        else:
+            parts.append("[")
+            parts.append(", ".join([self.__encode_ball(ball, strings) for ball in state.balls]))
+            parts.append("]")
+        claws = ", ".join(self.__encode_claw(claw, strings) for claw in state.claws)
+        spotlight = state.spotlight
+        spotlight_json = "null" if spotlight is None else f'{{"on": {_encode_bool(spotlight.on)}, "pos": {_encode_position(spotlight.pos)}}}'
+        if state.highlights is None:
+            highlights_json = "null"
+        else:
+            highlights_json = "[" + ", ".join(
+                f'{{"xMin": {h.xMin!r}, "xMax": {h.xMax!r}, "yMin": {h.yMin!r}, "yMax": {h.yMax!r}, "color": {encode_basestring_ascii(h.color)}}}'
+                for h in state.highlights
+            ) + "]"
+        parts.append(
+            f', "claws": [{claws}], "goal_accomplished": {_encode_bool(state.goal_accomplished)}, "spotlight": {spotlight_json}, '
+            f'"highlights": {highlights_json}, "elapsed": {_encode_value(state.elapsed)}}}, '
+            f'"delay_multiplier": {_encode_value(stateUpdate.delay_multiplier)}, "seq": {stateUpdate.seq!r}}}'
+        )
+
+    @staticmethod
+    def __encode_ball(ball: StateBall, strings: dict[str, str]) -> str:
+        color = strings.get(ball.color)
+        if color is None:
+            color = strings[ball.color] = encode_basestring_ascii(ball.color)
+        label = strings.get(ball.label)
+        if label is None:
+            label = strings[ball.label] = encode_basestring_ascii(ball.label)
+        value = "null" if ball.value is None else repr(ball.value)
+        pos = ball.pos
+        return (
+            f'{{"pos": {{"x": {pos.x!r}, "y": {pos.y!r}}}, "color": {color}, "value": {value}, "label": {label}, '
+            f'"value_visible": {"true" if ball.value_visible else "false"}, "id": "{ball.id}"}}'
+        )
+
+    def __encode_claw(self, claw: Claw, strings: dict[str, str]) -> str:
+        ball = "null" if claw.ball is None else self.__encode_ball(claw.ball, strings)
+        return (
+            f'{{"pos": {_encode_position(claw.pos)}, "open": {_encode_bool(claw.open)}, "min_x": {claw.min_x!r}, "max_x": {claw.max_x!r}, '
+            f'"moving_horizontally": {_encode_bool(claw.moving_horizontally)}, "moving_vertically": {_encode_bool(claw.moving_vertically)}, '
+            f'"operating_claw": {_encode_bool(claw.operating_claw)}, "ball": {ball}}}'
+        )
+
+    @staticmethod
+    def __encode_claw_delta(claw_delta: ClawDelta) -> str:
+        changes = ", ".join(
+            f'{encode_basestring_ascii(name)}: {_encode_value(str(value) if name == "ball" and isinstance(value, int) else value)}'
+            for name, value in claw_delta.changes.items()
+        )
+        return f'{{"index": {claw_delta.index!r}, "changes": {{{changes}}}}}'
+
+
+_MAGIC = b"BS"
+_VERSION = 2
+_UPDATE, _DELTA_UPDATE, _MULTI_BOARD_UPDATE = 1, 2, 3
+_NO_POS = -32768  # x of a ball held by a claw
+_NO_BALL = 0  # ball ids start at 1
+
+_HEADER = struct.Struct("<2sBB")  # magic, version, kind
+_COUNT = struct.Struct("<I")  # also string indexes and byte lengths
+# seq, delay multiplier, elapsed, max_x, max_y, flags, userId, nof claws, nof highlights
+_UPDATE_HEADER = struct.Struct("<IddhhBIHH")
+_UPDATE_GOAL, _UPDATE_BALLS, _UPDATE_SPOTLIGHT, _UPDATE_HIGHLIGHTS = 1, 2, 4, 8
+# id, x, y, color, label, value, flags
+_BALL = struct.Struct("<IhhIIiB")
+_BALL_VALUE, _BALL_VALUE_VISIBLE = 1, 2
+# x, y, min_x, max_x, flags
+_CLAW = struct.Struct("<hhhhB")
+_CLAW_OPEN, _CLAW_MOVING_HORIZONTALLY, _CLAW_MOVING_VERTICALLY, _CLAW_OPERATING, _CLAW_BALL = 1, 2, 4, 8, 16
+_SPOTLIGHT = struct.Struct("<Bhh")
+_HIGHLIGHT = struct.Struct("<hhhhI")
+# seq, delay multiplier, elapsed, goal accomplished, userId, nof claw deltas, nof ball moves
+_DELTA_HEADER = struct.Struct("<IddBIHI")
+_CLAW_DELTA = struct.Struct("<HB")  # index, changed fields
+_CLAW_DELTA_FIELDS: list[tuple[str, struct.Struct]] = [
+    ("pos", struct.Struct("<hh")),
+    ("open", struct.Struct("<?")),
+    ("min_x", struct.Struct("<h")),
+    ("max_x", struct.Struct("<h")),
+    ("moving_horizontally", struct.Struct("<?")),
+    ("moving_vertically", struct.Struct("<?")),
+    ("operating_claw", struct.Struct("<?")),
+    ("ball", struct.Struct("<I")),  # _NO_BALL for no ball
+]
+_BALL_MOVE = struct.Struct("<Ihh")
+_MULTI_BOARD_HEADER = struct.Struct("<IH")  # tick, nof updates
+_BOARD_UPDATE = struct.Struct("<HI")  # board, length of the update
+
+
+class _StringTable:
+    """Strings of a message, each stored once"""
+
+    def __init__(self):
+        self.indexes: dict[str, int] = {}
+
+    def get_index(self, string: str) -> int:
+        index = self.indexes.get(string)
+        if index is None:
+            index = self.indexes[string] = len(self.indexes)
+        return index
+
+    def to_bytes(self) -> bytes:
+        parts = [_COUNT.pack(len(self.indexes))]
+        for string in self.indexes:
+            encoded = string.encode()
+            parts.append(_COUNT.pack(len(encoded)))
+            parts.append(encoded)
+        return b"".join(parts)
+
+
+class _Reader:
+    def __init__(self, data: bytes | memoryview | mmap.mmap, offset: int = 0):
+        self.data = data
+        self.offset = offset
+        self.strings: list[str] = []
+
+    def read(self, fmt: struct.Struct) -> tuple:
+        values = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
+        return values
+
+    def read_strings(self):
+        (nof_strings,) = self.read(_COUNT)
+        self.strings = []
+        for _ in range(nof_strings):
+            (length,) = self.read(_COUNT)
+            self.strings.append(bytes(self.data[self.offset : self.offset + length]).decode())
+            self.offset += length
+
+
+class BinarySerializer(UpdateSerializer):
+    """
+    Compact fixed layout binary format, little endian, for clients other than browsers.
+    A message starts with b"BS", the format version and the kind of update. Then follows a table of the message's strings,
+    referred to by index, and fixed size records: 21 bytes per ball, 9 per claw.
+    A multi board update holds complete, length prefixed, messages of the boards.
+    """
+
+    def serialize_update(self, stateUpdate: StateUpdateModel) -> bytes:
+        strings = _StringTable()
+        state = stateUpdate.state
+        flags = (
+            (_UPDATE_GOAL if state.goal_accomplished else 0)
+            | (_UPDATE_BALLS if state.balls is not None else 0)
+            | (_UPDATE_SPOTLIGHT if state.spotlight is not None else 0)
+            | (_UPDATE_HIGHLIGHTS if state.highlights is not None else 0)
+        )
+        highlights = state.highlights or []
+        body = [
+            _UPDATE_HEADER.pack(
+                stateUpdate.seq, stateUpdate.delay_multiplier, state.elapsed, state.max_x, state.max_y, flags,
+                strings.get_index(stateUpdate.userId), len(state.claws), len(highlights),
+            )
+        ]
+        if state.balls is not None:
+            body.append(_COUNT.pack(len(state.balls)))
+            body.extend([self.__pack_ball(ball, strings) for ball in state.balls])
+        for claw in state.claws:
+            claw_flags = (
+                (_CLAW_OPEN if claw.open else 0)
+                | (_CLAW_MOVING_HORIZONTALLY if claw.moving_horizontally else 0)
+                | (_CLAW_MOVING_VERTICALLY if claw.moving_vertically else 0)
+                | (_CLAW_OPERATING if claw.operating_claw else 0)
+                | (_CLAW_BALL if claw.ball is not None else 0)
+            )
+            body.append(_CLAW.pack(claw.pos.x, claw.pos.y, claw.min_x, claw.max_x, claw_flags))
+            if claw.ball is not None:
+                body.append(self.__pack_ball(claw.ball, strings))
+        if state.spotlight is not None:
+            body.append(_SPOTLIGHT.pack(state.spotlight.on, state.spotlight.pos.x, state.spotlight.pos.y))
+        for h in highlights:
+            body.append(_HIGHLIGHT.pack(h.xMin, h.xMax, h.yMin, h.yMax, strings.get_index(h.color)))
+        return b"".join([_HEADER.pack(_MAGIC, _VERSION, _UPDATE), strings.to_bytes()] + body)
+
+    def serialize_delta_update(self, deltaUpdate: StateDeltaUpdateModel) -> bytes:
+        strings = _StringTable()
+        delta = deltaUpdate.delta
+        body = [
+            _DELTA_HEADER.pack(
+                deltaUpdate.seq, deltaUpdate.delay_multiplier, delta.elapsed, delta.goal_accomplished,
+                strings.get_index(deltaUpdate.userId), len(delta.claws), len(delta.ball_moves),
+            )
+        ]
+        for claw_delta in delta.claws:
+            changed = 0
+            values: list[bytes] = []
+            for bit, (name, fmt) in enumerate(_CLAW_DELTA_FIELDS):
+                if name not in claw_delta.changes:
+                    continue
+                changed |= 1 << bit
+                value = claw_delta.changes[name]
+                if name == "pos":
+                    assert isinstance(value, StatePosition)
+                    values.append(fmt.pack(value.x, value.y))
+                else:
+                    values.append(fmt.pack(_NO_BALL if value is None else value))
+            body.append(_CLAW_DELTA.pack(claw_delta.index, changed))
+            body.extend(values)
+        for ball_move in delta.ball_moves:
+            pos = ball_move.pos
+            body.append(_BALL_MOVE.pack(ball_move.id, _NO_POS, 0) if pos is None else _BALL_MOVE.pack(ball_move.id, pos.x, pos.y))
+        return b"".join([_HEADER.pack(_MAGIC, _VERSION, _DELTA_UPDATE), strings.to_bytes()] + body)
+
+    def serialize_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel) -> bytes:
+        parts = [_HEADER.pack(_MAGIC, _VERSION, _MULTI_BOARD_UPDATE), _MULTI_BOARD_HEADER.pack(multiBoardUpdate.tick, len(multiBoardUpdate.updates))]
+        for board_update in multiBoardUpdate.updates:
+            update = self.serialize_update(board_update.update)
+            parts.append(_BOARD_UPDATE.pack(board_update.board, len(update)))
+            parts.append(update)
+        return b"".join(parts)
+
+    @staticmethod
+    def __pack_ball(ball: StateBall, strings: _StringTable) -> bytes:
+        flags = (_BALL_VALUE if ball.value is not None else 0) | (_BALL_VALUE_VISIBLE if ball.value_visible else 0)
+        return _BALL.pack(
+            ball.id, ball.pos.x, ball.pos.y, strings.get_index(ball.color), strings.get_index(ball.label), ball.value or 0, flags
+        )
+
+    def deserialize(self, data: bytes | memoryview | mmap.mmap, offset: int = 0) -> StateUpdateModel | StateDeltaUpdateModel | MultiBoardUpdateModel:
+        """Parses a message written by this serializer, starting at offset"""
+        return self.__read_message(_Reader(data, offset))
+
+    def __read_message(self, reader: _Reader) -> StateUpdateModel | StateDeltaUpdateModel | MultiBoardUpdateModel:
+        magic, version, kind = reader.read(_HEADER)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a version {_VERSION} update message")
+        if kind == _MULTI_BOARD_UPDATE:
+            tick, nof_updates = reader.read(_MULTI_BOARD_HEADER)
+            updates: list[BoardUpdateModel] = []
+            for _ in range(nof_updates):
+                board, length = reader.read(_BOARD_UPDATE)
+                update = self.__read_message(_Reader(reader.data, reader.offset))
+                assert isinstance(update, StateUpdateModel)
+                updates.append(BoardUpdateModel(board=board, update=update))
+                reader.offset += length
+            return MultiBoardUpdateModel(tick=tick, updates=updates)
+        reader.read_strings()
+        if kind == _UPDATE:
+            return self.__read_update(reader)
+        if kind == _DELTA_UPDATE:
+            return self.__read_delta_update(reader)
+        raise ValueError(f"Unknown update kind {kind}")
+
+    @staticmethod
+    def __read_ball(reader: _Reader) -> StateBall:
+        id, x, y, color, label, value, flags = reader.read(_BALL)
+        return StateBall(
+            pos=StatePosition(x=x, y=y),
+            color=reader.strings[color],
+            value=value if flags & _BALL_VALUE else None,
+            label=reader.strings[label],
+            value_visible=bool(flags & _BALL_VALUE_VISIBLE),
+            id=id,
+        )
+
+    def __read_update(self, reader: _Reader) -> StateUpdateModel:
+        seq, delay_multiplier, elapsed, max_x, max_y, flags, user_id, nof_claws, nof_highlights = reader.read(_UPDATE_HEADER)
+        balls: list[StateBall] | None = None
+        if flags & _UPDATE_BALLS:
+            (nof_balls,) = reader.read(_COUNT)
+            balls = [self.__read_ball(reader) for _ in range(nof_balls)]
+        claws: list[Claw] = []
+        for _ in range(nof_claws):
+            x, y, min_x, max_x_claw, claw_flags = reader.read(_CLAW)
+            claws.append(
+                Claw(
+                    pos=StatePosition(x=x, y=y),
+                    open=bool(claw_flags & _CLAW_OPEN),
+                    min_x=min_x,
+                    max_x=max_x_claw,
+                    moving_horizontally=bool(claw_flags & _CLAW_MOVING_HORIZONTALLY),
+                    moving_vertically=bool(claw_flags & _CLAW_MOVING_VERTICALLY),
+                    operating_claw=bool(claw_flags & _CLAW_OPERATING),
+                    ball=self.__read_ball(reader) if claw_flags & _CLAW_BALL else None,
+                )
+            )
+        spotlight: Spotlight | None = None
+        if flags & _UPDATE_SPOTLIGHT:
+            on, x, y = reader.read(_SPOTLIGHT)
+            spotlight = Spotlight(on=bool(on), pos=StatePosition(x=x, y=y))
+        highlights: list[Highlight] | None = None
+        if flags & _UPDATE_HIGHLIGHTS:
+            highlights = []
+            for _ in range(nof_highlights):
+                x_min, x_max, y_min, y_max, color = reader.read(_HIGHLIGHT)
+                highlights.append(Highlight(xMin=x_min, xMax=x_max, yMin=y_min, yMax=y_max, color=reader.strings[color]))
+        state = StateModel(
+            max_x=max_x,
+            max_y=max_y,
+            balls=balls,  # type: ignore[arg-type]
+            claws=claws,
+            goal_accomplished=bool(flags & _UPDATE_GOAL),
+            spotlight=spotlight,
+            highlights=highlights,
+            elapsed=elapsed,
+        )
+        return StateUpdateModel(userId=reader.strings[user_id], state=state, delay_multiplier=delay_multiplier, seq=seq)
+
+    @staticmethod
+    def __read_delta_update(reader: _Reader) -> StateDeltaUpdateModel:
+        seq, delay_multiplier, elapsed, goal_accomplished, user_id, nof_claw_deltas, nof_ball_moves = reader.read(_DELTA_HEADER)
+        claw_deltas: list[ClawDelta] = []
+        for _ in range(nof_claw_deltas):
+            index, changed = reader.read(_CLAW_DELTA)
+            changes: dict[str, object] = {}
+            for bit, (name, fmt) in enumerate(_CLAW_DELTA_FIELDS):
+                if not changed & (1 << bit):
+                    continue
+                values = reader.read(fmt)
+                if name == "pos":
+                    changes[name] = StatePosition(x=values[0], y=values[1])
+                elif name == "ball":
+                    changes[name] = None if values[0] == _NO_BALL else values[0]
+                else:
+                    changes[name] = values[0]
+            claw_deltas.append(ClawDelta(index=index, changes=changes))
+        ball_moves: list[BallMove] = []
+        for _ in range(nof_ball_moves):
+            id, x, y = reader.read(_BALL_MOVE)
+            ball_moves.append(BallMove(id=id, pos=None if x == _NO_POS else StatePosition(x=x, y=y)))
+        delta = StateDeltaModel(claws=claw_deltas, ball_moves=ball_moves, goal_accomplished=bool(goal_accomplished), elapsed=elapsed)
+        return StateDeltaUpdateModel(userId=reader.strings[user_id], seq=seq, delta=delta, delay_multiplier=delay_multiplier)
@@ -0,0 +1,112 @@
+import asyncio
+import heapq
+import itertools
+import selectors
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+
+class _VirtualClockSelector(selectors.DefaultSelector):
+    """Selector that advances the virtual clock instead of waiting for a timeout"""
+
+    loop: "VirtualClockEventLoop"
+
+    def __init__(self, loop: "VirtualClockEventLoop"):
+        super().__init__()
+        self.loop = loop
+
+    def select(self, timeout: float | None = None):
+        if timeout is None:
+            # nothing scheduled, wait for I/O or call_soon_threadsafe
+            return super().select(None)
+        events = super().select(0)
+        if not events and timeout > 0:
+            self.loop.advance(timeout)
+        return events
+
+
+class _SequencedTimerHandle(asyncio.TimerHandle):
+    """Timer handle ordered by time, then by scheduling order"""
+
+    __slots__ = ("_seq",)
+
+    def __init__(self, when, callback, args, loop, context, seq: int):
+        super().__init__(when, callback, args, loop, context)
+        self._seq = seq
+
+    def __lt__(self, other):
+        if isinstance(other, _SequencedTimerHandle) and self._when == other._when:
+            return self._seq < other._seq
+        return super().__lt__(other)
+
+
+class VirtualClockEventLoop(asyncio.SelectorEventLoop):
+    """
+    Discrete event loop running on a virtual clock.
+    asyncio keeps timers, e.g. sleeping simulator commands, in a priority queue keyed by time.
+    Whenever no callback is ready this loop jumps its clock to the earliest pending timer instead of waiting for it.
+    Concurrent commands thereby complete instantly, in the same order as in an unloaded real-time run.
+    Timers due at the same virtual time fire in the order they were scheduled, like they would in real time.
+    """
+
+    _virtual_time: float
+    _timer_seq: itertools.count
+
+    def __init__(self):
+        self._virtual_time = 0.0
+        self._timer_seq = itertools.count()
+        super().__init__(selector=_VirtualClockSelector(self))
+
+    def time(self) -> float:
+        return self._virtual_time
+
+    def call_at(self, when, callback, *args, context=None):
+        if when is None:
+            raise TypeError("when cannot be None")
+        self._check_closed()
+        timer = _SequencedTimerHandle(when, callback, args, self, context, seq=next(self._timer_seq))
+        heapq.heappush(self._scheduled, timer)  # type: ignore[attr-defined]
+        timer._scheduled = True
+        return timer
+
+    def advance(self, duration: float):
+        """Moves the virtual clock forward"""
+        self._virtual_time += duration
+
+
+def _cancel_all_tasks(loop: asyncio.AbstractEventLoop):
+    to_cancel = asyncio.all_tasks(loop)
+    if not to_cancel:
+        return
+
+    for task in to_cancel:
+        task.cancel()
+
+    loop.run_until_complete(asyncio.gather(*to_cancel, return_exceptions=True))
+
+    for task in to_cancel:
+        if task.cancelled():
+            continue
+        if task.exception() is not None:
+            loop.call_exception_handler({
+                "message": "unhandled exception during run_virtual() shutdown",
+                "exception": task.exception(),
+                "task": task,
+            })
+
+
+def run_virtual(main: Coroutine[Any, Any, T]) -> T:
+    """Like asyncio.run, but on a VirtualClockEventLoop. Simulators should be created with delay_multiplier=1.0"""
+    loop = VirtualClockEventLoop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            _cancel_all_tasks(loop)
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
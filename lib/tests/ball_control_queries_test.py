@@ -0,0 +1,74 @@
+import asyncio
+import sys
+import pathlib
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from ch10_scenario import Ch10Scenario
+from ch13_scenario import Ch13Scenario
+from control_factory import get_headless_control_sim
+from test_utils import move_ball_by_column
+
+
+def assert_queries_match_state(bc: BallControlSim):
+    state = bc.get_state()
+    for x in range(state.max_x + 1):
+        column = sorted([ball for ball in state.balls if ball.pos.x == x], key=lambda ball: ball.pos.y, reverse=True)
+        assert bc.get_column(x) == column
+        assert bc.get_top_ball(x) == (column[-1] if column else None)
+    assert bc.get_column_heights() == [len([ball for ball in state.balls if ball.pos.x == x]) for x in range(state.max_x + 1)]
+    for color in set(ball.color for ball in state.balls):
+        assert bc.find_balls(color) == sorted([ball for ball in state.balls if ball.color == color], key=lambda ball: (ball.pos.x, ball.pos.y))
+
+
+async def queries():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch13Scenario(seed=4050))
+    assert_queries_match_state(bc)
+    assert bc.find_balls("no such color") == []
+
+    await move_ball_by_column(bc=bc, src_x=0, dest_x=5)
+    await move_ball_by_column(bc=bc, src_x=1, dest_x=6)
+    assert_queries_match_state(bc)
+
+    # a held ball is not on the board
+    top_ball = bc.get_top_ball(0)
+    assert top_ball
+    await bc.move_horizontally(-bc.get_position().x)
+    await bc.move_vertically(top_ball.pos.y - bc.get_position().y)
+    await bc.close_claw()
+    assert_queries_match_state(bc)
+    assert top_ball.id not in [ball.id for ball in bc.find_balls(top_ball.color)]
+
+    # the same snapshots as get_state
+    assert bc.get_column(1)[0] is next(ball for ball in bc.get_state().balls if ball.pos == bc.get_column(1)[0].pos)
+
+
+async def hidden_values():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch10Scenario(seed=4711))
+    assert all(ball.value is None for ball in bc.get_column(0))
+    assert bc.find_balls("cyan") and all(ball.value is None for ball in bc.find_balls("cyan"))
+
+    # revealed
+    reveal_x = bc.state.max_x
+    await move_ball_by_column(bc=bc, src_x=0, dest_x=reveal_x)
+    top_ball = bc.get_top_ball(reveal_x)
+    assert top_ball and top_ball.value is not None
+    assert_queries_match_state(bc)
+
+
+def test_ball_control_queries():
+    asyncio.run(queries())
+    asyncio.run(hidden_values())
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_ball_control_queries()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
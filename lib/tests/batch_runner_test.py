@@ -0,0 +1,54 @@
+from dataclasses import replace
+import sys
+import pathlib
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from batch_runner import BatchJob, format_results, main, run_batch
+from ch7_scenario import Ch7Scenario
+from ch9_scenario import Ch9Scenario
+from test_utils import sort_column
+
+
+async def ch7_solution(bc: BallControlSim):
+    await sort_column(bc=bc, src_x1=1, src_x2=2, dest_x=0, nof_balls=len(bc.get_state().balls), claw_index=0)
+
+
+async def illegal_solution(bc: BallControlSim):
+    await bc.move_horizontally(-1)
+
+
+def test_batch_runner():
+    jobs = [BatchJob(solution=ch7_solution, scenario_class=Ch7Scenario, seed=seed) for seed in range(6)]
+    jobs.append(BatchJob(solution=ch7_solution, scenario_class=Ch9Scenario, seed=1))
+    jobs.append(BatchJob(solution=illegal_solution, scenario_class=Ch7Scenario, seed=1))
+
+    results = run_batch(jobs, max_workers=2)
+    print(format_results(results))
+
+    assert [result.seed for result in results] == [job.seed for job in jobs]
+    assert all(result.goal_accomplished and result.error is None for result in results[:6])
+    assert all(result.elapsed > 0 and result.nof_ball_moves >= 5 and result.nof_commands > result.nof_ball_moves for result in results[:6])
+
+    # values are hidden in Ch9. Sorting unknown values does not accomplish the goal.
+    assert not results[6].goal_accomplished and results[6].error is None
+
+    assert not results[7].goal_accomplished
+    assert results[7].error and results[7].error.startswith("IllegalBallControlStateError")
+
+    # same results in a single process and with fast forward simulation
+    for other_results in [run_batch(jobs, max_workers=1), run_batch(jobs, max_workers=2, fast_forward=True)]:
+        assert [replace(result, wall_time=0) for result in other_results] == [replace(result, wall_time=0) for result in results]
+
+    assert main(["--solution", "batch_runner_test:ch7_solution", "--scenario", "ch7", "--seeds", "1-3,7", "--workers", "2"]) == 0
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_batch_runner()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
@@ -0,0 +1,138 @@
+import asyncio
+import random
+import sys
+import pathlib
+import time
+from dataclasses import replace
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from board_arrays import BoardArrays, are_columns_sorted, get_sorted_columns_progress, is_numpy_available
+from ch10_scenario import Ch10Scenario
+from ch11_scenario import Ch11Scenario
+from ch7_scenario import Ch7Scenario
+from control_factory import get_headless_control_sim
+from scenario import ScenarioProgress
+from state_update_model import StateBall, StateModel, StatePosition, get_default_state
+from test_utils import move_ball_by_column
+
+
+def get_column_state(nof_balls: int, sorted_from_bottom: int) -> StateModel:
+    """All balls in column 0. Exactly the bottom sorted_from_bottom balls are sorted. sorted_from_bottom must be at least 1."""
+    values = list(range(nof_balls, 0, -1))
+    unsorted = values[sorted_from_bottom:]
+    random.Random(4711).shuffle(unsorted)
+    values[sorted_from_bottom:] = unsorted
+    if sorted_from_bottom < nof_balls:
+        # guarantee a violation right above the sorted stack
+        values[sorted_from_bottom] = nof_balls + 1
+    balls = [StateBall(pos=StatePosition(x=0, y=nof_balls - i), color="yellow", value=v, id=i + 1) for i, v in enumerate(values)]
+    return replace(get_default_state(), balls=balls, max_x=4, max_y=nof_balls)
+
+
+class LargeCh7Scenario(Ch7Scenario):
+    """Ch7 with many balls"""
+
+    nof_balls = 600
+
+    def get_initial_state(self) -> StateModel:
+        rng = random.Random(self._seed)
+        balls = [StateBall(pos=StatePosition(x=1, y=y), color="yellow", value=rng.randint(0, 10)) for y in range(1, self.nof_balls + 1)]
+        return replace(get_default_state(), balls=balls, max_x=4, max_y=self.nof_balls)
+
+
+def check_both(bc: BallControlSim):
+    """Vectorized checks on the maintained arrays give the same results as the interpreted checks"""
+    scenario = bc.state_manager.scenario
+    assert scenario and bc.state_manager.arrays is not None
+    assert bc.is_in_goal_state() == scenario.is_in_goal_state(bc.state)
+    assert bc.get_progress() == scenario.get_progress(bc.state)
+
+
+async def large_board():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(LargeCh7Scenario(seed=3))
+    check_both(bc)
+
+    for src_x, dest_x in [(1, 0), (1, 2), (1, 0), (2, 0)]:
+        await move_ball_by_column(bc=bc, src_x=src_x, dest_x=dest_x)
+        check_both(bc)
+
+    await bc.close_claw()
+    check_both(bc)
+    assert bc.get_progress().completed >= 1
+    assert bc.get_progress().total == LargeCh7Scenario.nof_balls
+
+
+async def small_boards():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch7Scenario(seed=1))
+    assert bc.state_manager.arrays is None # not worth it
+    assert bc.get_progress() == ScenarioProgress(completed=0, total=5)
+
+    await bc.set_scenario(Ch11Scenario(seed=1))
+    await move_ball_by_column(bc=bc, src_x=0, dest_x=1)
+    targets = Ch11Scenario().get_sorted_column_targets(bc.state)
+    assert not BoardArrays.from_state(bc.state).are_columns_sorted(targets)
+    assert not are_columns_sorted(bc.state, targets)
+    assert BoardArrays.from_state(bc.state).get_sorted_columns_progress(targets) == get_sorted_columns_progress(bc.state, targets)
+
+    # a hidden value is not counted as sorted
+    await bc.set_scenario(Ch10Scenario(seed=1))
+    await move_ball_by_column(bc=bc, src_x=0, dest_x=1)
+    await move_ball_by_column(bc=bc, src_x=1, dest_x=0)
+    assert bc.get_progress().completed == 0
+
+
+def test_board_arrays():
+    if not is_numpy_available():
+        print("numpy not installed")
+        return
+
+    for nof_balls in [1, 2, 10, 1000]:
+        for sorted_from_bottom in sorted({1, nof_balls // 2, nof_balls - 1, nof_balls} - {0}):
+            state = get_column_state(nof_balls=nof_balls, sorted_from_bottom=sorted_from_bottom)
+            arrays = BoardArrays.from_state(state)
+            for targets in [{0: (nof_balls, None)}, {0: (nof_balls + 1, None)}, {0: (nof_balls, "blue")}, {0: (nof_balls, "yellow"), 1: (0, None)}]:
+                assert arrays.are_columns_sorted(targets) == are_columns_sorted(state, targets)
+                assert arrays.get_sorted_columns_progress(targets) == get_sorted_columns_progress(state, targets)
+
+            assert arrays.are_columns_sorted({0: (nof_balls, None)}) == (sorted_from_bottom == nof_balls)
+            assert arrays.get_sorted_columns_progress({0: (nof_balls, None)}) == ScenarioProgress(completed=sorted_from_bottom, total=nof_balls)
+
+            # hiding a value inside the sorted stack ends the stack below that ball
+            hidden_row = (sorted_from_bottom - 1) // 2
+            state.balls[hidden_row].value_visible = False
+            arrays = BoardArrays.from_state(state)
+            expected = ScenarioProgress(completed=hidden_row, total=nof_balls)
+            assert arrays.get_sorted_columns_progress({0: (nof_balls, None)}) == expected == get_sorted_columns_progress(state, {0: (nof_balls, None)})
+
+    # a row per ball id
+    state = get_column_state(nof_balls=3, sorted_from_bottom=3)
+    state.balls[0].id = 0
+    exception_caught = False
+    try:
+        BoardArrays.from_state(state)
+    except ValueError:
+        exception_caught = True
+    assert exception_caught
+
+    asyncio.run(large_board())
+    asyncio.run(small_boards())
+
+
+if __name__ == "__main__":
+    s = time.perf_counter()
+    test_board_arrays()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
+
+    nof_balls = 100000
+    state = get_column_state(nof_balls=nof_balls, sorted_from_bottom=nof_balls)
+    arrays = BoardArrays.from_state(state)
+    for name, check in [("interpreted", lambda: are_columns_sorted(state, {0: (nof_balls, None)})), ("vectorized", lambda: arrays.are_columns_sorted({0: (nof_balls, None)}))]:
+        s = time.perf_counter()
+        assert check()
+        print(f"{name} goal check of {nof_balls} balls: {time.perf_counter() - s:0.4f} seconds")
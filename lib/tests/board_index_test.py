@@ -0,0 +1,84 @@
+import asyncio
+import sys
+import pathlib
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from board_index import BoardIndex
+from ch13_scenario import Ch13Scenario
+from control_factory import get_control_sim
+from state_update_model import StateModel, StatePosition
+from state_utils import get_ball_at, get_top_occupied_index
+from test_utils import move_ball_by_column
+
+
+def assert_index_matches_scan(index: BoardIndex, state: StateModel):
+    for x in range(state.max_x + 1):
+        state.claws[0].pos = StatePosition(x=x, y=0)
+        assert get_top_occupied_index(state, claw_index=0, index=index) == get_top_occupied_index(state, claw_index=0)
+        for y in range(state.max_y + 1):
+            pos = StatePosition(x=x, y=y)
+            assert get_ball_at(state, pos=pos, index=index) is get_ball_at(state, pos=pos)
+    assert index.list_indexes == {id(ball): i for i, ball in enumerate(state.balls)}
+
+
+def index_queries():
+    state = Ch13Scenario(seed=4050).get_initial_state()
+    index = BoardIndex.from_state(state)
+    assert index.is_current(state)
+    assert_index_matches_scan(index=index, state=state)
+
+    for x in range(state.max_x + 1):
+        column = index.get_column(x)
+        assert [ball.pos.y for ball in column] == sorted([ball.pos.y for ball in column], reverse=True)
+
+    # editing the list in place outdates the index
+    top_ball = index.get_top_ball(0)
+    assert top_ball
+    list_index = state.balls.index(top_ball)
+    del state.balls[list_index]
+    assert not index.is_current(state)
+    state.balls.insert(list_index, top_ball)
+    assert index.is_current(state)
+
+    # the list is kept in step with the index
+    nof_balls = len(state.balls)
+    for x in [0, 1, 0]:
+        top_ball = index.get_top_ball(x)
+        assert top_ball
+        index.pop_ball(top_ball)
+        assert len(state.balls) == nof_balls - 1 and top_ball not in state.balls
+        assert_index_matches_scan(index=index, state=state)
+        top_ball.pos = StatePosition(x=5, y=index.get_top_vacant_y(5))
+        index.append_ball(top_ball)
+        assert state.balls[-1] is top_ball
+        assert_index_matches_scan(index=index, state=state)
+
+
+async def index_kept_current():
+    bc = get_control_sim(0)
+    await bc.set_scenario(Ch13Scenario(seed=4050))
+
+    # move the top ball of column 0 between the empty columns
+    await move_ball_by_column(bc=bc, src_x=0, dest_x=5)
+    await move_ball_by_column(bc=bc, src_x=5, dest_x=6)
+    await move_ball_by_column(bc=bc, src_x=6, dest_x=5)
+
+    index = bc.state_manager.index
+    assert index.is_current(bc.state)
+    assert_index_matches_scan(index=index, state=bc.state)
+
+
+def test_board_index():
+    index_queries()
+    asyncio.run(index_kept_current())
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_board_index()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
@@ -38,9 +38,7 @@ async def example_solution():
     color_grid = __get_ball_list()
     winning_sequence = color_sorter.find_winning_sequence(balls=color_grid)
 
-    print(
-        f"Positions evaluated:{color_sorter.total_positions}\nrepeated positions:{color_sorter.repeat_positions}\ncache hits:{color_sorter.cache_hits}"
-    )
+    print(color_sorter.stats)
     print(f"Winning sequence in {len(winning_sequence)}  moves:{winning_sequence}")
 
     for move in winning_sequence:
@@ -0,0 +1,74 @@
+import asyncio
+import sys
+import pathlib
+from dataclasses import replace
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control import IllegalBallControlStateError
+from ch14_scenario import Ch14Scenario
+from ch6_scenario import Ch6Scenario
+from claw_bounds import ClawBounds
+from control_factory import get_headless_control_sim
+from state_update_model import StatePosition, get_default_state
+
+
+def get_many_claws_state(nof_claws: int):
+    """One claw per other column, each may operate in the column to its left and right"""
+    claw = get_default_state().claws[0]
+    claws = [replace(claw, pos=StatePosition(x=2 * i + 1, y=0), min_x=2 * i, max_x=2 * i + 2) for i in range(nof_claws)]
+    return replace(get_default_state(), max_x=2 * nof_claws, claws=claws)
+
+
+def queries():
+    state = get_many_claws_state(nof_claws=8)
+    bounds = ClawBounds.from_state(state)
+    assert bounds.is_current(state)
+    assert bounds.get_bounds(0) == (0, 2)
+    assert bounds.get_bounds(7) == (14, 16)
+    assert bounds.get_reachable_interval(state, claw_index=3) == (6, 8)
+
+    state.claws[3].pos = StatePosition(x=6, y=0)
+    assert bounds.get_reachable_interval(state, claw_index=2) == (4, 5)
+    assert bounds.get_reachable_interval(state, claw_index=3) == (6, 8)
+
+    assert not bounds.is_current(replace(state, claws=list(state.claws)))
+
+
+async def validation():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch6Scenario())
+    assert bc.get_reachable_interval(claw_index=0) == (0, 2)
+    assert bc.get_reachable_interval(claw_index=1) == (2, 4)
+    await bc.move_horizontally(2, claw_index=0)
+    assert bc.get_reachable_interval(claw_index=1) == (3, 4)
+
+    for distance, claw_index in [(-2, 1), (1, 0)]:
+        exception_caught = False
+        try:
+            await bc.move_horizontally(distance, claw_index=claw_index)
+        except IllegalBallControlStateError as caught_err:
+            exception_caught = True
+            print(f"Expected exception caught: {caught_err}")
+        assert exception_caught
+
+    # claw 1 starts right of the board
+    await bc.set_scenario(Ch14Scenario())
+    assert bc.get_reachable_interval(claw_index=0) == (0, 4)
+    await bc.move_horizontally(-1, claw_index=1)
+    assert bc.get_reachable_interval(claw_index=1) == (1, 5)
+
+
+def test_claw_bounds():
+    queries()
+    asyncio.run(validation())
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_claw_bounds()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
@@ -0,0 +1,189 @@
+import asyncio
+import gc
+import sys
+import pathlib
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control import BallControl, IllegalBallControlStateError
+from ball_control_sim import BallControlSim
+from ch0_scenario import Ch0Scenario
+from claw_command_queue import ClawCommandQueue
+from control_factory import get_headless_control_sim
+from state_update_model import StatePosition
+from test_utils import move_ball
+from update_reporter import UpdateReporter
+from virtual_clock import run_virtual
+
+CH0_MOVES = [
+    (StatePosition(x=1, y=4), StatePosition(x=0, y=4)),
+    (StatePosition(x=2, y=4), StatePosition(x=0, y=3)),
+    (StatePosition(x=3, y=4), StatePosition(x=0, y=2)),
+]
+
+
+async def ch0_solution(bc: BallControl) -> float:
+    queue = ClawCommandQueue(bc)
+    pos = bc.get_position()
+    for src, dest in CH0_MOVES:
+        queue.move_ball(src=src, dest=dest, pos=pos)
+        pos = dest
+    assert queue.get_nof_pending() == 6 * len(CH0_MOVES)
+    await queue.join()
+    assert queue.get_nof_pending() == 0
+    assert bc.get_state().goal_accomplished
+    return bc.get_state().elapsed
+
+
+async def ch0_serial_solution(bc: BallControl) -> float:
+    for src, dest in CH0_MOVES:
+        await move_ball(bc=bc, src=src, dest=dest)
+    return bc.get_state().elapsed
+
+
+async def same_elapsed_as_gather():
+    """Pipelining the axes takes as long as go_to_pos, without gathering"""
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch0Scenario())
+    expected_elapsed = await ch0_serial_solution(bc)
+
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch0Scenario())
+    assert await ch0_solution(bc) == expected_elapsed
+
+
+async def same_elapsed_in_virtual_time():
+    bc = BallControlSim(update_reporter=UpdateReporter(), delay_multiplier=1.0)
+    await bc.set_scenario(Ch0Scenario())
+    elapsed = await ch0_solution(bc)
+
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch0Scenario())
+    assert await ch0_solution(bc) == elapsed
+
+
+async def pipelining():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch0Scenario())
+    queue = ClawCommandQueue(bc)
+
+    # different axes overlap
+    await asyncio.gather(queue.move_horizontally(1), queue.move_vertically(1))
+    assert bc.get_state().elapsed == 1.5
+
+    # same axis after each other
+    await asyncio.gather(queue.move_horizontally(1), queue.move_horizontally(-1))
+    assert bc.get_state().elapsed == 3.5
+
+    # claw operations after everything before them, moves after the claw operation
+    horizontal = queue.move_horizontally(1)
+    close = queue.close_claw()
+    vertical = queue.move_vertically(-1)
+    await vertical
+    assert horizontal.done() and close.done()
+    assert bc.get_state().elapsed == 3.5 + 1.0 + 0.3 + 1.5
+
+
+async def failure():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch0Scenario())
+    queue = ClawCommandQueue(bc)
+    futures = [queue.move_horizontally(-1), queue.move_horizontally(1), queue.open_claw()]
+    for future in futures:
+        exception_caught = False
+        try:
+            await future
+        except IllegalBallControlStateError as caught_err:
+            exception_caught = True
+            print(f"Expected exception caught: {caught_err}")
+        assert exception_caught
+
+    exception_caught = False
+    try:
+        await queue.move_vertically(1)
+    except IllegalBallControlStateError:
+        exception_caught = True
+    assert exception_caught
+    assert bc.get_position() == StatePosition(x=0, y=0)
+
+    # join after the failure
+    exception_caught = False
+    try:
+        await queue.join()
+    except IllegalBallControlStateError:
+        exception_caught = True
+    assert exception_caught
+
+
+async def first_error(fast_forward: bool):
+    """Both moves fail. join raises the error of the one that failed first."""
+    bc = get_headless_control_sim() if fast_forward else BallControlSim(update_reporter=UpdateReporter(), delay_multiplier=1.0)
+    await bc.set_scenario(Ch0Scenario())
+    queue = ClawCommandQueue(bc)
+    futures = [queue.move_horizontally(-5), queue.move_vertically(-50)]
+    await asyncio.wait(futures)
+    for future in futures:
+        assert isinstance(future.exception(), IllegalBallControlStateError)
+    exception_caught = False
+    try:
+        await queue.join()
+    except IllegalBallControlStateError as caught_err:
+        exception_caught = True
+        assert caught_err is futures[0].exception()
+    assert exception_caught
+
+
+async def failing_move_ball():
+    """The error is raised by the drop and by join. Nothing is logged."""
+    logged: list[dict] = []
+    asyncio.get_running_loop().set_exception_handler(lambda _, context: logged.append(context))
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch0Scenario())
+    queue = ClawCommandQueue(bc)
+    for future in [queue.move_ball(src=StatePosition(x=9, y=9), dest=StatePosition(x=0, y=4)), queue.join()]:
+        exception_caught = False
+        try:
+            await future
+        except IllegalBallControlStateError:
+            exception_caught = True
+        assert exception_caught
+    del future
+    gc.collect()
+    assert logged == []
+
+
+async def join_after_failure():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch0Scenario())
+    queue = ClawCommandQueue(bc)
+    future = queue.move_horizontally(-1)
+    await asyncio.wait([future])
+    assert isinstance(future.exception(), IllegalBallControlStateError)
+    assert queue.get_nof_pending() == 0
+    exception_caught = False
+    try:
+        await queue.join()
+    except IllegalBallControlStateError:
+        exception_caught = True
+    assert exception_caught
+
+
+def test_claw_command_queue():
+    asyncio.run(same_elapsed_as_gather())
+    run_virtual(same_elapsed_in_virtual_time())
+    asyncio.run(pipelining())
+    asyncio.run(failure())
+    asyncio.run(join_after_failure())
+    asyncio.run(failing_move_ball())
+    asyncio.run(first_error(fast_forward=True))
+    run_virtual(first_error(fast_forward=False))
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_claw_command_queue()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
@@ -0,0 +1,85 @@
+import asyncio
+import sys
+import pathlib
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control import BallControl
+from ball_control_sim import BallControlSim
+from ch13_scenario import Ch13Scenario
+from claw_planner import execute_column_moves, execute_plan, plan_column_moves
+from color_sorter import ColorSorter
+from control_factory import get_control_sim, get_headless_control_sim
+from test_utils import move_ball_by_column
+from virtual_clock import run_virtual
+
+
+def get_winning_sequence(bc: BallControl) -> list[tuple[int, int]]:
+    state = bc.get_state()
+    color_sorter = ColorSorter(max_x=state.max_x, max_y=state.max_y)
+    colors = sorted(set(ball.color for ball in state.balls))
+    balls = [color_sorter.empty_color] * (color_sorter.nof_columns * color_sorter.nof_rows)
+    for ball in state.balls:
+        balls[color_sorter.get_ball_index(x=ball.pos.x, y=ball.pos.y)] = colors.index(ball.color)
+    return color_sorter.find_winning_sequence(balls)
+
+
+async def naive_solution(bc: BallControlSim, seed: int) -> float:
+    await bc.set_scenario(Ch13Scenario(seed=seed))
+    for src_x, dest_x in get_winning_sequence(bc):
+        await move_ball_by_column(bc=bc, src_x=src_x, dest_x=dest_x)
+    assert bc.get_state().goal_accomplished
+    return bc.get_state().elapsed
+
+
+async def planned_solution(bc: BallControlSim, seed: int) -> float:
+    await bc.set_scenario(Ch13Scenario(seed=seed))
+    moves = get_winning_sequence(bc)
+    plan = plan_column_moves(state=bc.get_state(), moves=moves)
+    await execute_plan(bc=bc, plan=plan)
+    assert bc.get_state().goal_accomplished
+    assert bc.get_state().elapsed == plan.get_duration()
+    return bc.get_state().elapsed
+
+
+async def compare(seeds: list[int]) -> tuple[float, float]:
+    naive_elapsed = planned_elapsed = 0.0
+    for seed in seeds:
+        naive_elapsed += await naive_solution(bc=get_headless_control_sim(), seed=seed)
+        planned_elapsed += await planned_solution(bc=get_headless_control_sim(), seed=seed)
+    return naive_elapsed, planned_elapsed
+
+
+async def real_time_execution():
+    """Commands of a step start in the same order when not fast forwarding"""
+    bc = get_control_sim(1.0)
+    await bc.set_scenario(Ch13Scenario(seed=4050))
+    moves = get_winning_sequence(bc)
+    expected_elapsed = plan_column_moves(state=bc.get_state(), moves=moves).get_duration()
+    await execute_column_moves(bc=bc, moves=moves)
+    assert bc.get_state().goal_accomplished
+    assert abs(bc.get_state().elapsed - expected_elapsed) < 1e-9
+
+
+def test_claw_planner():
+    naive_elapsed, planned_elapsed = asyncio.run(compare(seeds=[4050, 1, 2]))
+    # one claw operation per move saved at least
+    assert planned_elapsed < naive_elapsed
+    run_virtual(real_time_execution())
+
+    # nothing to do
+    assert plan_column_moves(state=Ch13Scenario(seed=1).get_initial_state(), moves=[]).steps == []
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_claw_planner()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
+
+    seeds = list(range(20))
+    naive_elapsed, planned_elapsed = asyncio.run(compare(seeds=seeds))
+    print(f"{len(seeds)} Ch13 seeds. Virtual time naive: {naive_elapsed:0.1f} s, planned: {planned_elapsed:0.1f} s ({planned_elapsed / naive_elapsed:0.0%})")
@@ -0,0 +1,102 @@
+import asyncio
+import sys
+import pathlib
+from dataclasses import replace
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from ch14_scenario import Ch14Scenario
+from ch14_test import get_winning_sequence
+from ch6_scenario import Ch6Scenario
+from ch8_scenario import Ch8Scenario
+from claw_planner import execute_column_moves
+from claw_scheduler import MultiClawScheduler
+from update_reporter import UpdateReporter
+from virtual_clock import run_virtual
+
+
+def get_virtual_time_sim() -> BallControlSim:
+    return BallControlSim(update_reporter=UpdateReporter(), delay_multiplier=1.0)
+
+
+async def hand_off():
+    """Ch6: no claw reaches both outer columns"""
+    bc = get_virtual_time_sim()
+    await bc.set_scenario(Ch6Scenario())
+    scheduler = MultiClawScheduler(bc)
+    moves = [(4, 3), (0, 4), (3, 0)]
+    scheduled = scheduler.schedule(moves)
+    assert [(move.claw_index, move.src_x, move.dest_x) for move in scheduled] == [(1, 4, 3), (0, 0, 2), (1, 2, 4), (1, 3, 2), (0, 2, 0)]
+    await scheduler.execute(scheduled)
+    assert bc.get_state().goal_accomplished
+    parallel_elapsed = bc.get_state().elapsed
+    assert parallel_elapsed == scheduled[-1].estimated_end
+
+    # the same moves, one at a time
+    bc = get_virtual_time_sim()
+    await bc.set_scenario(Ch6Scenario())
+    await MultiClawScheduler(bc).execute([replace(move, prerequisites=list(range(move.seq))) for move in scheduled])
+    assert bc.get_state().goal_accomplished
+    assert parallel_elapsed < bc.get_state().elapsed
+
+
+async def overlapping_claws():
+    """Ch14: claws pushing each other aside"""
+    moves = get_winning_sequence()
+    bc = get_virtual_time_sim()
+    await bc.set_scenario(Ch14Scenario())
+    scheduled = await MultiClawScheduler(bc).run(moves)
+    assert bc.get_state().goal_accomplished
+    assert {move.claw_index for move in scheduled} == {0, 1}
+    scheduled_elapsed = bc.get_state().elapsed
+
+    bc = get_virtual_time_sim()
+    await bc.set_scenario(Ch14Scenario())
+    await execute_column_moves(bc=bc, moves=moves, claw_index=0)
+    assert bc.get_state().goal_accomplished
+    assert scheduled_elapsed <= bc.get_state().elapsed
+    print(f"Ch14 virtual time, one claw: {bc.get_state().elapsed:0.1f} s, scheduled: {scheduled_elapsed:0.1f} s")
+
+
+async def independent_moves():
+    """Moves using different columns run at the same time"""
+    bc = get_virtual_time_sim()
+    await bc.set_scenario(Ch14Scenario())
+    await MultiClawScheduler(bc).run([(1, 0), (1, 0)])
+    elapsed_one_claw = bc.get_state().elapsed
+
+    bc = get_virtual_time_sim()
+    await bc.set_scenario(Ch14Scenario())
+    scheduled = await MultiClawScheduler(bc).run([(1, 0), (4, 5), (1, 0), (4, 5)])
+    assert [move.claw_index for move in scheduled] == [0, 1, 0, 1]
+    assert bc.get_state().elapsed == elapsed_one_claw
+
+
+async def unreachable():
+    bc = get_virtual_time_sim()
+    await bc.set_scenario(Ch8Scenario())
+    exception_caught = False
+    try:
+        MultiClawScheduler(bc).schedule([(0, bc.get_state().max_x)])
+    except ValueError as caught_err:
+        exception_caught = True
+        print(f"Expected exception caught: {caught_err}")
+    assert exception_caught
+
+
+def test_claw_scheduler():
+    run_virtual(hand_off())
+    run_virtual(overlapping_claws())
+    run_virtual(independent_moves())
+    asyncio.run(unreachable())
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_claw_scheduler()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
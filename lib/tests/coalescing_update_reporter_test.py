@@ -0,0 +1,140 @@
+import asyncio
+import sys
+import pathlib
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from ch13_scenario import Ch13Scenario
+from coalescing_update_reporter import CoalescingUpdateReporter
+from state_update_model import StateDeltaUpdateModel, StateUpdateModel, get_default_state
+from test_utils import move_ball_by_column
+from update_reporter import UpdateReporter
+from virtual_clock import run_virtual
+
+
+class RecordingUpdateReporter(UpdateReporter):
+    """Rebuilds ball positions and claw positions from the updates it receives"""
+
+    def __init__(self):
+        self.fail = False
+        self.nof_updates = 0
+        self.goal_accomplished: list[bool] = []
+        self.ball_positions: dict[int, tuple[int, int] | None] = {}
+        self.claw_positions: list[tuple[int, int]] = []
+        self.max_x = 0
+
+    async def send_update(self, stateUpdate: StateUpdateModel):
+        if self.fail:
+            raise RuntimeError("display failed")
+        state = stateUpdate.state
+        self.nof_updates += 1
+        self.goal_accomplished.append(state.goal_accomplished)
+        if state.max_x:
+            self.max_x = state.max_x
+        if state.balls is not None:
+            self.ball_positions = {ball.id: (ball.pos.x, ball.pos.y) for ball in state.balls}
+            for claw in state.claws:
+                if claw.ball:
+                    self.ball_positions[claw.ball.id] = None
+        self.claw_positions = [(claw.pos.x, claw.pos.y) for claw in state.claws]
+
+    async def send_delta_update(self, deltaUpdate: StateDeltaUpdateModel):
+        self.nof_updates += 1
+        self.goal_accomplished.append(deltaUpdate.delta.goal_accomplished)
+        for ball_move in deltaUpdate.delta.ball_moves:
+            pos = ball_move.pos
+            self.ball_positions[ball_move.id] = (pos.x, pos.y) if pos else None
+        for claw_delta in deltaUpdate.delta.claws:
+            pos = claw_delta.changes.get("pos")
+            if pos is not None:
+                self.claw_positions[claw_delta.index] = (pos.x, pos.y)
+
+
+async def solve(delta_updates: bool, frame_interval: float) -> tuple[RecordingUpdateReporter, CoalescingUpdateReporter, BallControlSim]:
+    recorder = RecordingUpdateReporter()
+    reporter = CoalescingUpdateReporter(recorder, frame_interval=frame_interval)
+    bc = BallControlSim(update_reporter=reporter, delay_multiplier=1.0, delta_updates=delta_updates)
+    await bc.set_scenario(Ch13Scenario(seed=4050))
+    moves = [(0, 5), (5, 6), (1, 5)]
+    for src_x, dest_x in moves:
+        await move_ball_by_column(bc=bc, src_x=src_x, dest_x=dest_x)
+    await reporter.shutdown()
+    return recorder, reporter, bc
+
+
+def check_latest_state(recorder: RecordingUpdateReporter, bc: BallControlSim):
+    assert recorder.max_x == bc.state.max_x
+    if bc.delta_updates:
+        # full updates only include balls when a drop changes the scenario
+        assert recorder.ball_positions == {ball.id: (ball.pos.x, ball.pos.y) for ball in bc.state.balls}
+    assert recorder.claw_positions == [(claw.pos.x, claw.pos.y) for claw in bc.state.claws]
+
+
+async def goal_transition():
+    """Transitions are reported at once, even within a frame"""
+    recorder = RecordingUpdateReporter()
+    reporter = CoalescingUpdateReporter(recorder, frame_interval=1000.0)
+    bc = BallControlSim(update_reporter=reporter, delay_multiplier=1.0)
+    await bc.set_scenario(Ch13Scenario(seed=4050))
+    nof_reported = reporter.nof_reported
+    bc.state.goal_accomplished = True
+    await bc.move_horizontally(1)
+    assert reporter.nof_reported > nof_reported
+    assert recorder.goal_accomplished[-1]
+    bc.state.goal_accomplished = False
+    await bc.move_horizontally(-1)
+    assert recorder.goal_accomplished[-1] is False
+    await reporter.shutdown()
+
+
+async def failure_at_frame_end():
+    """An error reporting at the end of a frame is raised by the next send"""
+    recorder = RecordingUpdateReporter()
+    reporter = CoalescingUpdateReporter(recorder, frame_interval=1.0)
+    await reporter.send_update(StateUpdateModel(userId="glen", state=get_default_state(), delay_multiplier=1, seq=1))
+    recorder.fail = True
+    await reporter.send_update(StateUpdateModel(userId="glen", state=get_default_state(), delay_multiplier=1, seq=2))
+    # within the next frame, so not reported at once
+    await asyncio.sleep(1.5)
+    recorder.fail = False
+    exception_caught = False
+    try:
+        await reporter.send_update(StateUpdateModel(userId="glen", state=get_default_state(), delay_multiplier=1, seq=3))
+    except RuntimeError:
+        exception_caught = True
+    assert exception_caught
+    await reporter.shutdown()
+    assert recorder.nof_updates == 1
+
+
+def test_coalescing_update_reporter():
+    for delta_updates in [False, True]:
+        # every update in the same frame
+        recorder, reporter, bc = run_virtual(solve(delta_updates=delta_updates, frame_interval=1000.0))
+        assert reporter.nof_reported == recorder.nof_updates
+        assert reporter.nof_reported < reporter.nof_received // 4
+        check_latest_state(recorder, bc)
+
+        # reported at the end of each frame
+        recorder, reporter, bc = run_virtual(solve(delta_updates=delta_updates, frame_interval=2.0))
+        assert reporter.nof_reported < reporter.nof_received
+        check_latest_state(recorder, bc)
+
+        # nothing coalesced
+        recorder, reporter, bc = run_virtual(solve(delta_updates=delta_updates, frame_interval=0.0))
+        assert reporter.nof_reported == reporter.nof_received
+        check_latest_state(recorder, bc)
+
+    run_virtual(goal_transition())
+    run_virtual(failure_at_frame_end())
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_coalescing_update_reporter()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
@@ -0,0 +1,207 @@
+import random
+import sys
+import pathlib
+from collections import deque
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from color_sorter import ColorSorter, SearchBudgetExceededError, _SearchBoard
+
+
+def get_random_grid(color_sorter: ColorSorter, seed: int) -> list[int]:
+    color_bag = [color for color in range(color_sorter.nof_colors) for _ in range(color_sorter.nof_rows)]
+    random.Random(seed).shuffle(color_bag)
+    return color_bag + [color_sorter.empty_color] * (color_sorter.nof_empty_columns * color_sorter.nof_rows)
+
+
+def get_columns(color_sorter: ColorSorter, balls: list[int]) -> list[list[int]]:
+    """Columns bottom to top"""
+    return [
+        [balls[color_sorter.get_ball_index(x=x, y=y)] for y in range(color_sorter.max_y, -1, -1) if balls[color_sorter.get_ball_index(x=x, y=y)] != color_sorter.empty_color]
+        for x in range(color_sorter.nof_columns)
+    ]
+
+
+def is_goal(columns: list[list[int]]) -> bool:
+    colors = [column[0] for column in columns if column]
+    return len(colors) == len(set(colors)) and all(len(set(column)) <= 1 for column in columns)
+
+
+def play(color_sorter: ColorSorter, balls: list[int], moves: list[tuple[int, int]]) -> bool:
+    """Returns true if all moves are legal and lead to the goal"""
+    columns = get_columns(color_sorter, balls)
+    for src_x, dest_x in moves:
+        if not columns[src_x] or len(columns[dest_x]) == color_sorter.nof_rows:
+            return False
+        if columns[dest_x] and columns[dest_x][-1] != columns[src_x][-1]:
+            return False
+        columns[dest_x].append(columns[src_x].pop())
+    return is_goal(columns)
+
+
+def get_shortest_solution_length(color_sorter: ColorSorter, balls: list[int]) -> int:
+    """Breadth first search"""
+    start = tuple(tuple(column) for column in get_columns(color_sorter, balls))
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        position = queue.popleft()
+        if is_goal([list(column) for column in position]):
+            return distances[position]
+        for src_x, src_column in enumerate(position):
+            for dest_x, dest_column in enumerate(position):
+                if src_x == dest_x or not src_column or len(dest_column) == color_sorter.nof_rows:
+                    continue
+                if dest_column and dest_column[-1] != src_column[-1]:
+                    continue
+                columns = list(position)
+                columns[src_x] = src_column[:-1]
+                columns[dest_x] = dest_column + (src_column[-1],)
+                next_position = tuple(columns)
+                if next_position not in distances:
+                    distances[next_position] = distances[position] + 1
+                    queue.append(next_position)
+    return -1
+
+
+def incremental_updates():
+    """Hash and heuristic follow moves and are restored when moves are unmade"""
+    color_sorter = ColorSorter(max_x=7, max_y=4)
+    columns = get_columns(color_sorter, get_random_grid(color_sorter, 3))
+    board = _SearchBoard(columns=columns, nof_colors=color_sorter.nof_colors, nof_rows=color_sorter.nof_rows, rng=random.Random(0))
+    rng = random.Random(1)
+    moves: list[tuple[int, int]] = []
+    hashes = [board.hash]
+    for _ in range(200):
+        src_x = rng.choice([x for x, column in enumerate(board.columns) if column])
+        dest_x = rng.choice([x for x, column in enumerate(board.columns) if len(column) < color_sorter.nof_rows and x != src_x])
+        board.move(src_x, dest_x)
+        moves.append((src_x, dest_x))
+        hashes.append(board.hash)
+        assert board.h == ColorSorter.get_heuristic(board.columns)
+        assert board.empty_columns == {x for x, column in enumerate(board.columns) if not column}
+
+    for src_x, dest_x in reversed(moves):
+        assert board.hash == hashes.pop()
+        board.move(dest_x, src_x)
+    assert board.columns == columns and board.hash == hashes.pop()
+    assert board.h == ColorSorter.get_heuristic(columns)
+
+
+def symmetric_positions():
+    """Positions differing only by the order of their columns hash the same"""
+    color_sorter = ColorSorter(max_x=7, max_y=4)
+    columns = get_columns(color_sorter, get_random_grid(color_sorter, 3))
+    board = _SearchBoard(columns=columns, nof_colors=color_sorter.nof_colors, nof_rows=color_sorter.nof_rows, rng=random.Random(0))
+    rng = random.Random(2)
+    for _ in range(10):
+        permuted_columns = rng.sample(columns, len(columns))
+        permuted_board = _SearchBoard(columns=permuted_columns, nof_colors=color_sorter.nof_colors, nof_rows=color_sorter.nof_rows, rng=random.Random(0))
+        assert permuted_board.hash == board.hash
+
+    # the two empty columns are interchangeable
+    src_x = next(x for x, column in enumerate(columns) if column)
+    board.move(src_x, len(columns) - 1)
+    hash = board.hash
+    board.move(len(columns) - 1, src_x)
+    board.move(src_x, len(columns) - 2)
+    assert board.hash == hash
+
+    # identical columns do not cancel out
+    board = _SearchBoard(columns=[[0], [0], [1, 1], [1, 0]], nof_colors=3, nof_rows=2, rng=random.Random(0))
+    other_board = _SearchBoard(columns=[[1, 1], [1, 0], [], []], nof_colors=3, nof_rows=2, rng=random.Random(0))
+    assert board.hash != other_board.hash
+
+
+def test_color_sorter():
+    incremental_updates()
+    symmetric_positions()
+
+    # shortest solutions on small boards
+    for seed in range(10):
+        color_sorter = ColorSorter(max_x=4, max_y=2)
+        balls = get_random_grid(color_sorter, seed)
+        moves = color_sorter.find_winning_sequence(balls)
+        assert play(color_sorter, balls, moves)
+        assert len(moves) == get_shortest_solution_length(color_sorter, balls)
+
+    # Ch13 sized and larger boards
+    for max_x, max_y in [(6, 3), (7, 4)]:
+        color_sorter = ColorSorter(max_x=max_x, max_y=max_y)
+        balls = get_random_grid(color_sorter, 1)
+        moves = color_sorter.find_winning_sequence(balls)
+        assert play(color_sorter, balls, moves)
+        assert color_sorter.stats.nodes_expanded > 0 and color_sorter.stats.get_nodes_per_second() > 0
+        print(f"{max_x}x{max_y}: {len(moves)} moves. {color_sorter.stats}")
+
+    # a tiny transposition table evicts entries all the time but still finds the shortest solutions
+    for seed in range(10):
+        color_sorter = ColorSorter(max_x=4, max_y=2, transposition_table_size_log2=4)
+        balls = get_random_grid(color_sorter, seed)
+        moves = color_sorter.find_winning_sequence(balls)
+        assert play(color_sorter, balls, moves)
+        assert len(moves) == get_shortest_solution_length(color_sorter, balls)
+        assert color_sorter.result_cache.get_nof_used() <= 16
+
+    color_sorter = ColorSorter(max_x=7, max_y=4, transposition_table_size_log2=10)
+    moves = color_sorter.find_winning_sequence(get_random_grid(color_sorter, 1))
+    assert play(color_sorter, get_random_grid(color_sorter, 1), moves)
+    table = color_sorter.result_cache
+    assert table.replacements > 0 and table.get_nof_used() <= table.size
+    assert 0 < color_sorter.stats.get_cache_hit_rate() < 1
+    print(f"7x4, 1024 entries: {len(moves)} moves. {color_sorter.stats}")
+
+    # parallel search finds shortest solutions, the same ones each time
+    for seed in range(3):
+        color_sorter = ColorSorter(max_x=4, max_y=2)
+        balls = get_random_grid(color_sorter, seed)
+        moves = color_sorter.find_winning_sequence_parallel(balls, max_workers=2)
+        assert play(color_sorter, balls, moves)
+        assert len(moves) == get_shortest_solution_length(color_sorter, balls)
+
+    color_sorter = ColorSorter(max_x=7, max_y=4)
+    balls = get_random_grid(color_sorter, 1)
+    moves = color_sorter.find_winning_sequence_parallel(balls, max_workers=2)
+    assert play(color_sorter, balls, moves)
+    assert len(moves) == len(color_sorter.find_winning_sequence(balls))
+    assert color_sorter.find_winning_sequence_parallel(balls, max_workers=2) == moves
+    assert color_sorter.find_winning_sequence_parallel(sorted(balls), max_workers=2) == []
+
+    # already solved
+    color_sorter = ColorSorter(max_x=4, max_y=2)
+    assert color_sorter.find_winning_sequence(sorted(get_random_grid(color_sorter, 1))) == []
+
+    # no space to move
+    color_sorter = ColorSorter(max_x=2, max_y=1, nof_empty_columns=0)
+    exception_caught = False
+    try:
+        color_sorter.find_winning_sequence([0, 1, 1, 0, 2, 2])
+    except ValueError:
+        exception_caught = True
+    assert exception_caught
+
+    exception_caught = False
+    try:
+        color_sorter.find_winning_sequence_parallel([0, 1, 1, 0, 2, 2], max_workers=2)
+    except ValueError:
+        exception_caught = True
+    assert exception_caught
+
+    color_sorter = ColorSorter(max_x=7, max_y=4, node_budget=100)
+    exception_caught = False
+    try:
+        color_sorter.find_winning_sequence(get_random_grid(color_sorter, 1))
+    except SearchBudgetExceededError:
+        exception_caught = True
+    assert exception_caught
+    assert color_sorter.stats.nodes_expanded == 101
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_color_sorter()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
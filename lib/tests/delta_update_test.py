@@ -0,0 +1,91 @@
+import asyncio
+import copy
+import sys
+import pathlib
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from ch13_scenario import Ch13Scenario
+from state_update_model import StateDeltaUpdateModel, StateUpdateModel
+from test_utils import move_ball_by_column
+from update_reporter import UpdateReporter
+
+
+class ReplayingUpdateReporter(UpdateReporter):
+    """Rebuilds ball positions and claw state from keyframes and deltas"""
+
+    def __init__(self):
+        self.seqs: list[int] = []
+        self.nof_keyframes = 0
+        self.ball_positions: dict[int, tuple[int, int] | None] = {}
+        self.claws: list[dict[str, object]] = []
+
+    async def send_update(self, stateUpdate: StateUpdateModel):
+        state = copy.deepcopy(stateUpdate.state)
+        self.seqs.append(stateUpdate.seq)
+        self.nof_keyframes += 1
+        self.ball_positions = {ball.id: (ball.pos.x, ball.pos.y) for ball in state.balls}
+        for claw in state.claws:
+            if claw.ball:
+                self.ball_positions[claw.ball.id] = None
+        self.claws = [
+            {"pos": (claw.pos.x, claw.pos.y), "open": claw.open, "ball": claw.ball.id if claw.ball else None}
+            for claw in state.claws
+        ]
+
+    async def send_delta_update(self, deltaUpdate: StateDeltaUpdateModel):
+        self.seqs.append(deltaUpdate.seq)
+        for ball_move in deltaUpdate.delta.ball_moves:
+            pos = ball_move.pos
+            self.ball_positions[ball_move.id] = (pos.x, pos.y) if pos else None
+        for claw_delta in deltaUpdate.delta.claws:
+            for name, value in claw_delta.changes.items():
+                if name == "pos":
+                    value = (value.x, value.y)
+                if name in self.claws[claw_delta.index]:
+                    self.claws[claw_delta.index][name] = value
+
+
+async def replay(keyframe_interval: int):
+    reporter = ReplayingUpdateReporter()
+    bc = BallControlSim(update_reporter=reporter, delay_multiplier=0, delta_updates=True, keyframe_interval=keyframe_interval)
+    await bc.set_scenario(Ch13Scenario(seed=4050))
+
+    await move_ball_by_column(bc=bc, src_x=0, dest_x=5)
+    await move_ball_by_column(bc=bc, src_x=5, dest_x=6)
+    await move_ball_by_column(bc=bc, src_x=1, dest_x=5)
+    await bc.move_horizontally(1)
+    await bc.close_claw()
+
+    assert reporter.seqs == list(range(1, len(reporter.seqs) + 1))
+    assert reporter.nof_keyframes >= 1 + len(reporter.seqs) // keyframe_interval
+
+    expected_positions: dict[int, tuple[int, int] | None] = {ball.id: (ball.pos.x, ball.pos.y) for ball in bc.state.balls}
+    claw = bc.state.claws[0]
+    assert claw.ball
+    expected_positions[claw.ball.id] = None
+    assert reporter.ball_positions == expected_positions
+    assert reporter.claws == [{"pos": (claw.pos.x, claw.pos.y), "open": claw.open, "ball": claw.ball.id}]
+
+
+def test_delta_update():
+    asyncio.run(replay(keyframe_interval=7))
+    asyncio.run(replay(keyframe_interval=1000))
+
+    exception_caught = False
+    try:
+        BallControlSim(update_reporter=UpdateReporter(), delta_updates=True, keyframe_interval=0)
+    except ValueError:
+        exception_caught = True
+    assert exception_caught
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_delta_update()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
@@ -0,0 +1,92 @@
+import asyncio
+import sys
+import pathlib
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control import BallControl, IllegalBallControlStateError
+from ch0_scenario import Ch0Scenario
+from ch4_scenario import Ch4Scenario
+from control_factory import get_control_sim, get_headless_ch4_control_sim, get_headless_control_sim
+from state_update_model import StatePosition
+from test_utils import go_to_pos, move_ball, move_ball_by_column
+
+
+async def ch0_solution(bc: BallControl) -> float:
+    await move_ball(bc=bc, src=StatePosition(x=1, y=4), dest=StatePosition(x=0, y=4))
+    await move_ball_by_column(bc=bc, src_x=2, dest_x=0)
+    await move_ball_by_column(bc=bc, src_x=3, dest_x=0)
+    assert bc.get_state().goal_accomplished
+    return bc.get_state().elapsed
+
+
+async def same_elapsed_as_real_time():
+    bc = get_control_sim(0)
+    await bc.set_scenario(Ch0Scenario())
+    expected_elapsed = await ch0_solution(bc)
+
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch0Scenario())
+    assert await ch0_solution(bc) == expected_elapsed
+
+
+async def concurrency_violations():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch0Scenario())
+
+    exception_caught = False
+    try:
+        # overlapping horizontal moves: illegal
+        await asyncio.gather(bc.move_horizontally(1), bc.move_horizontally(1))
+    except IllegalBallControlStateError as caught_err:
+        exception_caught = True
+        print(f"Expected exception caught: {caught_err}")
+    assert exception_caught
+
+    await go_to_pos(bc=bc, dest=StatePosition(x=1, y=4), open_claw=False)
+    await bc.close_claw()
+
+    exception_caught = False
+    try:
+        # dropping while moving: illegal
+        await asyncio.gather(bc.move_vertically(-1), bc.open_claw())
+    except IllegalBallControlStateError as caught_err:
+        exception_caught = True
+        print(f"Expected exception caught: {caught_err}")
+    assert exception_caught
+
+    # concurrent moves along different axes overlap in virtual time
+    elapsed = bc.get_state().elapsed
+    await asyncio.gather(bc.move_horizontally(1), bc.move_vertically(1))
+    assert bc.get_state().elapsed == elapsed + 1.5
+
+
+async def ch4_validation():
+    bc = get_headless_ch4_control_sim()
+    await bc.set_scenario(Ch4Scenario())
+
+    await move_ball(bc=bc, src=StatePosition(x=0, y=0), dest=StatePosition(x=1, y=5))
+
+    exception_caught = False
+    try:
+        # dropping high ball on low ball: illegal move
+        await move_ball(bc=bc, src=StatePosition(x=0, y=1), dest=StatePosition(x=1, y=4))
+    except IllegalBallControlStateError:
+        exception_caught = True
+    assert exception_caught
+
+
+def test_fast_forward():
+    asyncio.run(same_elapsed_as_real_time())
+    asyncio.run(concurrency_violations())
+    asyncio.run(ch4_validation())
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_fast_forward()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
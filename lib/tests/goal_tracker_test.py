@@ -0,0 +1,94 @@
+import asyncio
+from dataclasses import replace
+import random
+import sys
+import pathlib
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from ch7_scenario import Ch7Scenario
+from ch8_scenario import Ch8Scenario
+from ch9_scenario import Ch9Scenario
+from ch10_scenario import Ch10Scenario
+from ch11_scenario import Ch11Scenario
+from ch13_scenario import Ch13Scenario
+from control_factory import get_control_sim
+from scenario import Scenario
+from state_update_model import StateBall, StatePosition
+from test_utils import get_column_top_occupied_pos, get_column_top_vacant_pos, go_to_pos
+
+
+def assert_tracker_agrees(bc: BallControlSim):
+    tracker = bc.state_manager.goal_tracker
+    scenario = bc.state_manager.scenario
+    assert tracker and scenario
+    assert tracker.is_in_goal_state(bc.state) == scenario.is_in_goal_state(bc.state)
+
+
+def is_legal_move(bc: BallControlSim, src_x: int, dest_x: int, same_color_only: bool) -> bool:
+    index = bc.state_manager.index
+    src_ball = index.get_top_ball(src_x)
+    if src_ball is None or index.get_top_vacant_y(dest_x) < 0:
+        return False
+    dest_ball = index.get_top_ball(dest_x)
+    return not same_color_only or dest_ball is None or dest_ball.color == src_ball.color
+
+
+async def random_walk(scenario: Scenario, nof_moves: int, same_color_only: bool = False):
+    bc = get_control_sim(0)
+    await bc.set_scenario(scenario)
+    assert_tracker_agrees(bc)
+
+    claw = bc.state.claws[0]
+    columns = range(max(0, claw.min_x), min(bc.state.max_x, claw.max_x) + 1)
+    rand = random.Random(1234)
+    for _ in range(nof_moves):
+        moves = [
+            (src_x, dest_x)
+            for src_x in columns
+            for dest_x in columns
+            if src_x != dest_x and is_legal_move(bc, src_x=src_x, dest_x=dest_x, same_color_only=same_color_only)
+        ]
+        src_x, dest_x = rand.choice(moves)
+        await go_to_pos(bc=bc, dest=get_column_top_occupied_pos(bc=bc, x=src_x), open_claw=True)
+        await bc.close_claw()
+        assert_tracker_agrees(bc)
+        await go_to_pos(bc=bc, dest=get_column_top_vacant_pos(bc=bc, x=dest_x), open_claw=False)
+        await bc.open_claw()
+        assert_tracker_agrees(bc)
+
+
+def goal_state():
+    sc = Ch7Scenario(seed=1)
+    balls = [
+        StateBall(pos=StatePosition(x=0, y=y), color="yellow", value=y)
+        for y in range(2, 7)
+    ]
+    state = replace(sc.get_initial_state(), balls=balls)
+    assert sc.is_in_goal_state(state)
+    tracker = sc.get_goal_tracker(state)
+    assert tracker and tracker.is_in_goal_state(state)
+
+    # swap two values
+    balls[0].value, balls[1].value = balls[1].value, balls[0].value
+    assert not sc.is_in_goal_state(state)
+    tracker = sc.get_goal_tracker(state)
+    assert tracker and not tracker.is_in_goal_state(state)
+
+
+def test_goal_tracker():
+    goal_state()
+    for scenario in [Ch7Scenario(seed=1), Ch8Scenario(seed=2), Ch9Scenario(seed=3), Ch10Scenario(seed=4), Ch11Scenario(seed=5)]:
+        asyncio.run(random_walk(scenario=scenario, nof_moves=100))
+    asyncio.run(random_walk(scenario=Ch13Scenario(seed=4050), nof_moves=100, same_color_only=True))
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_goal_tracker()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
@@ -0,0 +1,139 @@
+import asyncio
+import sys
+import pathlib
+import tracemalloc
+from dataclasses import replace
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from ch7_scenario import Ch7Scenario
+from multi_board_sim import BatchedUpdateReporter, MultiBoardSim
+from state_update_model import MultiBoardUpdateModel, StateDeltaModel, StateDeltaUpdateModel, StatePosition, StateUpdateModel
+from test_utils import sort_column
+from update_reporter import UpdateReporter
+from virtual_clock import run_virtual
+
+
+class CollectingUpdateReporter(UpdateReporter):
+    multi_board_updates: list[MultiBoardUpdateModel]
+
+    def __init__(self):
+        self.multi_board_updates = []
+
+    async def send_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel):
+        self.multi_board_updates.append(multiBoardUpdate)
+
+
+class FailingUpdateReporter(UpdateReporter):
+    async def send_multi_board_update(self, multiBoardUpdate: MultiBoardUpdateModel):
+        raise RuntimeError("report failed")
+
+
+async def ch7_solution(bc: BallControlSim):
+    await sort_column(bc=bc, src_x1=1, src_x2=2, dest_x=0, nof_balls=len(bc.get_state().balls), claw_index=0)
+
+
+async def many_boards(nof_boards: int) -> CollectingUpdateReporter:
+    reporter = CollectingUpdateReporter()
+    async with MultiBoardSim(update_reporter=reporter, nof_boards=nof_boards) as sim:
+        await sim.set_scenario(Ch7Scenario(seed=3))
+        assert sim.get_nof_goals_accomplished() == 0
+        assert all(len(board.state.balls) == 5 for board in sim.boards)
+
+        # boards do not share balls
+        assert sim.get_board(0).state.balls[0] is not sim.get_board(1).state.balls[0]
+
+        errors = await sim.run(ch7_solution)
+        assert errors == [None] * nof_boards
+        assert sim.get_nof_goals_accomplished() == nof_boards
+
+        # a failing board does not affect the others
+        errors = await sim.run(lambda bc: bc.move_horizontally(-1), boards=[1])
+        assert errors[0] is not None
+        assert sim.get_nof_goals_accomplished() == nof_boards
+
+    return reporter
+
+
+async def batching():
+    # the update is reported as it was added
+    reporter = CollectingUpdateReporter()
+    batch = BatchedUpdateReporter(update_reporter=reporter, tick_interval=1.0)
+    state = Ch7Scenario(seed=3).get_initial_state()
+    batch.add(board=0, stateUpdate=StateUpdateModel(userId="glen", state=state, delay_multiplier=1, seq=1))
+    state.balls[0].pos = StatePosition(x=4, y=4)
+    batch.add(board=0, stateUpdate=StateUpdateModel(userId="glen", state=replace(state, balls=None, max_x=0, max_y=0), delay_multiplier=1, seq=2))
+    await batch.flush()
+    reported = reporter.multi_board_updates[0].updates[0].update.state
+    assert reported.balls and reported.balls[0].pos == Ch7Scenario(seed=3).get_initial_state().balls[0].pos
+    assert reported.max_x == state.max_x
+
+    # boards must send full updates
+    exception_caught = False
+    try:
+        delta = StateDeltaModel(claws=[], ball_moves=[], goal_accomplished=False, elapsed=0.0)
+        await batch.get_board_reporter(0).send_delta_update(StateDeltaUpdateModel(userId="glen", seq=3, delta=delta, delay_multiplier=1))
+    except ValueError:
+        exception_caught = True
+    assert exception_caught
+
+    # an error at the end of a tick is raised by the next add
+    batch = BatchedUpdateReporter(update_reporter=FailingUpdateReporter(), tick_interval=1.0)
+    batch.add(board=0, stateUpdate=StateUpdateModel(userId="glen", state=state, delay_multiplier=1, seq=1))
+    await asyncio.sleep(2.0)
+    exception_caught = False
+    try:
+        batch.add(board=0, stateUpdate=StateUpdateModel(userId="glen", state=state, delay_multiplier=1, seq=2))
+    except RuntimeError:
+        exception_caught = True
+    assert exception_caught
+
+
+async def board_overhead(nof_boards: int) -> float:
+    """Returns allocated bytes per board"""
+    tracemalloc.start()
+    s = tracemalloc.get_traced_memory()[0]
+    sim = MultiBoardSim(update_reporter=UpdateReporter(), nof_boards=nof_boards)
+    await sim.set_scenario(Ch7Scenario(seed=3))
+    allocated = tracemalloc.get_traced_memory()[0] - s
+    tracemalloc.stop()
+    return allocated / len(sim)
+
+
+def test_multi_board_sim():
+    nof_boards = 100
+    reporter = run_virtual(many_boards(nof_boards))
+
+    updates = reporter.multi_board_updates
+    assert [update.tick for update in updates] == list(range(1, len(updates) + 1))
+    for multi_board_update in updates:
+        boards = [board_update.board for board_update in multi_board_update.updates]
+        assert len(boards) == len(set(boards))
+
+    # first tick reports balls and dimensions of every board
+    assert len(updates[0].updates) == nof_boards
+    assert all(board_update.update.state.balls and board_update.update.state.max_x for board_update in updates[0].updates)
+
+    # far fewer reports than board updates
+    assert len(updates) < 1000
+
+    last_updates = {board_update.board: board_update.update for multi_board_update in updates for board_update in multi_board_update.updates}
+    assert len(last_updates) == nof_boards
+    assert all(update.state.goal_accomplished for update in last_updates.values())
+
+    run_virtual(batching())
+
+    bytes_per_board = run_virtual(board_overhead(nof_boards=1000))
+    print(f"{bytes_per_board:0.0f} bytes per board")
+    assert bytes_per_board < 20000
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_multi_board_sim()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
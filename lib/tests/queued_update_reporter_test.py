@@ -0,0 +1,138 @@
+import asyncio
+import sys
+import pathlib
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from ch13_scenario import Ch13Scenario
+from queued_update_reporter import BLOCK, COALESCE, DROP_OLDEST, QueuedUpdateReporter
+from state_update_model import StateDeltaUpdateModel, StateUpdateModel
+from test_utils import move_ball_by_column
+from update_reporter import UpdateReporter
+from virtual_clock import run_virtual
+
+
+class SlowUpdateReporter(UpdateReporter):
+    """Takes display_duration to report an update. Records claw and ball positions."""
+
+    def __init__(self, display_duration: float, fail: bool = False):
+        self.display_duration = display_duration
+        self.fail = fail
+        self.claw_positions: list[tuple[int, int]] = []
+        self.ball_positions: dict[int, tuple[int, int] | None] = {}
+        self.is_shut_down = False
+
+    async def send_update(self, stateUpdate: StateUpdateModel):
+        if self.display_duration:
+            await asyncio.sleep(self.display_duration)
+        if self.fail:
+            raise RuntimeError("display failed")
+        state = stateUpdate.state
+        self.claw_positions.append((state.claws[0].pos.x, state.claws[0].pos.y))
+        if state.balls is not None:
+            self.ball_positions = {ball.id: (ball.pos.x, ball.pos.y) for ball in state.balls}
+            for claw in state.claws:
+                if claw.ball:
+                    self.ball_positions[claw.ball.id] = None
+
+    async def send_delta_update(self, deltaUpdate: StateDeltaUpdateModel):
+        if self.display_duration:
+            await asyncio.sleep(self.display_duration)
+        for claw_delta in deltaUpdate.delta.claws:
+            pos = claw_delta.changes.get("pos")
+            if pos is not None:
+                self.claw_positions.append((pos.x, pos.y))
+        for ball_move in deltaUpdate.delta.ball_moves:
+            pos = ball_move.pos
+            self.ball_positions[ball_move.id] = (pos.x, pos.y) if pos else None
+
+    async def shutdown(self):
+        self.is_shut_down = True
+
+
+async def solve(update_reporter: UpdateReporter, delta_updates: bool = False) -> tuple[BallControlSim, float]:
+    """Returns the simulator and the time until the last command completed"""
+    bc = BallControlSim(update_reporter=update_reporter, delay_multiplier=1.0, delta_updates=delta_updates, keyframe_interval=10)
+    async with bc:
+        await bc.set_scenario(Ch13Scenario(seed=4050))
+        for src_x, dest_x in [(0, 5), (5, 6), (1, 5)]:
+            await move_ball_by_column(bc=bc, src_x=src_x, dest_x=dest_x)
+        elapsed = asyncio.get_running_loop().time()
+    return bc, elapsed
+
+
+def get_positions(bc: BallControlSim) -> dict[int, tuple[int, int] | None]:
+    return {ball.id: (ball.pos.x, ball.pos.y) for ball in bc.state.balls}
+
+
+async def failing_reporter():
+    reporter = QueuedUpdateReporter(SlowUpdateReporter(display_duration=0.1, fail=True))
+    exception_caught = False
+    try:
+        await solve(reporter)
+    except RuntimeError:
+        exception_caught = True
+    assert exception_caught
+    assert reporter.update_reporter.is_shut_down  # type: ignore[attr-defined]
+    assert reporter.nof_reported == 0 and reporter.nof_failed > 0
+
+
+def test_queued_update_reporter():
+    # reporting directly delays every command
+    direct = SlowUpdateReporter(display_duration=0.5)
+    bc, direct_elapsed = run_virtual(solve(direct))
+    assert direct_elapsed > bc.state.elapsed + 2
+
+    # queued, commands run at simulation speed and every update is reported as it was sent
+    instant = SlowUpdateReporter(display_duration=0.0)
+    run_virtual(solve(instant))
+    slow = SlowUpdateReporter(display_duration=0.5)
+    reporter = QueuedUpdateReporter(slow, max_size=1000, policy=BLOCK)
+    bc, elapsed = run_virtual(solve(reporter))
+    assert abs(elapsed - bc.state.elapsed) < 1e-9
+    assert reporter.nof_reported == reporter.nof_received
+    assert slow.claw_positions == instant.claw_positions
+    assert slow.is_shut_down
+
+    # a small queue blocks commands when full
+    reporter = QueuedUpdateReporter(SlowUpdateReporter(display_duration=0.5), max_size=2, policy=BLOCK)
+    bc, elapsed = run_virtual(solve(reporter))
+    assert bc.state.elapsed < elapsed <= direct_elapsed
+
+    # dropping keeps the latest updates
+    slow = SlowUpdateReporter(display_duration=2.0)
+    reporter = QueuedUpdateReporter(slow, max_size=2, policy=DROP_OLDEST)
+    bc, elapsed = run_virtual(solve(reporter))
+    assert abs(elapsed - bc.state.elapsed) < 1e-9
+    assert reporter.nof_dropped > 0
+    assert reporter.nof_reported + reporter.nof_dropped == reporter.nof_received
+    assert slow.claw_positions[-1] == (bc.state.claws[0].pos.x, bc.state.claws[0].pos.y)
+
+    # coalescing deltas keeps clients up to date
+    slow = SlowUpdateReporter(display_duration=2.0)
+    reporter = QueuedUpdateReporter(slow, max_size=2, policy=COALESCE)
+    bc, elapsed = run_virtual(solve(reporter, delta_updates=True))
+    assert reporter.nof_coalesced > 0
+    assert reporter.nof_reported + reporter.nof_coalesced == reporter.nof_received
+    assert slow.ball_positions == get_positions(bc)
+    assert slow.claw_positions[-1] == (bc.state.claws[0].pos.x, bc.state.claws[0].pos.y)
+
+    run_virtual(failing_reporter())
+
+    exception_caught = False
+    try:
+        QueuedUpdateReporter(UpdateReporter(), policy="newest")
+    except ValueError:
+        exception_caught = True
+    assert exception_caught
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_queued_update_reporter()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
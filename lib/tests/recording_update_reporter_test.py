@@ -0,0 +1,181 @@
+import asyncio
+import os
+import sys
+import pathlib
+import tempfile
+from dataclasses import replace
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from ch13_scenario import Ch13Scenario
+from recording_update_reporter import RecordingUpdateReporter, ReplayReader, get_index_path
+from state_update_model import ClawDelta, StateDeltaModel, StateDeltaUpdateModel, StatePosition, StateUpdateModel
+from test_utils import move_ball_by_column
+from update_serializer import BinarySerializer
+
+
+def get_ball_positions(reader: ReplayReader, end_seq: int | None = None) -> dict[int, tuple[int, int] | None]:
+    """Ball positions rebuilt from keyframes and deltas"""
+    ball_positions: dict[int, tuple[int, int] | None] = {}
+    for update in reader.iter_updates(end_seq=end_seq):
+        if isinstance(update, StateUpdateModel):
+            assert update.state.balls is not None
+            ball_positions = {ball.id: (ball.pos.x, ball.pos.y) for ball in update.state.balls}
+            for claw in update.state.claws:
+                if claw.ball:
+                    ball_positions[claw.ball.id] = None
+        else:
+            assert isinstance(update, StateDeltaUpdateModel)
+            for ball_move in update.delta.ball_moves:
+                pos = ball_move.pos
+                ball_positions[ball_move.id] = (pos.x, pos.y) if pos else None
+    return ball_positions
+
+
+async def record(path: str, index_interval: int) -> BallControlSim:
+    reporter = RecordingUpdateReporter(path, index_interval=index_interval, buffer_size=256)
+    bc = BallControlSim(update_reporter=reporter, delay_multiplier=0, delta_updates=True, keyframe_interval=10)
+    async with bc:
+        await bc.set_scenario(Ch13Scenario(seed=4050))
+        await move_ball_by_column(bc=bc, src_x=0, dest_x=5)
+        await move_ball_by_column(bc=bc, src_x=5, dest_x=6)
+        await move_ball_by_column(bc=bc, src_x=1, dest_x=5)
+    assert reporter.nof_records == bc._seq
+    return bc
+
+
+def check_replay(path: str, bc: BallControlSim):
+    with ReplayReader(path) as reader:
+        assert len(reader) == bc._seq
+        expected_positions = {ball.id: (ball.pos.x, ball.pos.y) for ball in bc.state.balls}
+        assert get_ball_positions(reader) == expected_positions
+
+        # seeking matches reading from the start
+        offset = reader.seek(0)
+        for seq in range(1, len(reader) + 1):
+            assert reader.seek(seq) == offset
+            update = reader.get_update(seq)
+            assert isinstance(update, (StateUpdateModel, StateDeltaUpdateModel)) and update.seq == seq
+            offset = reader.read(offset)[2]
+        assert offset == reader.end_offset
+        assert reader.seek(len(reader) + 1) == reader.end_offset
+        assert [update.seq for update in reader.iter_updates(start_seq=12, end_seq=15)] == [12, 13, 14]  # type: ignore[union-attr]
+
+        exception_caught = False
+        try:
+            reader.get_update(len(reader) + 1)
+        except KeyError:
+            exception_caught = True
+        assert exception_caught
+
+
+def test_recording_update_reporter():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.log")
+        bc = asyncio.run(record(path, index_interval=4))
+        check_replay(path, bc)
+
+        # without an index
+        os.remove(get_index_path(path))
+        check_replay(path, bc)
+
+        # a partially written record is ignored, and overwritten when recording continues
+        with open(path, "ab") as log:
+            log.write(b"\x40\x00\x00\x00\x63\x00")
+        check_replay(path, bc)
+        reporter = RecordingUpdateReporter(path, index_interval=4)
+        assert reporter.nof_records == bc._seq
+        delta = StateDeltaModel(claws=[ClawDelta(index=0, changes={"pos": StatePosition(x=1, y=1)})], ball_moves=[], goal_accomplished=False, elapsed=1.0)
+        next_update = StateDeltaUpdateModel(userId="glen", seq=bc._seq + 1, delta=delta, delay_multiplier=0)
+        asyncio.run(reporter.send_delta_update(next_update))
+        asyncio.run(reporter.shutdown())
+        with ReplayReader(path) as reader:
+            assert len(reader) == bc._seq + 1
+            assert reader.get_update(bc._seq + 1) == next_update
+            assert get_ball_positions(reader, end_seq=bc._seq + 1) == {ball.id: (ball.pos.x, ball.pos.y) for ball in bc.state.balls}
+
+        # seqs must not decrease, also when continuing a log
+        reporter = RecordingUpdateReporter(path, index_interval=4)
+        assert reporter.last_seq == bc._seq + 1
+        exception_caught = False
+        try:
+            asyncio.run(reporter.send_delta_update(replace(next_update, seq=1)))
+        except ValueError:
+            exception_caught = True
+        assert exception_caught
+        asyncio.run(reporter.shutdown())
+
+        # a new log does not reuse the index of a removed one
+        os.remove(path)
+        bc = asyncio.run(record(path, index_interval=8))
+        check_replay(path, bc)
+        with open(get_index_path(path), "rb") as index_file:
+            assert len(index_file.read()) == ((bc._seq - 1) // 8 + 1) * 20  # bytes per entry
+
+        # a header cut short is written again
+        os.remove(path)
+        with open(path, "wb") as log:
+            log.write(b"BSL")
+        bc = asyncio.run(record(path, index_interval=4))
+        check_replay(path, bc)
+        with ReplayReader(path, index_interval=4) as reader:
+            assert [number for number, _, _ in reader.get_index_entries()] == list(range(0, len(reader), 4))
+
+        not_a_log = os.path.join(directory, "other.log")
+        with open(not_a_log, "wb") as file:
+            file.write(BinarySerializer().serialize_delta_update(next_update))
+        exception_caught = False
+        try:
+            ReplayReader(not_a_log)
+        except ValueError:
+            exception_caught = True
+        assert exception_caught
+
+        # nothing is appended to a file that is not a log
+        for content in [b"BSLOG\x09", BinarySerializer().serialize_delta_update(next_update)]:
+            with open(not_a_log, "wb") as file:
+                file.write(content)
+            exception_caught = False
+            try:
+                RecordingUpdateReporter(not_a_log)
+            except ValueError:
+                exception_caught = True
+            assert exception_caught
+            with open(not_a_log, "rb") as file:
+                assert file.read() == content
+
+
+async def record_long_run(path: str, nof_updates: int):
+    reporter = RecordingUpdateReporter(path)
+    for seq in range(1, nof_updates + 1):
+        delta = StateDeltaModel(claws=[ClawDelta(index=0, changes={"pos": StatePosition(x=seq % 10, y=1)})], ball_moves=[], goal_accomplished=False, elapsed=seq)
+        await reporter.send_delta_update(StateDeltaUpdateModel(userId="glen", seq=seq, delta=delta, delay_multiplier=1))
+    await reporter.shutdown()
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    s = time.perf_counter()
+    test_recording_update_reporter()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
+
+    # about an hour of updates from 300 claws at one update per second each
+    nof_updates = 1_000_000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "long.log")
+        s = time.perf_counter()
+        asyncio.run(record_long_run(path, nof_updates))
+        print(f"Recorded {nof_updates} updates, {os.path.getsize(path) / 1e6:0.1f} MB, in {time.perf_counter() - s:0.2f} seconds.")
+        s = time.perf_counter()
+        with ReplayReader(path) as reader:
+            opened = time.perf_counter() - s
+            seqs = [random.randint(1, nof_updates) for _ in range(10000)]
+            s = time.perf_counter()
+            for seq in seqs:
+                reader.get_update(seq)
+            print(f"Opened in {opened * 1000:0.1f} ms. Random seek and read: {(time.perf_counter() - s) / len(seqs) * 1e6:0.1f} us")
@@ -0,0 +1,91 @@
+import asyncio
+import sys
+import pathlib
+import timeit
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ch10_scenario import Ch10Scenario
+from ch13_scenario import Ch13Scenario
+from control_factory import get_headless_control_sim
+from state_update_model import StateBall, StatePosition
+from test_utils import move_ball_by_column
+
+
+async def snapshots():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch13Scenario(seed=4050))
+
+    # shared until the state changes
+    snapshot = bc.get_state()
+    assert bc.get_state() is snapshot
+    positions = [ball.pos for ball in snapshot.balls]
+
+    await move_ball_by_column(bc=bc, src_x=0, dest_x=5)
+    new_snapshot = bc.get_state()
+    assert new_snapshot is not snapshot
+
+    # earlier snapshots do not change
+    assert [ball.pos for ball in snapshot.balls] == positions
+    assert snapshot.claws[0].pos == StatePosition(x=0, y=0) and snapshot.elapsed == 0
+    assert new_snapshot.claws[0].pos != snapshot.claws[0].pos and new_snapshot.elapsed > 0
+
+    # only the moved ball is copied again
+    moved = [ball for ball in new_snapshot.balls if ball.pos.x == 5]
+    assert len(moved) == 1
+    assert set(map(id, new_snapshot.balls)) - set(map(id, snapshot.balls)) == {id(moved[0])}
+
+    # snapshots are copies
+    assert all(ball is not live_ball for ball, live_ball in zip(new_snapshot.balls, bc.state.balls))
+    assert new_snapshot.claws[0] is not bc.state.claws[0]
+
+
+async def hidden_values():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch10Scenario(seed=4711))
+    assert all(ball.value is None for ball in bc.get_state().balls)
+    assert all(ball.value is not None for ball in bc.state.balls)
+
+    # held balls are hidden too
+    await move_ball_by_column(bc=bc, src_x=0, dest_x=1)
+    await bc.close_claw()
+    held_ball = bc.get_state().claws[0].ball
+    assert held_ball and held_ball.value is None
+
+    # revealed
+    await move_ball_by_column(bc=bc, src_x=1, dest_x=bc.state.max_x)
+    revealed = [ball for ball in bc.get_state().balls if ball.pos.x == bc.state.max_x]
+    assert len(revealed) == 1 and revealed[0].value is not None
+
+
+def test_state_snapshot():
+    asyncio.run(snapshots())
+    asyncio.run(hidden_values())
+
+
+async def get_large_board_sim(nof_balls: int):
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch13Scenario(seed=1))
+    bc.state.balls = [StateBall(pos=StatePosition(x=i % 100, y=i // 100), color="red", value=i, value_visible=i % 2 == 0, id=i + 1) for i in range(nof_balls)]
+    return bc
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_state_snapshot()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
+
+    for nof_balls in [100, 10000]:
+        bc = asyncio.run(get_large_board_sim(nof_balls))
+        unchanged = min(timeit.repeat(bc.get_state, number=1000, repeat=3)) / 1000
+
+        def after_change():
+            bc.state = bc.state
+            bc.get_state()
+
+        changed = min(timeit.repeat(after_change, number=10, repeat=3)) / 10
+        print(f"{nof_balls} balls. get_state unchanged: {unchanged * 1e6:0.2f} us, after a change: {changed * 1e6:0.0f} us")
@@ -0,0 +1,87 @@
+import asyncio
+import sys
+import pathlib
+import tracemalloc
+from dataclasses import FrozenInstanceError, asdict
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ch7_scenario import Ch7Scenario
+from control_factory import get_headless_control_sim
+from state_update_model import BallMove, StateBall, StatePosition, serializable_dict_factory
+from test_utils import move_ball_by_column
+
+
+def bytes_per_ball(nof_balls: int) -> float:
+    tracemalloc.start()
+    s = tracemalloc.get_traced_memory()[0]
+    balls = [StateBall(pos=StatePosition(x=i % 100, y=i // 100), color="yellow", value=i) for i in range(nof_balls)]
+    allocated = tracemalloc.get_traced_memory()[0] - s
+    tracemalloc.stop()
+    return allocated / len(balls)
+
+
+async def moves_in_place():
+    bc = get_headless_control_sim()
+    await bc.set_scenario(Ch7Scenario(seed=1))
+    top_ball = bc.state_manager.index.get_top_ball(1)
+    assert top_ball
+
+    await move_ball_by_column(bc=bc, src_x=1, dest_x=0)
+
+    # the dropped ball is the grabbed ball, not a copy
+    assert bc.state_manager.index.get_top_ball(0) is top_ball
+    assert top_ball.pos == StatePosition(x=0, y=6)
+
+
+async def ids_per_board():
+    bc1 = get_headless_control_sim()
+    bc2 = get_headless_control_sim()
+    for _ in range(2):
+        await bc1.set_scenario(Ch7Scenario(seed=1))
+        await bc2.set_scenario(Ch7Scenario(seed=2))
+
+        # ids are allocated per board and restart when a scenario is set
+        assert [ball.id for ball in bc1.state.balls] == [1, 2, 3, 4, 5]
+        assert [ball.id for ball in bc2.state.balls] == [1, 2, 3, 4, 5]
+
+    await bc1.close_claw() # claw above empty column 0
+    await move_ball_by_column(bc=bc1, src_x=1, dest_x=2)
+    assert sorted(ball.id for ball in bc1.state.balls) == [1, 2, 3, 4, 5]
+    assert bc1.state_manager.allocate_ball_id() == 6
+
+    serialized = asdict(bc1.get_state(), dict_factory=serializable_dict_factory)
+    assert sorted(ball["id"] for ball in serialized["balls"]) == ["1", "2", "3", "4", "5"]
+
+
+def test_state_update_model():
+    pos = StatePosition(x=1, y=2)
+    assert not hasattr(pos, "__dict__")
+    assert pos == StatePosition(x=1, y=2) and hash(pos) == hash(StatePosition(x=1, y=2))
+    exception_caught = False
+    try:
+        pos.x = 3 # type: ignore[misc]
+    except FrozenInstanceError:
+        exception_caught = True
+    assert exception_caught
+
+    ball = StateBall(pos=pos, color="blue")
+    assert not hasattr(ball, "__dict__")
+    assert asdict(BallMove(id=12, pos=None), dict_factory=serializable_dict_factory) == {"id": "12", "pos": None}
+
+    size = bytes_per_ball(10000)
+    print(f"{size:0.0f} bytes per ball")
+    assert size < 200 # about 310 bytes with dict based balls and string ids
+
+    asyncio.run(moves_in_place())
+    asyncio.run(ids_per_board())
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_state_update_model()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
@@ -28,22 +28,15 @@ async def move_ball(
     await bc.open_claw(claw_index=claw_index)
 
 def get_column_top_occupied_y(bc: BallControl, x: int) -> int:
-    return min(
-        [ball.pos.y for ball in bc.get_state().balls if ball.pos.x == x],
-        default=bc.get_state().max_y,
-    )
+    top_ball = bc.get_top_ball(x)
+    return top_ball.pos.y if top_ball else bc.get_state().max_y
 
 def get_column_top_occupied_pos(bc: BallControl, x: int) -> StatePosition:
     return StatePosition(x=x, y=get_column_top_occupied_y(bc=bc, x=x))
 
 def get_column_top_vacant_y(bc: BallControl, x: int) -> int:
-    return (
-        min(
-            [ball.pos.y for ball in bc.get_state().balls if ball.pos.x == x],
-            default=bc.get_state().max_y + 1,
-        )
-        - 1
-    )
+    top_ball = bc.get_top_ball(x)
+    return (top_ball.pos.y if top_ball else bc.get_state().max_y + 1) - 1
 
 def get_column_top_vacant_pos(bc: BallControl, x: int) -> StatePosition:
     return StatePosition(x=x, y=get_column_top_vacant_y(bc=bc, x=x))
@@ -70,12 +63,8 @@ async def sort_column(
     """takes balls from columns src_x1 and src_x2 and puts them, ordered by value, in column dest_x"""
 
     for _ in range(nof_balls):
-        column1: list[StateBall] = [
-            ball for ball in bc.get_state().balls if ball.pos.x == src_x1
-        ]
-        column2: list[StateBall] = [
-            ball for ball in bc.get_state().balls if ball.pos.x == src_x2
-        ]
+        column1: list[StateBall] = bc.get_column(src_x1)
+        column2: list[StateBall] = bc.get_column(src_x2)
         column1_sorted = [
             0 if ball.value is None else ball.value
             for ball in sorted(column1, key=lambda ball: ball.pos.y)
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import sys
+import pathlib
+import timeit
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ball_control_sim import BallControlSim
+from ch13_scenario import Ch13Scenario
+from state_update_model import (
+    BoardUpdateModel,
+    Claw,
+    ClawDelta,
+    Highlight,
+    MultiBoardUpdateModel,
+    Spotlight,
+    StateBall,
+    StateDeltaModel,
+    StateDeltaUpdateModel,
+    StateModel,
+    StatePosition,
+    StateUpdateModel,
+)
+from test_utils import move_ball_by_column
+from update_reporter import UpdateReporter
+from update_serializer import AsdictJsonSerializer, BinarySerializer, JsonSerializer
+
+
+class CollectingUpdateReporter(UpdateReporter):
+    def __init__(self):
+        self.updates: list[StateUpdateModel | StateDeltaUpdateModel] = []
+
+    async def send_update(self, stateUpdate: StateUpdateModel):
+        # full updates share the live state
+        self.updates.append(BinarySerializer().deserialize(BinarySerializer().serialize_update(stateUpdate)))  # type: ignore[arg-type]
+
+    async def send_delta_update(self, deltaUpdate: StateDeltaUpdateModel):
+        self.updates.append(deltaUpdate)
+
+
+async def get_sim_updates(delta_updates: bool) -> list[StateUpdateModel | StateDeltaUpdateModel]:
+    reporter = CollectingUpdateReporter()
+    bc = BallControlSim(update_reporter=reporter, delay_multiplier=0, delta_updates=delta_updates, keyframe_interval=5)
+    await bc.set_scenario(Ch13Scenario(seed=4050))
+    await move_ball_by_column(bc=bc, src_x=0, dest_x=5)
+    await move_ball_by_column(bc=bc, src_x=5, dest_x=6)
+    await bc.move_horizontally(-6)
+    await bc.move_vertically(-2)
+    await bc.close_claw()
+    return reporter.updates
+
+
+def get_board_update(nof_balls: int, nof_labels: int = 10) -> StateUpdateModel:
+    """A board with nof_balls balls in 100 rows"""
+    colors = ["red", "green", "blue", "yellow", "lightyellow", "purple"]
+    balls = [
+        StateBall(pos=StatePosition(x=i // 100, y=i % 100), color=colors[i % len(colors)], value=i % 10, label=str(i % nof_labels), id=i + 1)
+        for i in range(nof_balls)
+    ]
+    held_ball = StateBall(pos=StatePosition(x=0, y=0), color="blå ♥", value=None, value_visible=False, id=nof_balls + 1)
+    claw = Claw(
+        pos=StatePosition(x=0, y=0), open=False, min_x=0, max_x=100, moving_horizontally=True, moving_vertically=False, operating_claw=False, ball=held_ball
+    )
+    state = StateModel(
+        max_x=max(1, nof_balls // 100),
+        max_y=99,
+        balls=balls,
+        claws=[claw],
+        goal_accomplished=False,
+        spotlight=Spotlight(on=True, pos=StatePosition(x=1, y=2)),
+        highlights=[Highlight(xMin=0, xMax=1, yMin=2, yMax=3, color='"red"')],
+        elapsed=12.5,
+    )
+    return StateUpdateModel(userId="glen", state=state, delay_multiplier=1, seq=7)
+
+
+def check_serializers(update: StateUpdateModel | StateDeltaUpdateModel | MultiBoardUpdateModel):
+    asdict_json = AsdictJsonSerializer()
+    binary = BinarySerializer()
+    if isinstance(update, StateUpdateModel):
+        expected = asdict_json.serialize_update(update)
+        assert JsonSerializer().serialize_update(update) == expected
+        assert binary.deserialize(binary.serialize_update(update)) == update
+    elif isinstance(update, StateDeltaUpdateModel):
+        expected = asdict_json.serialize_delta_update(update)
+        assert JsonSerializer().serialize_delta_update(update) == expected
+        assert binary.deserialize(binary.serialize_delta_update(update)) == update
+    else:
+        expected = asdict_json.serialize_multi_board_update(update)
+        assert JsonSerializer().serialize_multi_board_update(update) == expected
+        assert binary.deserialize(binary.serialize_multi_board_update(update)) == update
+    json.loads(expected)
+
+
+def test_update_serializer():
+    for delta_updates in [False, True]:
+        updates = asyncio.run(get_sim_updates(delta_updates=delta_updates))
+        assert any(isinstance(update, StateDeltaUpdateModel) for update in updates) == delta_updates
+        for update in updates:
+            check_serializers(update)
+
+    board_update = get_board_update(nof_balls=250)
+    check_serializers(board_update)
+    check_serializers(MultiBoardUpdateModel(tick=3, updates=[BoardUpdateModel(board=0, update=board_update), BoardUpdateModel(board=2, update=get_board_update(nof_balls=1))]))
+
+    # about 21 bytes per ball, a tenth of the JSON
+    binary_size = len(BinarySerializer().serialize_update(board_update))
+    assert binary_size < len(JsonSerializer().serialize_update(board_update)) / 5
+
+    # more distinct strings than fit in 16 bits
+    board_update = get_board_update(nof_balls=70000, nof_labels=70000)
+    binary = BinarySerializer()
+    assert binary.deserialize(binary.serialize_update(board_update)) == board_update
+
+    # ball ids in deltas cover the same range as in full updates
+    for ball in [2**32 - 1, None]:
+        delta = StateDeltaModel(claws=[ClawDelta(index=0, changes={"ball": ball})], ball_moves=[], goal_accomplished=False, elapsed=1.0)
+        check_serializers(StateDeltaUpdateModel(userId="glen", seq=2, delta=delta, delay_multiplier=1))
+
+    exception_caught = False
+    try:
+        BinarySerializer().deserialize(b"{}" + bytes(10))
+    except ValueError:
+        exception_caught = True
+    assert exception_caught
+
+
+def benchmark(nof_balls: int, number: int):
+    update = get_board_update(nof_balls=nof_balls)
+    print(f"{nof_balls} balls:")
+    baseline = 0.0
+    for serializer in [AsdictJsonSerializer(), JsonSerializer(), BinarySerializer()]:
+        elapsed = min(timeit.repeat(lambda: serializer.serialize_update(update), number=number, repeat=3)) / number
+        baseline = baseline or elapsed
+        size = len(serializer.serialize_update(update))
+        print(f"  {type(serializer).__name__:<21} {elapsed * 1000:10.3f} ms {baseline / elapsed:5.1f}x {size:10} bytes")
+
+
+if __name__ == "__main__":
+    import time
+
+    s = time.perf_counter()
+    test_update_serializer()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")
+
+    benchmark(nof_balls=10, number=1000)
+    benchmark(nof_balls=1000, number=20)
+    benchmark(nof_balls=100000, number=1)
@@ -0,0 +1,71 @@
+import asyncio
+import sys
+import pathlib
+import time
+
+abspath = pathlib.Path(__file__).parent.joinpath("../src/ballsort").resolve()
+sys.path.append(f"{abspath}")
+
+from ch6_scenario import Ch6Scenario
+from control_factory import get_control_sim
+from test_utils import move_ball_by_column
+from virtual_clock import run_virtual
+
+
+async def ch6_concurrent_solution() -> tuple[float, float]:
+    """Returns elapsed according to the simulator and according to the event loop"""
+    bc = get_control_sim(1.0)
+    await bc.set_scenario(Ch6Scenario())
+    loop_start = asyncio.get_running_loop().time()
+
+    await asyncio.gather(
+        move_ball_by_column(bc=bc, src_x=0, dest_x=2, claw_index=0),
+        move_ball_by_column(bc=bc, src_x=4, dest_x=3, claw_index=1),
+    )
+
+    await asyncio.gather(
+        bc.move_horizontally(-1, claw_index=0),
+        move_ball_by_column(bc=bc, src_x=2, dest_x=4, claw_index=1),
+    )
+
+    await move_ball_by_column(bc=bc, src_x=3, dest_x=2, claw_index=1)
+
+    await asyncio.gather(
+        bc.move_horizontally(1, claw_index=1),
+        move_ball_by_column(bc=bc, src_x=2, dest_x=0, claw_index=0)
+    )
+
+    assert bc.get_state().goal_accomplished
+    return bc.get_state().elapsed, asyncio.get_running_loop().time() - loop_start
+
+
+async def sleep_order() -> list[int]:
+    order: list[int] = []
+
+    async def sleep_and_append(duration: float, value: int):
+        await asyncio.sleep(duration)
+        order.append(value)
+
+    await asyncio.gather(*[sleep_and_append(duration=d, value=v) for v, d in enumerate([3.0, 1.0, 2.0, 1.0, 1.5])])
+    assert asyncio.get_running_loop().time() == 3.0
+    return order
+
+
+def test_virtual_clock():
+    s = time.perf_counter()
+    elapsed, loop_elapsed = run_virtual(ch6_concurrent_solution())
+    assert time.perf_counter() - s < 5.0 # would take more than 10 seconds in real time
+    assert abs(elapsed - 10.9) < 1e-9 # same as a real-time run
+    assert abs(loop_elapsed - elapsed) < 1e-9
+
+    assert run_virtual(ch6_concurrent_solution()) == (elapsed, loop_elapsed)
+
+    # equal timers fire in scheduling order
+    assert run_virtual(sleep_order()) == [1, 3, 4, 2, 0]
+
+
+if __name__ == "__main__":
+    s = time.perf_counter()
+    test_virtual_clock()
+    elapsed = time.perf_counter() - s
+    print(f"\n{__file__} executed in {elapsed:0.2f} seconds.")